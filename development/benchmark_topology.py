@@ -0,0 +1,153 @@
+"""Benchmark the Auvik cable topology builder on a synthetic estate.
+
+Usage: python development/benchmark_topology.py [--devices 10000] [--interfaces-per-device 20]
+
+Builds a random graph of devices and interfaces, with a management (me0) interface on every device, and times
+InterfaceTopology against the previous dict-of-lists implementation of AuvikAdapter.get_interface_connections,
+checking that both produce the same cables.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "layer8_app", "ssot_jobs", "utils"))
+
+from topology import InterfaceTopology  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def build_estate(devices, interfaces_per_device, seed=0):
+    """
+    Return a synthetic estate as a list of (device ID, device name, [(interface ID, name, connected to IDs)]).
+
+    About half of the ports are cabled to a random port of another device, and each device's me0 is cabled to a port
+    of a random core device. A few ports report a link to a remote me0, and a few report several neighbours.
+    """
+    rng = random.Random(seed)
+    estate = []
+    links = {}
+    ports = []
+    for device in range(devices):
+        interfaces = [(f"d{device}-me0", "me0", [])]
+        for port in range(1, interfaces_per_device):
+            interface_id = f"d{device}-p{port}"
+            interfaces.append((interface_id, f"ge-0/0/{port}", []))
+            ports.append(interface_id)
+        estate.append((f"d{device}", f"device-{device}", interfaces))
+        links.update({interface[0]: interface[2] for interface in interfaces})
+
+    rng.shuffle(ports)
+    half = len(ports) // 2
+    for a_end, b_end in zip(ports[0:half:2], ports[1:half:2]):
+        links[a_end].append(b_end)
+        links[b_end].append(a_end)
+    for device in range(devices):
+        links[f"d{device}-me0"].append(rng.choice(ports))
+    for interface_id in rng.sample(ports, len(ports) // 100):
+        links[interface_id].append(f"d{rng.randrange(devices)}-me0")
+    return estate
+
+
+def legacy_connections(estate):
+    """The previous implementation of AuvikAdapter.get_interface_connections, on plain tuples."""
+    device_info = {}
+    device_interfaces = {}
+    device_interface_names = {}
+    for device_id, device_name, interfaces in estate:
+        device_interfaces[device_id] = []
+        device_info[device_id] = {"device_name": device_name, "device_id": device_id, "interfaces": []}
+        for interface in interfaces:
+            device_interface_names[interface[0]] = {
+                "name": interface[1],
+                "device_id": device_id,
+                "device_name": device_name,
+            }
+            device_interfaces[device_id].append(interface)
+
+    for device_id, _, _ in estate:
+        for interface_id, interface_name, connected_to_ids in device_interfaces[device_id]:
+            connected_to = []
+            for connected_to_id in connected_to_ids:
+                if connected_to_id in device_interface_names:
+                    connected_to.append(
+                        {
+                            "connected_interface_id": connected_to_id,
+                            "connected_interface_name": device_interface_names.get(connected_to_id)["name"],
+                            "connected_device_id": device_interface_names.get(connected_to_id)["device_id"],
+                            "connected_device_name": device_interface_names.get(connected_to_id)["device_name"],
+                        }
+                    )
+            if len(connected_to) == 1:
+                device_info[device_id]["interfaces"].append(
+                    {"interface_id": interface_id, "interface_name": interface_name, "connected_to": connected_to}
+                )
+
+    connections = []
+    for device_id, device_data in device_info.items():
+        for interface in device_data["interfaces"]:
+            if interface["interface_name"] == "me0":
+                continue
+            if interface["connected_to"][0]["connected_interface_name"] == "me0":
+                mgmt = next((iface for iface in device_data["interfaces"] if iface["interface_name"] == "me0"), None)
+                if mgmt is None:
+                    continue
+                interface["connected_to"] = mgmt["connected_to"]
+            remote = interface["connected_to"][0]
+            connections.append(
+                (
+                    (device_id, interface["interface_id"], device_data["device_name"], interface["interface_name"]),
+                    (
+                        remote["connected_device_id"],
+                        remote["connected_interface_id"],
+                        remote["connected_device_name"],
+                        remote["connected_interface_name"],
+                    ),
+                )
+            )
+
+    seen = set()
+    cables = []
+    for from_end, to_end in connections:
+        key = frozenset({from_end[:2], to_end[:2]})
+        if key not in seen:
+            seen.add(key)
+            cables.append((from_end[2], from_end[3], to_end[2], to_end[3]))
+    return cables
+
+
+def topology_connections(estate):
+    """Build the cables with InterfaceTopology."""
+    topology = InterfaceTopology()
+    for _, device_name, interfaces in estate:
+        topology.add_device(device_name, interfaces)
+    return list(topology.cables())
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, default=10000)
+    parser.add_argument("--interfaces-per-device", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    estate = build_estate(args.devices, args.interfaces_per_device)
+    print(f"{args.devices} devices, {args.devices * args.interfaces_per_device} interfaces")
+
+    results = {}
+    for name, implementation in (("legacy", legacy_connections), ("topology", topology_connections)):
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results[name] = implementation(estate)
+            timings.append(time.perf_counter() - started)
+        print(f"{name:>10}: {min(timings):.3f}s best of {args.repeat}, {len(results[name])} cables")
+
+    if results["legacy"] != results["topology"]:
+        raise SystemExit("Implementations returned different cables")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,10 +22,58 @@ class Layer8AppConfig(NautobotAppConfig):
     required_settings = []
     min_version = "2.0.0"
     max_version = "2.9999"
-    default_settings = {}
+    default_settings = {
+        # Number of worker threads used to fetch per-device data from the Auvik API concurrently.
+        "auvik_max_workers": 8,
+        # Tenants with at least this many devices have their interfaces fetched tenant-wide instead of per device.
+        "auvik_bulk_interface_threshold": 50,
+        # Number of Auvik cursor pages fetched ahead of processing when streaming large collections. 0 disables.
+        "auvik_prefetch_pages": 2,
+        # Maximum sustained Auvik API requests per second per process, and the burst allowed above it. 0 disables.
+        "auvik_rate_limit": 10,
+        "auvik_rate_burst": 20,
+        # Maximum number of Auvik API requests in flight at the same time for a single Auvik tenant.
+        "auvik_tenant_concurrency": 8,
+        # Number of times an Auvik API request failing with 429, a 5xx or a connection error is retried.
+        "auvik_max_retries": 5,
+        # Directory for the opt-in on-disk cache of Auvik API responses. Defaults to a directory under the system temp dir.
+        "auvik_cache_dir": None,
+        # Seconds that resolved Secret values are cached for in each process. 0 disables the cache.
+        "secret_cache_ttl": 300,
+        # Seconds before the cached Tenant API building list used in job forms is revalidated in the background.
+        "building_catalog_ttl": 300,
+        # Number of objects inserted per bulk_create when a sync job runs in bulk import or deferred write mode.
+        "bulk_create_batch_size": 500,
+        # Number of top-level objects written per transaction when a sync job uses the "batch" transaction strategy.
+        "transaction_batch_size": 100,
+        # Hours after which an incremental Auvik sync of a tenant runs as a full sync.
+        "auvik_full_sync_interval": 24,
+        # Request Auvik collections as raw JSON and parse them into compact records, instead of client models.
+        "auvik_raw_json": True,
+        # Ordered (substring, role) rules assigning roles to Auvik devices by name. The first match wins.
+        "auvik_device_role_rules": [
+            ("CorS", "Core Switch"),
+            ("Dist", "Distribution Switch"),
+            ("-AP", "Wireless Access Point"),
+            ("CorR", "Core Gateway"),
+            ("CorF", "Core Gateway"),
+            ("AccS", "Access Switch"),
+            ("VSS", "Access Switch"),
+            ("UPS", "UPS"),
+            ("-PP", "UPS"),
+            ("APTS", "UPS"),
+            ("CorPP", "UPS"),
+        ],
+    }
     caching_config = {}
     jobs = "jobs.jobs"
     
     nav_menu_items = navigation.menu_items
 
+    def ready(self):
+        """Connect the app's signal handlers."""
+        super().ready()
+        from . import signals  # noqa: F401  pylint: disable=import-outside-toplevel, unused-import
+
+
 config = Layer8AppConfig  # pylint:disable=invalid-name
@@ -3,7 +3,13 @@
 from django.contrib import admin
 from nautobot.apps.admin import NautobotModelAdmin
 
-from .models import AuvikTenant, AuvikTenantBuildingRelationship, AuvikDeviceModels, AuvikDeviceVendors
+from .models import (
+    AuvikTenant,
+    AuvikTenantBuildingRelationship,
+    AuvikDeviceModels,
+    AuvikDeviceVendors,
+    AuvikSyncState,
+)
 
 
 @admin.register(AuvikTenant)
@@ -32,3 +38,10 @@ class AuvikDeviceVendorsAdmin(NautobotModelAdmin):
     """Admin interface for AuvikDeviceVendors."""
 
     list_display = ("auvik_vendor_name", "nautobot_manufacturer")
+
+
+@admin.register(AuvikSyncState)
+class AuvikSyncStateAdmin(NautobotModelAdmin):
+    """Admin interface for AuvikSyncState."""
+
+    list_display = ("auvik_tenant", "last_sync", "last_full_sync")
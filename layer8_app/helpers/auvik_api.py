@@ -4,14 +4,38 @@ import layer8_auvik_api_client
 from layer8_auvik_api_client.rest import ApiException
 
 from ..models import AuvikTenant
-
-from django.core.exceptions import ObjectDoesNotExist
-
-from nautobot.extras.models import Secret
+from .auvik_scheduler import get_auvik_scheduler
+from .config import get_app_setting
+from .secrets import get_secret_value
 
 from urllib.parse import urlparse, parse_qs
+from urllib3.connection import HTTPConnection
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import hashlib
+import json
+import queue
 import re
+import socket
+import threading
+import time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+AUVIK_API_HOST = "https://auvikapi.eu1.my.auvik.com/v1"
+
+# Decoder for raw Auvik JSON pages, orjson if it is installed as it decodes several times faster than json
+json_loads = orjson.loads if orjson is not None else json.loads
+
+# Shared Auvik API clients, keyed by (host, username, hash of API key)
+_api_clients = {}
+# Clients replaced after a credential change. Jobs may still be paging with them, so they are closed at shutdown.
+_retired_api_clients = []
+_api_clients_lock = threading.Lock()
 
 
 def get_auvik_credentials():
@@ -19,25 +43,8 @@ def get_auvik_credentials():
     auvik_api_user_secret_name = "Auvik API Username"  # nosec B105
     auvik_api_key_secret_name = "Auvik API Password"  # nosec B105
 
-    try:
-        auvik_api_user_secret_object = Secret.objects.get(name=auvik_api_user_secret_name)
-    except ObjectDoesNotExist:
-        raise Exception(f"Secret '{auvik_api_user_secret_name}' not found.")
-
-    try:
-        auvik_api_key_secret_object = Secret.objects.get(name=auvik_api_key_secret_name)
-    except ObjectDoesNotExist:
-        raise Exception(f"Secret '{auvik_api_key_secret_name}' not found.")
-
-    try:
-        auvik_api_user = auvik_api_user_secret_object.get_value()
-    except Exception as e:
-        raise Exception(f"Failed to retrieve value for secret '{auvik_api_user_secret_name}': {e}")
-
-    try:
-        auvik_api_key = auvik_api_key_secret_object.get_value()
-    except Exception as e:
-        raise Exception(f"Failed to retrieve value for secret '{auvik_api_key_secret_name}': {e}")
+    auvik_api_user = get_secret_value(auvik_api_user_secret_name)
+    auvik_api_key = get_secret_value(auvik_api_key_secret_name)
 
     if not auvik_api_user:
         raise Exception(f"Secret '{auvik_api_user_secret_name}' is empty.")
@@ -50,20 +57,13 @@ def get_auvik_credentials():
 
 def get_auvik_tenants():
     """Get the list of tenants from the Auvik API."""
-    auvik_api_user, auvik_api_key = get_auvik_credentials()
-    configuration = layer8_auvik_api_client.Configuration(
-        host="https://auvikapi.eu1.my.auvik.com/v1",
-        username=auvik_api_user,
-        password=auvik_api_key,
-    )
-    with layer8_auvik_api_client.ApiClient(configuration) as api_client:
-        api_instance = layer8_auvik_api_client.TenantsApi(api_client)
+    api_instance = layer8_auvik_api_client.TenantsApi(auvik_api())
 
-        try:
-            api_response = api_instance.read_multiple_tenants()
-            return api_response
-        except ApiException as e:
-            raise Exception(f"Failed to fetch tenants from Auvik API: {e}")
+    try:
+        api_response = get_auvik_scheduler().call(None, api_instance.read_multiple_tenants)
+        return api_response
+    except ApiException as e:
+        raise Exception(f"Failed to fetch tenants from Auvik API: {e}")
 
 
 def camel_case_to_snake_case(camel_case_str):
@@ -104,6 +104,179 @@ def convert_query_params(query_params):
     return converted_params
 
 
+def _response_body(response):
+    """
+    Return the body of a response requested with _preload_content=False.
+
+    Depending on the version of the generated client, this is an ApiResponse carrying the body in raw_data, or the
+    urllib3 response itself, whose data property reads the body.
+    """
+    for attribute in ("raw_data", "data"):
+        body = getattr(response, attribute, None)
+        if isinstance(body, (bytes, bytearray, str)):
+            return body
+    return response.read()
+
+
+def _raw_method(api_instance, method_name):
+    """
+    Return a callable requesting one page from the Auvik API and returning it as decoded JSON.
+
+    The page is requested without deserializing it into the generated client's models, which validates every
+    attribute of every item. The body is read within the call, so failures reading it are retried by the scheduler.
+    """
+    method_to_call = getattr(api_instance, f"{method_name}_with_http_info")
+
+    def _call(**params):
+        response = method_to_call(_preload_content=False, **params)
+        try:
+            return json_loads(_response_body(response))
+        finally:
+            release_conn = getattr(response, "release_conn", None)
+            if release_conn is not None:
+                release_conn()
+
+    return _call
+
+
+def _iter_responses(api_instance, method_name, params, raw=False):
+    """
+    Yield each page response from the Auvik API, following the links.next cursor until the last page.
+
+    Requests are made through the Auvik request scheduler, so they are rate limited and transient failures retried.
+    With raw set, each page is yielded as the decoded JSON document instead of a generated client response.
+    """
+    method_to_call = _raw_method(api_instance, method_name) if raw else getattr(api_instance, method_name)
+    params = dict(params)
+    scheduler = get_auvik_scheduler()
+
+    while True:
+        try:
+            api_response = scheduler.call(params.get("tenants"), method_to_call, **params)
+        except ApiException as e:
+            raise Exception(f"Failed to fetch data from Auvik API: {e}")
+
+        yield api_response
+
+        if raw:
+            next_page_url = (api_response.get("links") or {}).get("next")
+        else:
+            next_page_url = getattr(api_response.links, "next", None)
+        if not next_page_url:
+            break
+
+        parsed_url = urlparse(next_page_url)
+        query_params = parse_qs(parsed_url.query)
+        params.update(convert_query_params(query_params))
+
+
+def _prefetch(iterator, depth):
+    """
+    Run an iterator on a background thread, keeping up to depth results buffered ahead of the consumer.
+
+    Exceptions raised by the iterator are re-raised in the consumer. If the consumer stops early, the background
+    thread is signalled to stop once its pending put times out.
+    """
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker():
+        try:
+            for item in iterator:
+                if not _put((item, None)):
+                    return
+            _put((done, None))
+        except Exception as e:  # pylint: disable=broad-except
+            _put((done, e))
+
+    thread = threading.Thread(target=_worker, name="auvik-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def iter_all_pages(  # pylint: disable=too-many-arguments
+    api_instance, method_name, by_page=False, prefetch=0, cache=None, parse=None, raw=None, **kwargs
+):
+    """
+    Iterate over all pages of data from the Auvik API for a given API instance and method.
+
+    Pages are requested lazily, following the links.next cursor of each response, so only one page is held
+    in memory at a time and callers can start processing items as soon as the first page arrives.
+
+    With prefetch enabled, a background thread requests the next page while the current one is being consumed,
+    hiding network latency. At most prefetch pages are buffered ahead of the consumer.
+
+    With a response cache, a fresh cached copy of the collection is replayed from disk instead of calling the API.
+    Otherwise the pages are written to the cache as they are received.
+
+    With a parse function, each item is converted with parse, e.g. into a compact record. Unless raw is disabled,
+    pages are then requested as raw JSON and decoded with orjson when it is installed, skipping the generated client's
+    deserialization. Otherwise parse is given the dict representation of each client model, which has the same shape.
+
+    :param api_instance: The API instance to use.
+    :param method_name: The method name as a string to call on the API instance for fetching data.
+    :param by_page: If True, yield the list of items in each page instead of the individual items.
+    :param prefetch: The number of pages to fetch ahead of the consumer. 0 disables prefetching.
+    :param cache: Optional AuvikResponseCache to replay pages from and record pages to.
+    :param parse: Optional function converting a raw JSON item into the item to yield.
+    :param raw: Whether to request raw JSON when parse is given. Defaults to the auvik_raw_json setting.
+    :param kwargs: Keyword arguments to pass to the API method. These should include any filters and tenant IDs.
+    :return: A generator yielding items (or lists of items, if by_page is True) as pages are received.
+    """
+    if parse is None:
+        raw = False
+    elif raw is None:
+        raw = get_app_setting("auvik_raw_json")
+    responses = cache.read(method_name, kwargs, raw=raw) if cache is not None else None
+    cache_writer = None
+    if responses is None:
+        responses = _iter_responses(api_instance, method_name, kwargs, raw=raw)
+        if prefetch:
+            responses = _prefetch(responses, prefetch)
+        if cache is not None:
+            cache_writer = cache.writer(method_name, kwargs)
+
+    try:
+        for api_response in responses:
+            if cache_writer is not None:
+                cache_writer.add(api_response)
+            if raw:
+                items = [parse(item) for item in api_response.get("data") or ()]
+            elif parse is not None:
+                items = [parse(item.to_dict()) for item in api_response.data]
+            else:
+                items = api_response.data
+            if by_page:
+                yield items
+            else:
+                yield from items
+    except BaseException:
+        if cache_writer is not None:
+            cache_writer.discard()
+        raise
+    if cache_writer is not None:
+        cache_writer.commit()
+
+
 def fetch_all_pages(api_instance, method_name, **kwargs):
     """
     Fetch all pages of data from the Auvik API for a given API instance and method.
@@ -113,48 +286,126 @@ def fetch_all_pages(api_instance, method_name, **kwargs):
     :param kwargs: Keyword arguments to pass to the API method. These should include any filters and tenant IDs.
     :return: A list containing all items from all pages.
     """
-    all_items = []
-    next_page_url = None
+    return list(iter_all_pages(api_instance, method_name, **kwargs))
 
-    try:
-        while True:
-            if next_page_url:
-                parsed_url = urlparse(next_page_url)
-                query_params = parse_qs(parsed_url.query)
-                converted_params = convert_query_params(query_params)
-                kwargs.update(converted_params)
-            else:
-                converted_params = kwargs
 
-            method_to_call = getattr(api_instance, method_name)
-            # print(f"Calling {method_name} with parameters: {converted_params}")
-            api_response = method_to_call(**converted_params)
+def fetch_all_pages_concurrently(  # pylint: disable=too-many-arguments
+    api_instance, method_name, param_sets, max_workers=8, logger=None, cache=None, parse=None
+):
+    """
+    Fetch several paged collections from the Auvik API in parallel.
 
-            all_items.extend(api_response.data)
+    Each entry in param_sets is fetched with fetch_all_pages on a bounded thread pool. Results are returned
+    in the same order as param_sets, regardless of the order in which the requests complete.
 
-            next_page_url = getattr(api_response.links, "next", None)
+    :param api_instance: The API instance to use.
+    :param method_name: The method name as a string to call on the API instance for fetching data.
+    :param param_sets: A list of keyword argument dictionaries, one per request.
+    :param max_workers: The maximum number of requests to run at the same time.
+    :param logger: Optional logger used to report the time taken by each request.
+    :param cache: Optional AuvikResponseCache to replay pages from and record pages to.
+    :param parse: Optional function converting each raw JSON item, as for iter_all_pages.
+    :return: A list containing one list of items per entry in param_sets.
+    """
+    results = [None] * len(param_sets)
 
-            if not next_page_url:
-                break
+    def _fetch(index):
+        started = time.monotonic()
+        items = fetch_all_pages(api_instance, method_name, cache=cache, parse=parse, **param_sets[index])
+        return index, items, time.monotonic() - started
 
-    except ApiException as e:
-        raise Exception(f"Failed to fetch data from Auvik API: {e}")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = [executor.submit(_fetch, index) for index in range(len(param_sets))]
+        try:
+            for future in as_completed(futures):
+                index, items, elapsed = future.result()
+                results[index] = items
+                if logger:
+                    logger.info(f"Fetched {len(items)} items with {method_name}({param_sets[index]}) in {elapsed:.2f}s")
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
 
-    return all_items
+    return results
 
 
-def auvik_api(get_credentials=get_auvik_credentials):
-    """Return the authenticated API client for the Auvik API."""
-    auvik_api_user, auvik_api_key = get_credentials()
+def _new_auvik_api_client(auvik_api_user, auvik_api_key):
+    """Build an Auvik API client with a connection pool sized for concurrent requests."""
     configuration = layer8_auvik_api_client.Configuration(
-        host="https://auvikapi.eu1.my.auvik.com/v1",
+        host=AUVIK_API_HOST,
         username=auvik_api_user,
         password=auvik_api_key,
     )
-    api_client = layer8_auvik_api_client.ApiClient(configuration)
+    # One pooled connection per concurrent worker, so parallel fetches reuse TLS connections instead of
+    # discarding them when the pool is full. TCP keep-alive stops idle pooled connections being dropped.
+    configuration.connection_pool_maxsize = max(1, get_app_setting("auvik_max_workers"))
+    configuration.socket_options = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    return layer8_auvik_api_client.ApiClient(configuration)
+
+
+def _close_auvik_api_client(api_client):
+    """Close an Auvik API client and its pooled connections."""
+    pool_manager = getattr(getattr(api_client, "rest_client", None), "pool_manager", None)
+    if pool_manager is not None:
+        pool_manager.clear()
+    if hasattr(api_client, "close"):
+        api_client.close()
+
+
+def auvik_api(get_credentials=get_auvik_credentials):
+    """
+    Return the shared, authenticated API client for the Auvik API.
+
+    One client is kept per process for each set of credentials, so connections in its pool are reused across
+    requests, jobs and threads. If the credentials change, clients for the previous credentials are no longer
+    handed out, but are left open until the process shuts down so that requests in flight on them can finish.
+    """
+    auvik_api_user, auvik_api_key = get_credentials()
+    client_key = (AUVIK_API_HOST, auvik_api_user, hashlib.sha256(auvik_api_key.encode()).hexdigest())
+
+    with _api_clients_lock:
+        api_client = _api_clients.get(client_key)
+        if api_client is None:
+            for stale_key in [key for key in _api_clients if key[:2] == client_key[:2]]:
+                _retired_api_clients.append(_api_clients.pop(stale_key))
+            api_client = _new_auvik_api_client(auvik_api_user, auvik_api_key)
+            _api_clients[client_key] = api_client
     return api_client
 
 
+def close_auvik_api_clients():
+    """Close all shared and retired Auvik API clients, e.g. when a worker process shuts down."""
+    with _api_clients_lock:
+        while _api_clients:
+            _close_auvik_api_client(_api_clients.popitem()[1])
+        while _retired_api_clients:
+            _close_auvik_api_client(_retired_api_clients.pop())
+
+
+def get_auvik_api_client_stats():
+    """
+    Return connection statistics for the shared Auvik API clients in this process, including retired clients.
+
+    :return: A dictionary with the number of requests made, the number of new connections (TLS handshakes)
+        opened, and the number of requests served over a reused connection.
+    """
+    requests_made = 0
+    new_connections = 0
+    with _api_clients_lock:
+        for api_client in [*_api_clients.values(), *_retired_api_clients]:
+            pools = api_client.rest_client.pool_manager.pools
+            for pool_key in pools.keys():
+                pool = pools[pool_key]
+                requests_made += pool.num_requests
+                new_connections += pool.num_connections
+    return {
+        "requests": requests_made,
+        "new_connections": new_connections,
+        "reused_connections": max(0, requests_made - new_connections),
+    }
+
+
 def auvik_api_network(api_client):
     """Return an API instance for the Auvik Network API."""
     api_instance = layer8_auvik_api_client.NetworkApi(api_client)
@@ -0,0 +1,167 @@
+"""On-disk cache of Auvik API collection pages."""
+
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+
+import layer8_auvik_api_client
+
+from .config import get_app_setting
+
+# Response type recorded for collections fetched as raw JSON
+RAW_PAGE = "raw"
+
+
+def _json_default(value):
+    """Serialize values (e.g. datetimes) that the json module cannot handle natively."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _dumps(value):
+    """Serialize value to compact JSON."""
+    return json.dumps(value, separators=(",", ":"), sort_keys=True, default=_json_default)
+
+
+def default_cache_directory():
+    """Return the default cache directory, private to the user the process runs as."""
+    return os.path.join(tempfile.gettempdir(), f"layer8_app_auvik_cache-{os.getuid()}")
+
+
+def ensure_private_directory(path):
+    """
+    Create a directory only its owner can access, or check that an existing one is safe to replay cached pages from.
+
+    :param path: The directory path.
+    :raises Exception: If the directory is a symlink, is owned by another user, or is writable by other users.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise Exception(f"Auvik cache directory {path} is not a directory owned by the current user.")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise Exception(f"Auvik cache directory {path} is writable by other users.")
+
+
+class AuvikResponseCache:
+    """
+    Cache of Auvik API collections on local disk, keyed by tenant, API method and request parameters.
+
+    Each collection is stored as one file of compact JSON lines: a header line with the time the collection was
+    fetched and the type of its pages, followed by one line per page. Entries older than max_age seconds are ignored
+    and replaced on the next fetch. Files are written to a temporary name and renamed once the last page has been
+    received, so partially fetched collections are never replayed. Pages fetched as raw JSON are stored as received
+    and are only replayed to callers asking for raw pages, and vice versa. The cache directory must be owned by the
+    user the process runs as and not writable by others, so other local users cannot plant pages to be replayed.
+    """
+
+    def __init__(self, max_age, directory=None):
+        """
+        Initialize the cache.
+
+        :param max_age: Maximum age in seconds of a cached collection for it to be replayed.
+        :param directory: Directory to store cached collections in. Defaults to the auvik_cache_dir setting.
+        """
+        self.max_age = max_age
+        self.directory = directory or get_app_setting("auvik_cache_dir") or default_cache_directory()
+        ensure_private_directory(self.directory)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, method_name, params):
+        """Return the file path used to cache the collection returned by method_name for params."""
+        tenant = str(params.get("tenants") or "all")
+        digest = hashlib.sha256(_dumps(params).encode()).hexdigest()[:32]
+        return os.path.join(self.directory, tenant, f"{method_name}-{digest}.jsonl")
+
+    def read(self, method_name, params, raw=False):
+        """
+        Return the cached pages for a collection, if a fresh enough copy is cached.
+
+        :param method_name: The API method name the collection was fetched with.
+        :param params: The parameters of the first page request.
+        :param raw: Replay pages as decoded JSON documents rather than API response objects.
+        :return: A generator of pages, or None if there is no fresh cached copy of the requested type.
+        """
+        path = self.path(method_name, params)
+        try:
+            with open(path, "r", encoding="utf-8") as cache_file:
+                header = json.loads(cache_file.readline())
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+        expired = time.time() - header.get("fetched_at", 0) > self.max_age
+        if expired or (header.get("response_type") == RAW_PAGE) != raw:
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        return self._replay(path, None if raw else getattr(layer8_auvik_api_client, header["response_type"]))
+
+    def _count(self, hit):
+        """Count a cache hit or miss. Collections are read from several threads at once."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @staticmethod
+    def _replay(path, response_type):
+        """Yield API response objects, or decoded JSON documents if response_type is None, from a cached collection."""
+        with open(path, "r", encoding="utf-8") as cache_file:
+            cache_file.readline()
+            for line in cache_file:
+                page = json.loads(line)
+                yield page if response_type is None else response_type.from_dict(page)
+
+    def writer(self, method_name, params):
+        """Return a writer that records the pages of a collection as they are fetched."""
+        return AuvikResponseCacheWriter(self.path(method_name, params), method_name, params)
+
+
+class AuvikResponseCacheWriter:
+    """Write the pages of one Auvik collection to the cache as they arrive."""
+
+    def __init__(self, path, method_name, params):
+        """Initialize the writer for the cache file at path."""
+        self.path = path
+        self.method_name = method_name
+        self.params = params
+        self._file = None
+        self._temp_path = None
+
+    def add(self, api_response):
+        """Append one page, an API response object or a decoded JSON document, to the cached collection."""
+        raw = isinstance(api_response, dict)
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            fd, self._temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+            self._file = os.fdopen(fd, "w", encoding="utf-8")
+            header = {
+                "fetched_at": time.time(),
+                "method": self.method_name,
+                "params": self.params,
+                "response_type": RAW_PAGE if raw else type(api_response).__name__,
+            }
+            self._file.write(_dumps(header) + "\n")
+        self._file.write(_dumps(api_response if raw else api_response.to_dict()) + "\n")
+
+    def commit(self):
+        """Make the cached collection available once all of its pages have been written."""
+        if self._file is not None:
+            self._file.close()
+            os.replace(self._temp_path, self.path)
+            self._file = None
+
+    def discard(self):
+        """Remove a partially written collection."""
+        if self._file is not None:
+            self._file.close()
+            os.remove(self._temp_path)
+            self._file = None
@@ -0,0 +1,95 @@
+"""Compact records of the Auvik API items used by the sync jobs, parsed from raw JSON."""
+
+from typing import NamedTuple, Optional, Tuple
+
+
+class AuvikDevice(NamedTuple):
+    """The fields of an Auvik device that are synchronized to Nautobot."""
+
+    id: str
+    device_name: Optional[str]
+    make_model: Optional[str]
+    vendor_name: Optional[str]
+    serial_number: Optional[str]
+    ip_addresses: Optional[Tuple[str, ...]]
+
+
+class AuvikNetwork(NamedTuple):
+    """The fields of an Auvik network that are synchronized to Nautobot."""
+
+    id: str
+    network_name: Optional[str]
+    description: Optional[str]
+
+
+class AuvikInterface(NamedTuple):
+    """The fields of an Auvik interface that are synchronized to Nautobot."""
+
+    id: str
+    interface_name: Optional[str]
+    interface_type: Optional[str]
+    connected_to: Tuple[str, ...]
+    parent_device: Optional[str]
+
+
+def _related_ids(relationships, name):
+    """Return the IDs of the items a JSON:API relationship refers to, as a tuple."""
+    data = (relationships.get(name) or {}).get("data")
+    if data is None:
+        return ()
+    if isinstance(data, dict):
+        return (data.get("id"),)
+    return tuple(item.get("id") for item in data)
+
+
+def parse_device(item):
+    """
+    Return the record of an Auvik device.
+
+    :param item: The device as returned by the Auvik API, a JSON:API resource object decoded to a dict.
+    :return: AuvikDevice record.
+    """
+    attributes = item.get("attributes") or {}
+    ip_addresses = attributes.get("ipAddresses")
+    return AuvikDevice(
+        id=item["id"],
+        device_name=attributes.get("deviceName"),
+        make_model=attributes.get("makeModel"),
+        vendor_name=attributes.get("vendorName"),
+        serial_number=attributes.get("serialNumber"),
+        ip_addresses=tuple(ip_addresses) if ip_addresses is not None else None,
+    )
+
+
+def parse_interface(item):
+    """
+    Return the record of an Auvik interface.
+
+    :param item: The interface as returned by the Auvik API, a JSON:API resource object decoded to a dict.
+    :return: AuvikInterface record.
+    """
+    attributes = item.get("attributes") or {}
+    relationships = item.get("relationships") or {}
+    parent_device = _related_ids(relationships, "parentDevice")
+    return AuvikInterface(
+        id=item["id"],
+        interface_name=attributes.get("interfaceName"),
+        interface_type=attributes.get("interfaceType"),
+        connected_to=_related_ids(relationships, "connectedTo"),
+        parent_device=parent_device[0] if parent_device else None,
+    )
+
+
+def parse_network(item):
+    """
+    Return the record of an Auvik network.
+
+    :param item: The network as returned by the Auvik API, a JSON:API resource object decoded to a dict.
+    :return: AuvikNetwork record.
+    """
+    attributes = item.get("attributes") or {}
+    return AuvikNetwork(
+        id=item["id"],
+        network_name=attributes.get("networkName"),
+        description=attributes.get("description"),
+    )
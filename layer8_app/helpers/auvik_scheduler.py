@@ -0,0 +1,201 @@
+"""Rate limiting, concurrency limiting and retry for Auvik API requests."""
+
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+from layer8_auvik_api_client.rest import ApiException
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+
+from .config import get_app_setting
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes returned by Auvik for requests that are safe to retry. The API client raises ApiException with
+# status 0 for connection and SSL errors, which are retried too.
+RETRY_STATUSES = {0, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing bursts of up to capacity requests, refilled at rate requests per second."""
+
+    def __init__(self, rate, capacity):
+        """
+        Initialize a full bucket.
+
+        :param rate: Tokens added per second. A rate of 0 disables rate limiting.
+        :param capacity: The maximum number of tokens the bucket can hold.
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token from the bucket, waiting until one is available.
+
+        :return: The number of seconds spent waiting.
+        """
+        if not self.rate:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def retry_after_seconds(headers):
+    """
+    Return the delay requested by a Retry-After response header, in seconds.
+
+    :param headers: The response headers, or None.
+    :return: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    value = headers.get("Retry-After") if headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AuvikRequestScheduler:
+    """
+    Schedule Auvik API requests within the API's rate limits.
+
+    Every request holds a per-tenant concurrency slot while it runs, and takes a token from a shared token bucket once
+    it has the slot, so requests queued behind a busy tenant do not use up the rate budget of the other tenants.
+    Requests failing with 429 or a transient 5xx/connection error are retried with jittered exponential backoff.
+    A Retry-After header pauses all requests made through the scheduler until the requested time.
+    """
+
+    def __init__(self, rate, burst, tenant_concurrency, max_retries, backoff_base=0.5, backoff_max=30.0):
+        """
+        Initialize the scheduler.
+
+        :param rate: Maximum sustained requests per second across all tenants. 0 disables rate limiting.
+        :param burst: Maximum number of requests that can be made at once before rate limiting applies.
+        :param tenant_concurrency: Maximum number of requests in flight at the same time for each tenant.
+        :param max_retries: Number of times a failed request is retried before the error is raised.
+        :param backoff_base: Base delay in seconds for exponential backoff.
+        :param backoff_max: Maximum delay in seconds between retries.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.tenant_concurrency = max(1, tenant_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._tenant_slots = {}
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    @contextmanager
+    def _tenant_slot(self, tenant):
+        """Hold one of the tenant's concurrency slots for the duration of the block."""
+        with self._lock:
+            slot = self._tenant_slots.get(tenant)
+            if slot is None:
+                slot = self._tenant_slots[tenant] = threading.BoundedSemaphore(self.tenant_concurrency)
+        with slot:
+            yield
+
+    def _wait_for_turn(self):
+        """Wait for any Retry-After pause to end, then take a token from the bucket."""
+        pause = self._resume_at - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        waited = self.bucket.acquire()
+        with self._lock:
+            self.requests += 1
+            self.throttled_seconds += max(0.0, pause) + waited
+
+    def _backoff(self, attempt):
+        """Return a jittered exponential backoff delay for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))  # nosec B311
+
+    def call(self, tenant, func, *args, **kwargs):
+        """
+        Call func within the rate and concurrency limits, retrying transient failures.
+
+        :param tenant: The Auvik tenant the request is made for, used for per-tenant concurrency limits.
+        :param func: The API method to call.
+        :return: The return value of func.
+        """
+        attempt = 0
+        while True:
+            try:
+                with self._tenant_slot(tenant):
+                    self._wait_for_turn()
+                    return func(*args, **kwargs)
+            except ApiException as e:
+                if (e.status or 0) not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise
+                delay = retry_after_seconds(getattr(e, "headers", None))
+                if delay is not None:
+                    with self._lock:
+                        self._resume_at = max(self._resume_at, time.monotonic() + delay)
+                else:
+                    delay = self._backoff(attempt)
+                error = f"HTTP {e.status}" if e.status else f"connection error: {e.reason}"
+            except Urllib3HTTPError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                error = str(e)
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            logger.warning(
+                f"Auvik request {getattr(func, '__name__', func)} failed ({error}), "
+                f"retrying in {delay:.1f}s (attempt {attempt} of {self.max_retries})"
+            )
+            time.sleep(delay)
+
+    def stats(self):
+        """Return counters for the requests made through this scheduler."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "throttled_seconds": round(self.throttled_seconds, 2),
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_auvik_scheduler():
+    """Return the process-wide Auvik request scheduler, configured from the app settings."""
+    global _scheduler  # pylint: disable=global-statement
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AuvikRequestScheduler(
+                rate=get_app_setting("auvik_rate_limit"),
+                burst=get_app_setting("auvik_rate_burst"),
+                tenant_concurrency=get_app_setting("auvik_tenant_concurrency"),
+                max_retries=get_app_setting("auvik_max_retries"),
+            )
+        return _scheduler
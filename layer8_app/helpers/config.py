@@ -0,0 +1,18 @@
+"""Helper for reading layer8_app settings from PLUGINS_CONFIG."""
+
+from django.conf import settings
+
+from .. import Layer8AppConfig
+
+
+def get_app_setting(name):
+    """
+    Return a layer8_app setting, falling back to the app's default_settings.
+
+    :param name: The setting name, as used in PLUGINS_CONFIG["layer8_app"].
+    :return: The configured value, or the default value if the setting is not configured.
+    """
+    app_settings = settings.PLUGINS_CONFIG.get("layer8_app", {})
+    if name in app_settings:
+        return app_settings[name]
+    return Layer8AppConfig.default_settings.get(name)
@@ -1,26 +1,25 @@
 """Utility to get OAuth M2M token for Wavenet Gateway APIs."""
 
+import threading
+import time
+
 import requests
 
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.cache import cache
 from requests.exceptions import RequestException
 
-from nautobot.extras.models import Secret
+from .secrets import get_secret_value
 
 
-def get_api_token():
-    """Get the API token from the Nautobot Jobs Gateway."""
-    auth_token_secret_name = "Nautobot Jobs Gateway M2M Token Auth"  # nosec B105
+def request_api_token():
+    """
+    Request a new access token from the Nautobot Jobs Gateway.
 
-    try:
-        auth_token_secret_object = Secret.objects.get(name=auth_token_secret_name)
-    except ObjectDoesNotExist:
-        raise Exception(f"Secret '{auth_token_secret_name}' not found.")
+    :return: The decoded token response, including "access_token" and, if provided by the gateway, "expires_in".
+    """
+    auth_token_secret_name = "Nautobot Jobs Gateway M2M Token Auth"  # nosec B105
 
-    try:
-        auth_token = auth_token_secret_object.get_value()
-    except Exception as e:
-        raise Exception(f"Failed to retrieve value for secret '{auth_token_secret_name}': {e}")
+    auth_token = get_secret_value(auth_token_secret_name)
 
     if not auth_token:
         raise Exception(f"Secret '{auth_token_secret_name}' is empty.")
@@ -31,11 +30,83 @@ def get_api_token():
             "https://n8n.gateway.wavenet.co.uk/webhook/gateway-m2m-credential", headers=auth_header, timeout=60
         )
         response.raise_for_status()  # Raises an HTTPError if the response status code is 4XX or 5XX
-        data = response.json()
-        return data["access_token"]
+        return response.json()
     except RequestException as e:
         # Handle HTTP and connection errors
         raise Exception(f"HTTP request failed: {e}")
     except ValueError:
         # Handle JSON decoding errors
         raise Exception("Failed to parse JSON response.")
+
+
+class M2MTokenManager:
+    """
+    Cache the Gateway M2M access token until shortly before it expires.
+
+    The token is stored in the Django cache backend so it is shared by every thread and worker process. Only one
+    caller refreshes an expired token at a time: other threads in the same process wait on a lock, and other
+    processes wait on a short-lived lock key in the cache, then pick up the refreshed token.
+    """
+
+    cache_key = "layer8_app:gateway_m2m_token"
+    lock_key = "layer8_app:gateway_m2m_token:refresh"
+
+    def __init__(self, request_token=request_api_token, refresh_margin=60, default_expires_in=300, lock_timeout=30):
+        """
+        Initialize the token manager.
+
+        :param request_token: Callable returning a new token response from the gateway.
+        :param refresh_margin: Seconds before expiry at which a cached token is no longer used.
+        :param default_expires_in: Token lifetime in seconds to assume if the gateway does not return expires_in.
+        :param lock_timeout: Maximum number of seconds to wait for another process to finish refreshing the token.
+        """
+        self.request_token = request_token
+        self.refresh_margin = refresh_margin
+        self.default_expires_in = default_expires_in
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+
+    def get_token(self):
+        """Return a valid access token, refreshing it from the gateway if the cached token has expired."""
+        token = cache.get(self.cache_key)
+        if token:
+            return token
+        with self._lock:
+            token = cache.get(self.cache_key)
+            if token:
+                return token
+            return self._refresh()
+
+    def invalidate(self):
+        """Discard the cached token, e.g. after the gateway has rejected it."""
+        cache.delete(self.cache_key)
+
+    def _refresh(self):
+        """Request a new token, unless another process refreshes it while we wait for the refresh lock."""
+        deadline = time.monotonic() + self.lock_timeout
+        acquired = cache.add(self.lock_key, True, timeout=self.lock_timeout)
+        while not acquired and time.monotonic() < deadline:
+            time.sleep(0.2)
+            token = cache.get(self.cache_key)
+            if token:
+                return token
+            acquired = cache.add(self.lock_key, True, timeout=self.lock_timeout)
+
+        try:
+            data = self.request_token()
+            token = data["access_token"]
+            timeout = int(data.get("expires_in") or self.default_expires_in) - self.refresh_margin
+            if timeout > 0:
+                cache.set(self.cache_key, token, timeout=timeout)
+            return token
+        finally:
+            if acquired:
+                cache.delete(self.lock_key)
+
+
+token_manager = M2MTokenManager()
+
+
+def get_api_token():
+    """Get the API token from the Nautobot Jobs Gateway, reusing the cached token until it is about to expire."""
+    return token_manager.get_token()
@@ -0,0 +1,99 @@
+"""Time-based cache for resolved Nautobot Secret values."""
+
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+
+from nautobot.extras.models import Secret
+
+from .config import get_app_setting
+
+
+class SecretValueCache:
+    """
+    Process-local cache of secret values, keyed by Secret name.
+
+    Values are kept for the configured TTL so repeated lookups do not query the database or call the secrets
+    provider again. Values are only held in process memory and are never written to the Django cache backend.
+
+    When a Secret is saved or deleted in any process (see layer8_app.signals), invalidate() bumps a generation
+    counter held in the Django cache. Every lookup compares the values it holds against that counter, so all web
+    and worker processes drop their cached values on their next lookup rather than when the TTL runs out.
+    """
+
+    generation_key = "layer8_app:secret_cache_generation"
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._values = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_value(self, secret_name):
+        """
+        Return the value of the named Secret, resolving it through its provider on a cache miss.
+
+        :param secret_name: The name of the Nautobot Secret.
+        :return: The secret value.
+        """
+        ttl = get_app_setting("secret_cache_ttl")
+        now = time.monotonic()
+        generation = cache.get(self.generation_key, 0)
+        with self._lock:
+            cached = self._values.get(secret_name)
+            if cached is not None and cached[1] > now and cached[2] == generation:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        try:
+            secret_object = Secret.objects.get(name=secret_name)
+        except ObjectDoesNotExist:
+            raise Exception(f"Secret '{secret_name}' not found.")
+
+        try:
+            value = secret_object.get_value()
+        except Exception as e:
+            raise Exception(f"Failed to retrieve value for secret '{secret_name}': {e}")
+
+        if value and ttl:
+            with self._lock:
+                # Stored with the generation read before resolving, so an invalidation made meanwhile still applies
+                self._values[secret_name] = (value, now + ttl, generation)
+        return value
+
+    def clear(self):
+        """Remove all values cached in this process."""
+        with self._lock:
+            self._values.clear()
+
+    def invalidate(self):
+        """Remove all cached values, in this process and in every other process sharing the Django cache."""
+        # incr is atomic in the shared cache backends, add only succeeds for the first process to create the key
+        if not cache.add(self.generation_key, 1, timeout=None):
+            try:
+                cache.incr(self.generation_key)
+            except ValueError:
+                cache.set(self.generation_key, 1, timeout=None)
+        self.clear()
+
+    def stats(self):
+        """Return the number of cache hits and misses since the process started."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+secret_cache = SecretValueCache()
+
+
+def get_secret_value(secret_name):
+    """Return the value of the named Nautobot Secret, using the process-wide secret cache."""
+    return secret_cache.get_value(secret_name)
+
+
+def get_secret_cache_stats():
+    """Return the hit and miss counters of the process-wide secret cache."""
+    return secret_cache.stats()
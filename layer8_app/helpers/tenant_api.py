@@ -1,66 +1,52 @@
 """Helper functions for interacting with the Wavenet Gateway Tenant API."""
 
+import logging
+import threading
+import time
+
 import requests
 
+from django.core.cache import cache
+from django.db import connection
 from requests.exceptions import RequestException
 
-from .get_m2m_token import get_api_token
+from .config import get_app_setting
+from .get_m2m_token import get_api_token, token_manager
 
-import openapi_client
-from openapi_client.rest import ApiException
+logger = logging.getLogger(__name__)
 
-configuration = openapi_client.Configuration(host="https://bcs-api.wavenetuk.com/v2.5.6")
+TENANT_API_HOST = "https://bcs-api.wavenetuk.com/v2.5.6"
 
 
-def fetch_buildings_list(get_api_token=get_api_token, configuration=configuration):
-    """Fetch list of buildings from the Tenant API."""
-    api_token = get_api_token()
-    with openapi_client.ApiClient(
-        configuration, header_name="Authorization", header_value=f"Bearer {api_token}"
-    ) as api_client:
-        api_instance = openapi_client.DefaultApi(api_client)
+def authorized_get(url, headers=None, **kwargs):
+    """
+    Send a GET request to the Tenant API with the Gateway M2M token.
 
-        try:
-            api_response = api_instance.get_buildings_with_operator(
-                page_size=1000,
-                order_by="building_name ASC",
-                # fields="id, building_name, building_operator",
-                status="Live Building",
-            )
-            dropdown_values = [
-                (item["id"], item["building_name"] + " (" + str(item["operator"]["operator_name"]) + ")")
-                for item in api_response["buildings"]["items"]
-            ]
-            return dropdown_values
-        except ApiException as e:
-            print("Exception when calling DefaultApi->get_buildings_with_operator: %s\n" % e)
-            return []
-
-    # headers = {"Authorization": f"Bearer {api_token}"}
-    # response = requests.get(
-    #     "https://bcs-api.wavenetuk.com/v2.5.6/buildings/withoperator?page_size=1000&order_by=building_name ASC&fields=id, building_name, building_operator&status=Live Building",
-    #     headers=headers,
-    #     timeout=60,
-    # )
-    # if response.status_code == 200:
-    #     data = response.json()
-    #     dropdown_values = [
-    #         (item["id"], item["building_name"] + " (" + str(item["operator"]["operator_name"]) + ")")
-    #         for item in data["buildings"]["items"]
-    #     ]
-    #     return dropdown_values
-    # else:
-    # return []
+    If the API rejects the cached token with a 401, e.g. because it was revoked before it expired, the token is
+    discarded and the request is retried once with a fresh token.
+
+    :param url: The URL to request.
+    :param headers: Extra request headers.
+    :param kwargs: Further keyword arguments passed to requests.get.
+    :return: The requests response.
+    """
+    headers = headers or {}
+    response = requests.get(
+        url, headers={**headers, "Authorization": f"Bearer {get_api_token()}"}, timeout=60, **kwargs
+    )
+    if response.status_code == 401:
+        logger.warning("Tenant API rejected the Gateway M2M token, requesting a new token.")
+        token_manager.invalidate()
+        response = requests.get(
+            url, headers={**headers, "Authorization": f"Bearer {get_api_token()}"}, timeout=60, **kwargs
+        )
+    return response
 
 
 def get_building_data(building_id):
     """Get building data from the Tenant API."""
-    gateway_api_token = get_api_token()
-    auth_header = {"Authorization": f"Bearer {gateway_api_token}"}
     try:
-        response = requests.get(
-            f"https://bcs-api.wavenetuk.com/v2.5.6/buildings/{building_id}", headers=auth_header, timeout=60
-        )
+        response = authorized_get(f"{TENANT_API_HOST}/buildings/{building_id}")
         response.raise_for_status()  # Raises an HTTPError if the response status code is 4XX or 5XX
         data = response.json()
         return data
@@ -70,3 +56,96 @@ def get_building_data(building_id):
     except ValueError:
         # Handle JSON decoding errors
         raise Exception("Failed to parse JSON response.")
+
+
+def building_choice(item):
+    """Return the (id, label) dropdown choice for a building returned by the Tenant API."""
+    return (item["id"], item["building_name"] + " (" + str(item["operator"]["operator_name"]) + ")")
+
+
+class BuildingCatalog:
+    """
+    Cached list of live buildings from the Tenant API, used for building dropdowns in job forms.
+
+    The catalog is stored in the Django cache. Once it is older than the configured TTL, the cached choices are
+    still served while a single background refresh revalidates the catalog with If-None-Match/If-Modified-Since,
+    so an unchanged catalog only costs a 304 response.
+    """
+
+    url = f"{TENANT_API_HOST}/buildings/withoperator"
+    params = {"page_size": 1000, "order_by": "building_name ASC", "status": "Live Building"}
+    cache_key = "layer8_app:building_catalog"
+    lock_key = "layer8_app:building_catalog:refresh"
+    # Keep the catalog for a day, so a stale copy can be served while a refresh is in progress or failing.
+    cache_timeout = 86400
+
+    def get_choices(self):
+        """Return the building dropdown choices, fetching the catalog synchronously only if nothing is cached."""
+        entry = cache.get(self.cache_key)
+        if entry is None:
+            try:
+                entry = self.refresh()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.error(f"Failed to fetch buildings from the Tenant API: {e}")
+                return []
+        elif time.time() - entry["fetched_at"] > get_app_setting("building_catalog_ttl"):
+            self.refresh_in_background()
+        return entry["choices"]
+
+    def refresh(self):
+        """
+        Revalidate the cached catalog against the Tenant API, downloading it again only if it has changed.
+
+        :return: The updated cache entry.
+        """
+        entry = cache.get(self.cache_key)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = authorized_get(self.url, params=self.params, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                entry["fetched_at"] = time.time()
+            else:
+                response.raise_for_status()
+                entry = {
+                    "choices": [building_choice(item) for item in response.json()["buildings"]["items"]],
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+        except RequestException as e:
+            raise Exception(f"HTTP request failed: {e}")
+        except ValueError:
+            raise Exception("Failed to parse JSON response.")
+
+        cache.set(self.cache_key, entry, timeout=self.cache_timeout)
+        return entry
+
+    def refresh_in_background(self):
+        """Start a background refresh of the catalog, unless another process or thread is already refreshing it."""
+        if not cache.add(self.lock_key, True, timeout=120):
+            return
+
+        def _refresh():
+            try:
+                self.refresh()
+            except Exception as e:  # pylint: disable=broad-except
+                logger.warning(f"Failed to refresh building catalog, serving cached buildings: {e}")
+            finally:
+                cache.delete(self.lock_key)
+                connection.close()
+
+        threading.Thread(target=_refresh, name="building-catalog-refresh", daemon=True).start()
+
+
+building_catalog = BuildingCatalog()
+
+
+def get_building_choices():
+    """Return building dropdown choices from the cached building catalog."""
+    return building_catalog.get_choices()
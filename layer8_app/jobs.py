@@ -2,18 +2,18 @@
 
 from nautobot.apps.jobs import ChoiceVar, Job, register_jobs, JobButtonReceiver
 
-from .helpers.tenant_api import fetch_buildings_list, get_building_data
+from .helpers.tenant_api import get_building_choices, get_building_data
 from .helpers.auvik_api import (
     get_auvik_tenants,
     auvik_api,
     auvik_api_device,
-    fetch_all_pages,
+    iter_all_pages,
     load_auvik_tenants_from_orm,
 )
 
 # from .ssot_jobs.sync_tenant_api import BuildingDataSource
 
-from .ssot_jobs.jobs import AuvikDataSource, Layer8DataSource
+from .ssot_jobs.jobs import AuvikDataSource, AuvikFleetSync, Layer8DataSource
 
 from .models import AuvikTenant, AuvikDeviceVendors, AuvikDeviceModels
 from nautobot.dcim.models import Location, Device, Cable, Interface
@@ -33,7 +33,7 @@ class LoadBuildings(Job):
         name = "Load Buildings"
         description = "Load a building and it's rooms from the Tenant API and creates them as locations in Nautobot."
 
-    building_id = ChoiceVar(description="Select a building to import", label="Building", choices=fetch_buildings_list)
+    building_id = ChoiceVar(description="Select a building to import", label="Building", choices=get_building_choices)
 
     def run(self, building_id, get_building_data=get_building_data):
         """Run the job."""
@@ -92,26 +92,24 @@ class LoadAuvikVendorsAndModels(Job):
 
         params = {"tenants": auvik_tenant_id}
 
-        try:
-            auvik_devices = fetch_all_pages(auvik_api_instance, "read_multiple_device_info", **params)
-        except Exception as e:
-            self.logger.error(f"Failed to fetch Auvik devices: {e}")
-            return
-
         vendor_names = []
         make_models = []
 
-        for device in auvik_devices:
-            vendor_name = getattr(device.attributes, "vendor_name", None)
-            make_model = getattr(device.attributes, "make_model", None)
+        try:
+            for device in iter_all_pages(auvik_api_instance, "read_multiple_device_info", **params):
+                vendor_name = getattr(device.attributes, "vendor_name", None)
+                make_model = getattr(device.attributes, "make_model", None)
 
-            if vendor_name not in vendor_names and vendor_name is not None:
-                vendor_names.append(vendor_name)
-                self.logger.info(f"Loaded Auvik device vendor: {vendor_name}")
+                if vendor_name not in vendor_names and vendor_name is not None:
+                    vendor_names.append(vendor_name)
+                    self.logger.info(f"Loaded Auvik device vendor: {vendor_name}")
 
-            if make_model not in make_models and make_model is not None:
-                make_models.append(make_model)
-                self.logger.info(f"Loaded Auvik device model: {make_model}")
+                if make_model not in make_models and make_model is not None:
+                    make_models.append(make_model)
+                    self.logger.info(f"Loaded Auvik device model: {make_model}")
+        except Exception as e:
+            self.logger.error(f"Failed to fetch Auvik devices: {e}")
+            return
 
         for vendor in vendor_names:
             try:
@@ -273,6 +271,7 @@ jobs = [
     # BuildingDataSource,
     Layer8DataSource,
     AuvikDataSource,
+    AuvikFleetSync,
     LoadAuvikVendorsAndModels,
     SetPrimaryWanInterface,
     DecomissionDevice,
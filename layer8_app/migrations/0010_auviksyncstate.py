@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-17 09:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("layer8_app", "0009_alter_auvikdevicemodels_auvik_model_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuvikSyncState",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True
+                    ),
+                ),
+                ("record_hashes", models.JSONField(blank=True, default=dict)),
+                ("last_sync", models.DateTimeField(blank=True, null=True)),
+                ("last_full_sync", models.DateTimeField(blank=True, null=True)),
+                (
+                    "auvik_tenant",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_state",
+                        to="layer8_app.auviktenant",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+    ]
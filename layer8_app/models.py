@@ -1,6 +1,9 @@
 """Django models for the layer8_app app."""
 
+from datetime import timedelta
+
 from django.db import models
+from django.utils import timezone
 
 from nautobot.apps.models import BaseModel
 
@@ -57,3 +60,25 @@ class AuvikDeviceVendors(BaseModel):
         blank=True,
         related_name="manufacturers",
     )
+
+
+class AuvikSyncState(BaseModel):
+    """Model for storing the state of incremental Auvik syncs for an Auvik Tenant."""
+
+    auvik_tenant = models.OneToOneField(
+        "layer8_app.AuvikTenant",
+        on_delete=models.CASCADE,
+        related_name="sync_state",
+    )
+    # Auvik device ID -> hash of the device (and its interfaces) as last synchronized
+    record_hashes = models.JSONField(default=dict, blank=True)
+    last_sync = models.DateTimeField(null=True, blank=True)
+    last_full_sync = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        """String representation of AuvikSyncState."""
+        return f"{self.auvik_tenant} sync state"
+
+    def full_sync_due(self, interval):
+        """Return True if there has been no full sync in the last interval hours."""
+        return self.last_full_sync is None or timezone.now() - self.last_full_sync >= timedelta(hours=interval)
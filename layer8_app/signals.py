@@ -0,0 +1,29 @@
+"""Signal handlers for the layer8_app app."""
+
+import atexit
+
+from celery.signals import worker_process_shutdown
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from nautobot.extras.models import Secret
+
+from .helpers.auvik_api import close_auvik_api_clients
+from .helpers.secrets import secret_cache
+
+
+@worker_process_shutdown.connect
+def close_auvik_api_clients_on_shutdown(**kwargs):  # pylint: disable=unused-argument
+    """Close pooled Auvik API connections when a Celery worker process shuts down."""
+    close_auvik_api_clients()
+
+
+# Also close pooled connections when processes that are not Celery workers (e.g. nbshell) exit.
+atexit.register(close_auvik_api_clients)
+
+
+@receiver(post_save, sender=Secret)
+@receiver(post_delete, sender=Secret)
+def invalidate_secret_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Drop cached secret values in every process when a Secret changes, so the next lookup resolves the new value."""
+    secret_cache.invalidate()
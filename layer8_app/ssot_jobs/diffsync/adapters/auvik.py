@@ -3,10 +3,28 @@
 from diffsync import DiffSync
 from diffsync.exceptions import ObjectAlreadyExists
 from ..models.base import dcim
-from nautobot.dcim.models import Location, DeviceType, Manufacturer
-from ....models import AuvikTenantBuildingRelationship, AuvikTenant, AuvikDeviceModels, AuvikDeviceVendors
-from ....helpers.auvik_api import auvik_api, auvik_api_network, auvik_api_device, auvik_api_interface, fetch_all_pages
+from nautobot.dcim.models import Location
+from django.utils import timezone
+from ....models import AuvikTenantBuildingRelationship, AuvikTenant, AuvikSyncState
+from ....helpers.auvik_api import (
+    auvik_api,
+    auvik_api_network,
+    auvik_api_device,
+    auvik_api_interface,
+    fetch_all_pages_concurrently,
+    iter_all_pages,
+)
+from ....helpers.auvik_cache import AuvikResponseCache
+from ....helpers.auvik_records import parse_device, parse_interface, parse_network
+from ....helpers.config import get_app_setting
+from ...utils.device_registry import AuvikDeviceRegistry
+from ...utils.incremental import record_hash
+from ...utils.mappings import AuvikMappingResolver
+from ...utils.roles import DeviceRoleClassifier
+from ...utils.topology import InterfaceTopology
 import re
+import time
+from itertools import chain
 
 
 class AuvikAdapter(DiffSync):
@@ -28,6 +46,9 @@ class AuvikAdapter(DiffSync):
         "cable",
     )
 
+    # Auvik interface types loaded into DiffSync, in the order they are stored against each device
+    interface_types = ("ethernet", "linkAggregation")
+
     def __init__(self, *args, job, sync=None, building_id, **kwargs):
         """Initialize AuvikAdapter."""
         super().__init__(*args, **kwargs)
@@ -47,11 +68,19 @@ class AuvikAdapter(DiffSync):
             self.building_name = None
             return
 
-        # Global data structures for storing device and interface information
-        self.device_data = {}
-        self.device_map = {}
-        self.interface_data = {}
-        self.skipped_devices = []
+        # Replay Auvik collections from the on-disk cache if the job asked for it
+        response_cache_max_age = getattr(self.job, "response_cache_max_age", None)
+        self.response_cache = AuvikResponseCache(max_age=response_cache_max_age) if response_cache_max_age else None
+
+        # Devices retrieved from Auvik, with their interfaces and whether they were skipped
+        self.device_registry = AuvikDeviceRegistry()
+
+        # State of incremental syncs for the tenant, None if the job is not running in incremental mode
+        self.sync_state = None
+        self.full_sync = True
+        self.record_hashes = {}
+        # Devices left out of an incremental sync because they did not change, kept to resolve the far end of cables
+        self.unchanged_devices = []
 
         try:
             self.job.logger.info("Retrieving devices from Auvik...")
@@ -61,43 +90,210 @@ class AuvikAdapter(DiffSync):
                 "tenants": auvik_tenant_id,
                 "page_first": 100,
             }
-            devices = fetch_all_pages(device_api_instance, "read_multiple_device_info", **params)
-            self.device_data = devices
-
+            devices = iter_all_pages(
+                device_api_instance,
+                "read_multiple_device_info",
+                prefetch=get_app_setting("auvik_prefetch_pages"),
+                cache=self.response_cache,
+                parse=parse_device,
+                **params,
+            )
             for device in devices:
-                self.device_map[device.id] = device
+                self.device_registry.add(device)
         except Exception as err:
             self.job.logger.error(f"Error fetching devices from Auvik: {err}")
 
+        # Incremental syncs detect interface and cable changes from the interfaces of every device, so they always
+        # retrieve the interfaces of the whole tenant, whatever its size
+        incremental = getattr(self.job, "incremental", False)
+        bulk_interfaces = incremental or len(self.device_registry) >= get_app_setting("auvik_bulk_interface_threshold")
+        if incremental:
+            self.start_incremental_sync()
+
         try:
             self.job.logger.info("Retrieving interfaces from Auvik...")
-            interface_api_instance = auvik_api_interface(self.auvik)
-            auvik_tenant_id = self.auvik_tenant_id
-            for device in self.device_data:
-                device_id = device.id
-                params_ethernet = {
-                    "filter_parent_device": device_id,
-                    "filter_interface_type": "ethernet",
-                    "page_first": 1000,
-                    "tenants": auvik_tenant_id,
-                }
-                interfaces_ethernet = fetch_all_pages(
-                    interface_api_instance, "read_multiple_interface_info", **params_ethernet
-                )
+            started = time.monotonic()
+            if bulk_interfaces:
+                request_count = self.load_interface_data_bulk()
+            else:
+                request_count = self.load_interface_data_per_device()
+            self.job.logger.info(
+                f"Retrieved interfaces for {len(self.device_registry)} devices in {time.monotonic() - started:.2f}s "
+                f"({request_count} requests)"
+            )
+        except Exception as err:
+            self.job.logger.error(f"Error fetching interfaces from Auvik: {err}")
 
-                params_link_aggregation = {
-                    "filter_parent_device": device_id,
-                    "filter_interface_type": "linkAggregation",
-                    "page_first": 1000,
-                    "tenants": auvik_tenant_id,
-                }
-                interfaces_link_aggregation = fetch_all_pages(
-                    interface_api_instance, "read_multiple_interface_info", **params_link_aggregation
+        if self.sync_state is not None:
+            self.select_changed_devices()
+
+    def start_incremental_sync(self):
+        """Load the tenant's incremental sync state and decide whether this run has to be a full sync."""
+        self.sync_state = AuvikSyncState.objects.get_or_create(
+            auvik_tenant=AuvikTenant.objects.get(auvik_tenant_id=self.auvik_tenant_id)
+        )[0]
+        if getattr(self.job, "full_sync", False):
+            self.job.logger.info("Incremental sync: full sync requested.")
+        elif self.sync_state.full_sync_due(get_app_setting("auvik_full_sync_interval")):
+            self.job.logger.info(f"Incremental sync: full sync due (last full sync: {self.sync_state.last_full_sync}).")
+        else:
+            self.full_sync = False
+
+    def select_changed_devices(self):
+        """
+        Hash the retrieved devices and, unless this is a full sync, keep only those that changed since the last sync.
+
+        Each hash covers the device and its interfaces, so interface and cable changes are detected too. Loading only
+        the changed devices limits the diff to their subtrees. The target adapter limits what it loads to the same
+        devices through job.incremental_device_names.
+        """
+        self.record_hashes = {
+            device.id: record_hash(device.record, device.interfaces) for device in self.device_registry
+        }
+        if self.full_sync:
+            return
+        changed = [
+            device
+            for device in self.device_registry
+            if self.sync_state.record_hashes.get(device.id) != self.record_hashes[device.id]
+        ]
+        self.job.logger.info(
+            f"Incremental sync: {len(changed)} of {len(self.device_registry)} devices changed since the last sync."
+        )
+        changed_ids = {device.id for device in changed}
+        self.unchanged_devices = [device for device in self.device_registry if device.id not in changed_ids]
+        self.device_registry.retain(changed_ids)
+        self.job.incremental_device_names = {device.name for device in changed}
+
+    def save_sync_state(self, target=None):
+        """
+        Record the hashes of the devices synchronized, so the next incremental sync can skip unchanged devices.
+
+        :param target: The adapter the devices were synchronized to. Devices whose sync to it did not complete are not
+            recorded, so they are synchronized again on the next run.
+        """
+        if self.sync_state is None:
+            return
+        # A full sync replaces the hashes, dropping devices no longer in Auvik. Skipped devices are not recorded,
+        # so they are retried on the next run, e.g. once a missing model mapping has been added.
+        record_hashes = {} if self.full_sync else dict(self.sync_state.record_hashes)
+        record_hashes.update(self.record_hashes)
+        for device in self.device_registry.devices(skipped=True):
+            record_hashes.pop(device.id, None)
+        if target is not None:
+            failed = self.unsynchronized_device_names(target)
+            for device in self.device_registry:
+                if device.name in failed:
+                    record_hashes.pop(device.id, None)
+            if failed:
+                self.job.logger.warning(
+                    f"Incremental sync: {len(failed)} devices were not fully synchronized and will be synchronized "
+                    f"again on the next run: {', '.join(sorted(failed))}"
                 )
+        self.sync_state.record_hashes = record_hashes
+        self.sync_state.last_sync = timezone.now()
+        if self.full_sync:
+            self.sync_state.last_full_sync = self.sync_state.last_sync
+        self.sync_state.validated_save()
 
-                self.interface_data[device_id] = interfaces_ethernet + interfaces_link_aggregation
-        except Exception as err:
-            self.job.logger.error(f"Error fetching interfaces from Auvik: {err}")
+    def unsynchronized_device_names(self, target):
+        """
+        Return the names of the devices whose sync to the target adapter did not complete.
+
+        DiffSync only adds or updates an object in the target adapter once its create or update has succeeded, so a
+        device is incomplete if it, one of its interfaces or IP addresses, or one of its cables is missing from the
+        target adapter or has different attributes there. Deferred writes that failed are reported by the write queue.
+
+        :param target: The adapter the devices were synchronized to.
+        :return: Set of device names.
+        """
+        write_queue = getattr(target, "write_queue", None)
+        names = set(write_queue.failed_devices) if write_queue is not None else set()
+        for device in self.get_all(self.device):
+            if not self._synchronized(device, target):
+                names.add(device.name)
+        for cable in self.get_all(self.cable):
+            if target.get_or_none(cable.get_type(), cable.get_unique_id()) is None:
+                names.update((cable.from_device, cable.to_device))
+        return names
+
+    def _synchronized(self, model, target):
+        """Return True if the target adapter holds model and its children with the same attributes."""
+        target_model = target.get_or_none(model.get_type(), model.get_unique_id())
+        if target_model is None or target_model.get_attrs() != model.get_attrs():
+            return False
+        for child_type, field in model.get_children_mapping().items():
+            for child_id in getattr(model, field):
+                child = self.get_or_none(child_type, child_id)
+                if child is not None and not self._synchronized(child, target):
+                    return False
+        return True
+
+    def load_interface_data_per_device(self):
+        """
+        Retrieve ethernet and linkAggregation interfaces from Auvik with one request per device and type.
+
+        :return: The number of interface collections requested from Auvik.
+        """
+        param_sets = [
+            {
+                "filter_parent_device": device.id,
+                "filter_interface_type": interface_type,
+                "page_first": 1000,
+                "tenants": self.auvik_tenant_id,
+            }
+            for device in self.device_registry
+            for interface_type in self.interface_types
+        ]
+        results = fetch_all_pages_concurrently(
+            auvik_api_interface(self.auvik),
+            "read_multiple_interface_info",
+            param_sets,
+            max_workers=get_app_setting("auvik_max_workers"),
+            logger=self.job.logger if self.job.debug else None,
+            cache=self.response_cache,
+            parse=parse_interface,
+        )
+
+        # Results are returned in request order, so each device's ethernet interfaces precede its
+        # linkAggregation interfaces, exactly as when the requests were made one after another.
+        for position, device in enumerate(self.device_registry):
+            start = position * len(self.interface_types)
+            end = start + len(self.interface_types)
+            device.interfaces = [interface for result in results[start:end] for interface in result]
+        return len(param_sets)
+
+    def load_interface_data_bulk(self):
+        """
+        Retrieve ethernet and linkAggregation interfaces for the whole tenant and group them by parent device.
+
+        The number of requests made scales with the number of pages returned by Auvik rather than the number of
+        devices in the tenant. Interfaces belonging to devices that were not retrieved are ignored.
+
+        :return: The number of interface pages requested from Auvik.
+        """
+        interface_api_instance = auvik_api_interface(self.auvik)
+        page_count = 0
+        for interface_type in self.interface_types:
+            params = {
+                "filter_interface_type": interface_type,
+                "page_first": 1000,
+                "tenants": self.auvik_tenant_id,
+            }
+            pages = iter_all_pages(
+                interface_api_instance,
+                "read_multiple_interface_info",
+                by_page=True,
+                prefetch=get_app_setting("auvik_prefetch_pages"),
+                cache=self.response_cache,
+                parse=parse_interface,
+                **params,
+            )
+            for page in pages:
+                page_count += 1
+                for interface in page:
+                    self.device_registry.add_interface(interface.parent_device, interface)
+        return page_count
 
     def load_namespaces(self):
         """Load namespace for building from Auvik."""
@@ -140,18 +336,19 @@ class AuvikAdapter(DiffSync):
             "tenants": auvik_tenant_id,
             "page_first": 100,
         }
-        auvik_vlans = fetch_all_pages(api_instance, "read_multiple_network_info", **params)
-
-        for _vlan in auvik_vlans:
-            vlan_name = getattr(_vlan.attributes, "network_name", None)
+        vlans = iter_all_pages(
+            api_instance, "read_multiple_network_info", cache=self.response_cache, parse=parse_network, **params
+        )
+        for _vlan in vlans:
+            vlan_name = _vlan.network_name
             if vlan_name is None or vlan_name == "":
-                vlan_name = getattr(_vlan.attributes, "description", None)
+                vlan_name = _vlan.description
                 if vlan_name is None or vlan_name == "":
                     if self.job.debug:
                         self.job.logger.error("VLAN name is not set in Auvik. Skipping.")
                     continue
             try:
-                vlan_id = int(getattr(_vlan.attributes, "description").split()[1])
+                vlan_id = int(_vlan.description.split()[1])
             except ValueError:
                 if self.job.debug:
                     self.job.logger.error("VLAN ID is not a valid integer. Skipping.")
@@ -184,11 +381,12 @@ class AuvikAdapter(DiffSync):
             "tenants": auvik_tenant_id,
             "page_first": 100,
         }
-        auvik_prefixes = fetch_all_pages(api_instance, "read_multiple_network_info", **params)
-
-        for _prefix in auvik_prefixes:
-            prefix_name = getattr(_prefix.attributes, "description", None)
-            prefix_description = getattr(_prefix.attributes, "network_name", None)
+        prefixes = iter_all_pages(
+            api_instance, "read_multiple_network_info", cache=self.response_cache, parse=parse_network, **params
+        )
+        for _prefix in prefixes:
+            prefix_name = _prefix.description
+            prefix_description = _prefix.network_name
             if self.job.debug:
                 self.job.logger.info(f"Loading Prefix: {prefix_name}")
 
@@ -211,7 +409,7 @@ class AuvikAdapter(DiffSync):
     def load_devices(self):
         """Load devices for building from Auvik API."""
         self.job.logger.info("Loading devices from Auvik...")
-        auvik_devices = self.device_data
+        auvik_devices = [device.record for device in self.device_registry]
 
         # Create a dictionary of device names to device IDs for use in creating device interconnections
         device_names = {}
@@ -219,105 +417,67 @@ class AuvikAdapter(DiffSync):
         if self.job.debug:
             self.job.logger.info("Loading devices from Auvik API.")
 
+        mappings = AuvikMappingResolver()
+        roles = DeviceRoleClassifier(get_app_setting("auvik_device_role_rules")).classify_many(
+            device.device_name for device in auvik_devices
+        )
+
         for _device in auvik_devices:
-            device_names[_device.id] = _device.attributes.device_name
+            device_names[_device.id] = _device.device_name
             if self.job.debug:
-                self.job.logger.info(f"Loading Device: {_device.attributes.device_name}")
+                self.job.logger.info(f"Loading Device: {_device.device_name}")
 
             # TODO: We need to force an error instead of continuing if a device make or model cannot be
             # found in Nautobot. This is to ensure that we don't skip devices that are missing this information.
             # We should also create a map of devices that have been skipped, so we can also skip trying to import interfaces for them.
             # Log errors even if we're not in debug mode, to make it clear why the sync is failing.
-            if _device.attributes.make_model is None or _device.attributes.vendor_name is None:
+            if _device.make_model is None or _device.vendor_name is None:
                 if self.job.debug:
                     self.job.logger.warning(
-                        f"Device {_device.attributes.device_name} does not have a vendor or model in Auvik. Skipping. Device attributes received from Auvik: f{_device.attributes}"
+                        f"Device {_device.device_name} does not have a vendor or model in Auvik. Skipping. Device attributes received from Auvik: {_device}"
                     )
-                self.skipped_devices.append(_device.id)
+                self.device_registry.skip(_device.id, "No vendor or model in Auvik.")
                 continue
 
-            try:
-                _dt = DeviceType.objects.get(
-                    id=AuvikDeviceModels.objects.get(
-                        auvik_model_name=_device.attributes.make_model
-                    ).nautobot_device_type_id
-                )
-            except DeviceType.DoesNotExist:
+            _dt = mappings.device_type(_device.make_model)
+            if _dt is None:
+                if _device.make_model in mappings.device_types:
+                    message = f"Device Type for {_device.make_model} does not exist in Nautobot."
+                else:
+                    message = f"Mapping for Auvik model {_device.make_model} does not exist in Nautobot."
                 if self.job.debug:
-                    self.job.logger.warning(
-                        f"Device Type for {_device.attributes.make_model} does not exist in Nautobot. Skipping device {_device.attributes.device_name}."
-                    )
-                    self.skipped_devices.append(_device.id)
+                    self.job.logger.warning(f"{message} Skipping device {_device.device_name}.")
+                self.device_registry.skip(_device.id, message)
                 continue
-            except AuvikDeviceModels.DoesNotExist:
-                if self.job.debug:
-                    self.job.logger.warning(
-                        f"Mapping for Auvik model {_device.attributes.make_model} does not exist in Nautobot. Skipping device {_device.attributes.device_name}."
-                    )
-                    self.skipped_devices.append(_device.id)
-                continue
-            try:
-                _dmanufacturer = Manufacturer.objects.get(
-                    id=AuvikDeviceVendors.objects.get(
-                        auvik_vendor_name=_device.attributes.vendor_name
-                    ).nautobot_manufacturer_id
-                )
-            except Manufacturer.DoesNotExist:
-                if self.job.debug:
-                    self.job.logger.warning(
-                        f"Manufacturer for {_device.attributes.vendor_name} does not exist in Nautobot. Skipping device {_device.attributes.device_name}."
-                    )
-                    self.skipped_devices.append(_device.id)
-                continue
-            except AuvikDeviceVendors.DoesNotExist:
+
+            _dmanufacturer = mappings.manufacturer(_device.vendor_name)
+            if _dmanufacturer is None:
+                if _device.vendor_name in mappings.manufacturers:
+                    message = f"Manufacturer for {_device.vendor_name} does not exist in Nautobot."
+                else:
+                    message = f"Mapping for Auvik vendor {_device.vendor_name} does not exist in Nautobot."
                 if self.job.debug:
-                    self.job.logger.warning(
-                        f"Mapping for Auvik vendor {_device.attributes.vendor_name} does not exist in Nautobot. Skipping device {_device.attributes.device_name}."
-                    )
-                    self.skipped_devices.append(_device.id)
+                    self.job.logger.warning(f"{message} Skipping device {_device.device_name}.")
+                self.device_registry.skip(_device.id, message)
                 continue
 
             monitoring_profile = {
                 "monitoredBy": "auvik",
-                "deviceHostname": _device.attributes.device_name,
+                "deviceHostname": _device.device_name,
                 "monitoringFields": {
                     "deviceId": _device.id,
-                    "deviceSerialNumber": _device.attributes.serial_number,
+                    "deviceSerialNumber": _device.serial_number,
                 },
             }
 
-            role = "Unknown"
-
-            if "CorS".lower() in _device.attributes.device_name.lower():
-                role = "Core Switch"
-            elif "Dist".lower() in _device.attributes.device_name.lower():
-                role = "Distribution Switch"
-            elif "-AP".lower() in _device.attributes.device_name.lower():
-                role = "Wireless Access Point"
-            elif (
-                "CorR".lower() in _device.attributes.device_name.lower()
-                or "CorF".lower() in _device.attributes.device_name.lower()
-            ):
-                role = "Core Gateway"
-            elif (
-                "AccS".lower() in _device.attributes.device_name.lower()
-                or "VSS".lower() in _device.attributes.device_name.lower()
-            ):
-                role = "Access Switch"
-            elif (
-                "UPS".lower() in _device.attributes.device_name.lower()
-                or "-PP".lower() in _device.attributes.device_name.lower()
-                or "APTS".lower() in _device.attributes.device_name.lower()
-                or "CorPP".lower() in _device.attributes.device_name.lower()
-            ):
-                role = "UPS"
+            role = roles[_device.device_name]
             try:
                 device = self.device(
-                    name=_device.attributes.device_name,
-                    device_type=_dt.__str__(),
-                    manufacturer=_dmanufacturer.__str__(),
+                    name=_device.device_name,
+                    device_type=_dt,
+                    manufacturer=_dmanufacturer,
                     location__name=self.building_name.name,
-                    serial=_device.attributes.serial_number,
+                    serial=_device.serial_number,
                     monitoring_profile=monitoring_profile,
                     role=role,
                 )
@@ -339,7 +499,7 @@ class AuvikAdapter(DiffSync):
             interface = self.interface(
                 name="mgmt0",
                 description="Management Interface",
-                device__name=_device.attributes.device_name,
+                device__name=_device.device_name,
                 device__location__name=self.building_name.name,
                 type="virtual",
                 status="Active",
@@ -350,9 +510,9 @@ class AuvikAdapter(DiffSync):
 
             # Load IP Address for mgmt0 interface
 
-            if _device.attributes.ip_addresses is not None:
+            if _device.ip_addresses is not None:
                 regex = r"10\.(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9][0-9]?|[0-9])\.10\.(25[0-5]|2[0-4][0-9]|1[0-9][0-9]|[1-9][0-9]?|[0-9])"
-                for _ip in _device.attributes.ip_addresses:
+                for _ip in _device.ip_addresses:
                     match = re.search(regex, _ip)
                     if match:
                         try:
@@ -363,7 +523,7 @@ class AuvikAdapter(DiffSync):
                                 namespace=self.building_name.name,
                                 interface__name="mgmt0",
                                 status="Active",
-                                device=_device.attributes.device_name,
+                                device=_device.device_name,
                             )
                             self.add(ipaddr)
                             interface.add_child(ipaddr)
@@ -374,6 +534,16 @@ class AuvikAdapter(DiffSync):
             if self.job.debug:
                 self.job.logger.info(f"Added Auvik Device: ```{device.__dict__}```")
 
+        skip_summary = self.device_registry.skip_summary()
+        if skip_summary:
+            self.job.logger.warning(
+                "Skipped devices:\n" + "\n".join(f"{count} x {reason}" for reason, count in skip_summary)
+            )
+
+        mapping_report = mappings.report()
+        if mapping_report:
+            self.job.logger.warning(f"Skipped devices with unmapped Auvik models or vendors:\n{mapping_report}")
+
         if self.job.debug:
             identifiers = tuple(device.get_identifiers() for device in self.get_all("device"))
             print(f"Device Identifiers for DiffSync: ```{identifiers}```")
@@ -385,22 +555,20 @@ class AuvikAdapter(DiffSync):
     def load_interfaces(self):
         """Load interfaces for building from Auvik API."""
         self.job.logger.info("Loading interfaces from Auvik...")
-        for device_id, interfaces in self.interface_data.items():
-            # Skip loading interfaces for devices that were skipped during device loading
-            if device_id in self.skipped_devices:
-                continue
-            for interface in interfaces:
-                interface_name = interface.attributes.interface_name
+        # Devices skipped during device loading are left out, and so are their interfaces
+        for auvik_device in self.device_registry.devices():
+            for interface in auvik_device.interfaces:
+                interface_name = interface.interface_name
                 if interface_name == "me0":
                     continue
 
-                interface_type = interface.attributes.interface_type
+                interface_type = interface.interface_type
                 if interface_type == "ethernet":
                     interface_type = "1000base-t"
                 elif interface_type == "linkAggregation":
                     interface_type = "virtual"
 
-                device_name = self.device_map[device_id].attributes.device_name
+                device_name = auvik_device.name
                 device = self.get(
                     self.device, f"{device_name}__{self.building_name.name}"
                 ) 
@@ -445,14 +613,13 @@ class AuvikAdapter(DiffSync):
     def load_cables(self):
         """Load cables for building from Auvik API."""
         self.job.logger.info("Loading cables from Auvik...")
-        interface_connections = self.get_interface_connections()
-        for _connection in interface_connections:
+        for from_device, from_interface, to_device, to_interface in self.get_interface_connections():
             try:
                 cable = self.cable(
-                    from_device=_connection["from"]["device_name"],
-                    from_interface=_connection["from"]["interface_name"],
-                    to_device=_connection["to"]["device_name"],
-                    to_interface=_connection["to"]["interface_name"],
+                    from_device=from_device,
+                    from_interface=from_interface,
+                    to_device=to_device,
+                    to_interface=to_interface,
                 )
                 self.add(cable)
                 if self.job.debug:
@@ -474,135 +641,31 @@ class AuvikAdapter(DiffSync):
         return None
 
     def get_interface_connections(self):
-        """Get interface connections from Auvik API data."""
-        devices = self.device_data
-        device_info = {}
-        device_interfaces = {}
-        device_interface_names = {}
-
-        # Populate data from API
-        for device in devices:
-            # Skip devices that were skipped during device loading
-            if device.id in self.skipped_devices:
-                continue
-            device_id = device.id
-            device_name = device.attributes.device_name
-            device_interfaces[device_id] = []
-
-            device_info[device_id] = {
-                "device_name": device_name,
-                "device_id": device_id,
-                "interfaces": [],
-            }
-
-            interfaces = self.interface_data[device_id]
-
-            for interface in interfaces:
-                device_interface_names[interface.id] = {
-                    "name": interface.attributes.interface_name,
-                    "device_id": device_id,
-                    "device_name": device_name,
-                }
-                device_interfaces[device_id].append(interface)
-
-        # Process the interfaces to build the connections
-        for device in devices:
-            device_id = device.id
-            device_name = device.attributes.device_name
-            
-            # Skip devices that were skipped during device loading
-            if device_id in self.skipped_devices:
-                continue
-
-            for interface in device_interfaces[device_id]:
-                connected_to = []
-                for connected_to_id in interface.relationships.connected_to.data:
-                    # Only consider interfaces that are in the device_interface_names dictionary
-                    if connected_to_id.id in device_interface_names:
-                        connected_to.append(
-                            {
-                                "connected_interface_id": connected_to_id.id,
-                                "connected_interface_name": device_interface_names.get(connected_to_id.id, "Unknown")[
-                                    "name"
-                                ],
-                                "connected_device_id": device_interface_names.get(connected_to_id.id, "Unknown")[
-                                    "device_id"
-                                ],
-                                "connected_device_name": device_interface_names.get(connected_to_id.id, "Unknown")[
-                                    "device_name"
-                                ],
-                            }
-                        )
-                # Only add interfaces that have exactly one connection
-                # Ignore interfaces without connections
-                # Ignore interfaces with multiple connections because they don't represent physical connections (cables)
-                if len(connected_to) == 1:
-                    device_info[device_id]["interfaces"].append(
-                        {
-                            "interface_id": interface.id,
-                            "interface_name": interface.attributes.interface_name,
-                            "connected_to": connected_to,
-                        }
-                    )
-
-        # Consolidate the connections
-        device_connections = []
-        for device_id, device_data in device_info.items():
-            for interface in device_data["interfaces"]:
-                # Ignore me0 interface as this is not a physical connection
-                if interface["interface_name"] == "me0":
-                    continue
-                # If a physical interface is connected to me0, find the correct connection
-                if interface["connected_to"][0]["connected_interface_name"] == "me0":
-                    correct_connected_to = next(
-                        (iface for iface in device_data["interfaces"] if iface["interface_name"] == "me0"),
-                        None,
-                    )
-                    if correct_connected_to is None:
-                        continue
-                    else:
-                        correct_connected_to = correct_connected_to["connected_to"]
-                    interface["connected_to"] = correct_connected_to
-                device_connections.append(
-                    {
-                        "from": {
-                            "device_id": device_id,
-                            "device_name": device_data["device_name"],
-                            "interface_id": interface["interface_id"],
-                            "interface_name": interface["interface_name"],
-                        },
-                        "to": {
-                            "device_id": interface["connected_to"][0]["connected_device_id"],
-                            "device_name": interface["connected_to"][0]["connected_device_name"],
-                            "interface_id": interface["connected_to"][0]["connected_interface_id"],
-                            "interface_name": interface["connected_to"][0]["connected_interface_name"],
-                        },
-                    }
-                )
+        """
+        Build the cable topology of the devices loaded from Auvik.
 
-        # Remove duplicates from the connections, regardless of direction
-        seen = set()
-        unique_connections = []
-        duplicates_found = 0
+        In an incremental sync, the interfaces of the unchanged devices are indexed too, so that cables from a changed
+        device to an unchanged one are found. Only cables with at least one end on a loaded device are returned.
 
-        for connection in device_connections:
-            conn_tuple = frozenset(
-                {
+        :return: Generator of (from device name, from interface name, to device name, to interface name) tuples.
+        """
+        topology = InterfaceTopology()
+        for device in chain(self.device_registry.devices(), self.unchanged_devices):
+            topology.add_device(
+                device.name,
+                (
                     (
-                        connection["from"]["device_id"],
-                        connection["from"]["interface_id"],
-                    ),
-                    (connection["to"]["device_id"], connection["to"]["interface_id"]),
-                }
+                        interface.id,
+                        interface.interface_name,
+                        interface.connected_to,
+                    )
+                    for interface in device.interfaces
+                ),
             )
-            if conn_tuple not in seen:
-                seen.add(conn_tuple)
-                unique_connections.append(connection)
-            else:
-                duplicates_found += 1
-                pass
-
-        return unique_connections
+        if not self.unchanged_devices:
+            return topology.cables()
+        loaded = {device.name for device in self.device_registry.devices()}
+        return (cable for cable in topology.cables() if cable[0] in loaded or cable[2] in loaded)
 
     # def get_interface_connections(self):
     #     """Get interface connections from Auvik API."""
@@ -5,12 +5,17 @@ from collections import defaultdict
 from diffsync import DiffSync
 from diffsync.exceptions import ObjectAlreadyExists
 
-from django.db.models import Q
+from django.db.models import Prefetch, Q
 
-from nautobot.dcim.models import Location, LocationType, Device, Cable, Interface
+from nautobot.dcim.models import Location, Device, Cable, Interface
 from nautobot.ipam.models import Namespace, VLANGroup, VLAN, Prefix, IPAddress
 
 from ..models.nautobot import dcim
+from ...utils.bulk import AuvikWriteQueue, LocationBulkWriter
+from ...utils.queries import QueryCounter
+from ...utils.reference_data import ReferenceDataCache
+from ...utils.transactions import SyncTransactions
+from ....helpers.config import get_app_setting
 from ....models import AuvikTenantBuildingRelationship
 
 
@@ -25,23 +30,43 @@ class NautobotAdapter(DiffSync):
     building_map = {}
     room_map = {}
 
-    def __init__(self, *args, job, sync=None, **kwargs):
-        """Initialize the Nautobot DiffSync adapter."""
+    def __init__(self, *args, job, sync=None, bulk_import=False, transaction_strategy="autocommit", **kwargs):
+        """
+        Initialize the Nautobot DiffSync adapter.
+
+        :param bulk_import: Buffer created buildings and rooms and write them with bulk_create when the sync completes.
+        :param transaction_strategy: How writes are grouped into transactions, see TRANSACTION_STRATEGY_CHOICES.
+        """
         super().__init__(*args, **kwargs)
         self.job = job
         self.sync = sync
         self.objects_to_delete = defaultdict(list)
+        self.reference_data = ReferenceDataCache()
+        self.bulk_writer = (
+            LocationBulkWriter(job, batch_size=get_app_setting("bulk_create_batch_size")) if bulk_import else None
+        )
+        self.transactions = SyncTransactions(
+            transaction_strategy,
+            top_level=self.top_level,
+            batch_size=get_app_setting("transaction_batch_size"),
+            logger=job.logger,
+            reference_data=self.reference_data,
+        )
 
     def sync_complete(self, source: DiffSync, *args, **kwargs):
         """Clean up function for DiffSync sync.
 
+        Writes buildings and rooms buffered in bulk import mode.
         Deletes objects from Nautobot that need to be deleted in a specific order.
         """
+        if self.bulk_writer is not None:
+            self.bulk_writer.flush(self.building_map, self.room_map)
+        self.reference_data.clear()
         return super().sync_complete(source, *args, **kwargs)
 
     def load_buildings(self):
         """Add Nautobot Location objects as DiffSync Building models."""
-        for building in Location.objects.filter(location_type=LocationType.objects.get_or_create(name="Building")[0]):
+        for building in Location.objects.filter(location_type=self.reference_data.location_type("Building")):
             self.building_map[building.name] = building.id
             try:
                 building = self.building(
@@ -66,7 +91,7 @@ class NautobotAdapter(DiffSync):
 
     def load_rooms(self):
         """Add Nautobot Location objects as DiffSync Room models."""
-        for _room in Location.objects.filter(location_type=LocationType.objects.get_or_create(name="Room")[0]):
+        for _room in Location.objects.filter(location_type=self.reference_data.location_type("Room")):
             # What are we doing with room_map here? Is it necessary?
             if _room.parent.name not in self.room_map:
                 self.room_map[_room.parent.name] = {}
@@ -122,12 +147,35 @@ class NautobotAuvikAdapter(DiffSync):
         "cable",
     )
 
-    def __init__(self, *args, job, sync=None, **kwargs):
-        """Initialize the Nautobot DiffSync adapter."""
+    # Number of interface rows fetched from the database at a time by load_interfaces
+    interface_chunk_size = 2000
+
+    def __init__(self, *args, job, sync=None, deferred_writes=False, transaction_strategy="autocommit", **kwargs):
+        """
+        Initialize the Nautobot DiffSync adapter.
+
+        :param deferred_writes: Queue created and updated objects and write them in bulk when the sync completes.
+        :param transaction_strategy: How writes are grouped into transactions, see TRANSACTION_STRATEGY_CHOICES.
+        """
         super().__init__(*args, **kwargs)
         self.job = job
         self.sync = sync
         self.objects_to_delete = defaultdict(list)
+        self.reference_data = ReferenceDataCache()
+        # Names of the devices the source adapter loaded in an incremental sync, or None to load all devices
+        self.incremental_device_names = getattr(job, "incremental_device_names", None)
+        self.write_queue = (
+            AuvikWriteQueue(job, self.reference_data, batch_size=get_app_setting("bulk_create_batch_size"))
+            if deferred_writes
+            else None
+        )
+        self.transactions = SyncTransactions(
+            transaction_strategy,
+            top_level=self.top_level,
+            batch_size=get_app_setting("transaction_batch_size"),
+            logger=job.logger,
+            reference_data=self.reference_data,
+        )
         try:
             # self.building_name = Location.objects.get(
             #     id=AuvikTenantBuildingRelationship.objects.get(auvik_tenant=self.job.building_to_sync).building.id
@@ -143,8 +191,12 @@ class NautobotAuvikAdapter(DiffSync):
     def sync_complete(self, source: DiffSync, *args, **kwargs):
         """Clean up function for DiffSync sync.
 
+        Writes objects queued in deferred write mode.
         Deletes objects from Nautobot that need to be deleted in a specific order.
         """
+        if self.write_queue is not None:
+            self.write_queue.flush()
+        self.reference_data.clear()
         return super().sync_complete(source, *args, **kwargs)
 
     def load_namespaces(self):
@@ -243,6 +295,31 @@ class NautobotAuvikAdapter(DiffSync):
                 if self.job.debug:
                     self.job.logger.info(f"Prefix already exists: {err}")
 
+    def device_queryset(self, building):
+        """
+        Return the devices in a building with everything load_devices needs fetched up front.
+
+        Related objects are joined in, and the mgmt0 interface of each device is prefetched with its IP addresses
+        into a mgmt_interfaces list, so loading devices costs a fixed number of queries regardless of device count.
+
+        :param building: The building Location to load devices for.
+        :return: A Device queryset.
+        """
+        mgmt_ip_addresses = IPAddress.objects.select_related("status", "parent__namespace")
+        mgmt_interfaces = Interface.objects.filter(name="mgmt0").select_related("status")
+        devices = Device.objects.filter(location=building)
+        if self.incremental_device_names is not None:
+            devices = devices.filter(name__in=self.incremental_device_names)
+        return devices.select_related("location", "status", "device_type__manufacturer", "role").prefetch_related(
+            Prefetch(
+                "interfaces",
+                queryset=mgmt_interfaces.prefetch_related(
+                    Prefetch("ip_addresses", queryset=mgmt_ip_addresses, to_attr="mgmt_ip_addresses")
+                ),
+                to_attr="mgmt_interfaces",
+            )
+        )
+
     def load_devices(self):
         """Load devices for building from Nautobot."""
         try:
@@ -252,7 +329,9 @@ class NautobotAuvikAdapter(DiffSync):
                 self.job.logger.info(f"Building {self.building_name} does not exist in Nautobot. Not loading devices.")
             return
 
-        devices = Device.objects.filter(location=building)
+        with QueryCounter() as queries:
+            devices = list(self.device_queryset(building))
+
         for _device in devices:
             device = self.device(
                 name=_device.name,
@@ -274,105 +353,103 @@ class NautobotAuvikAdapter(DiffSync):
                     self.job.logger.info(f"Device already exists: {err}")
 
             # Load management interface for device
+            if not _device.mgmt_interfaces:
+                if self.job.debug:
+                    self.job.logger.info(f"Device {device.name} does not have a management interface. Not loading.")
+                continue
+            _interface = _device.mgmt_interfaces[0]
+            interface = self.interface(
+                name=_interface.name,
+                description=_interface.description,
+                device__name=_device.name,
+                device__location__name=_device.location.name,
+                type=_interface.type,
+                status=_interface.status.name,
+                mgmt_only=_interface.mgmt_only,
+            )
             try:
-                _interface = _device.interfaces.get(name="mgmt0")
-                if _interface is not None:
-                    interface = self.interface(
-                        name=_interface.name,
-                        description=_interface.description,
-                        device__name=_device.name,
-                        device__location__name=_device.location.name,
-                        type=_interface.type,
-                        status=_interface.status.name,
-                        mgmt_only=_interface.mgmt_only,
-                    )
-                    self.add(interface)
-                    device.add_child(child=interface)
-            except Exception as e:
+                self.add(interface)
+                device.add_child(child=interface)
+            except ObjectAlreadyExists as err:
                 if self.job.debug:
-                    self.job.logger.info(
-                        f"Device {device.name} does not have a management interface. Not loading. ({e})"
-                    )
+                    self.job.logger.info(f"Interface already exists: {err}")
+                continue
 
             # Load management IP address for device
-            try:
-                _ipaddr = _interface.ip_addresses.get()
-                if _ipaddr is not None:
-                    if self.job.debug:
-                        self.job.logger.info(f"IP Address: {_ipaddr.address} found in Nautobot for {device.name}.")
-                    ipaddr = self.ipaddr(
-                        address=_ipaddr.host,
-                        namespace=_ipaddr.parent.namespace.name,
-                        interface__name=_interface.name,
-                        status=_ipaddr.status.name,
-                        device=_device.name,
-                    )
-                    self.add(ipaddr)
-                    interface.add_child(child=ipaddr)
-                else:
-                    # Add check to see if IP address already exists
+            if len(_interface.mgmt_ip_addresses) != 1:
+                if self.job.debug:
                     self.job.logger.info(
-                        f"IP Address not linked to mgmt0, checking if it exists in Nautobot at all: {_ipaddr.address} ."
+                        f"Device {device.name} has {len(_interface.mgmt_ip_addresses)} IP addresses on "
+                        f"{_interface.name}, expected one management IP address. Not loading."
                     )
-                    _existing_ipaddr = IPAddress.objects.get(address=_ipaddr.address)
-                    if _existing_ipaddr is not None:
-                        if self.job.debug:
-                            self.job.logger.info(
-                                f"IP Address: {_ipaddr.address} already exists in Nautobot but not assigned to this interface {_interface.name}."
-                            )
-                            ipaddr = self.ipaddr(
-                                address=_existing_ipaddr.address,
-                                namespace=_existing_ipaddr.parent.namespace.name,
-                                interface__name=None,
-                                status=_existing_ipaddr.status.name,
-                                device=None,
-                            )
-                            self.add(ipaddr)
-                    else:
-                        if self.job.debug:
-                            self.job.logger.info(
-                                f"IP Address: {_ipaddr.address} not found in Nautobot. Not loading IP Address."
-                            )
+                continue
+            _ipaddr = _interface.mgmt_ip_addresses[0]
+            if self.job.debug:
+                self.job.logger.info(f"IP Address: {_ipaddr.address} found in Nautobot for {device.name}.")
+            try:
+                ipaddr = self.ipaddr(
+                    address=_ipaddr.host,
+                    namespace=_ipaddr.parent.namespace.name,
+                    interface__name=_interface.name,
+                    status=_ipaddr.status.name,
+                    device=_device.name,
+                )
+                self.add(ipaddr)
+                interface.add_child(child=ipaddr)
             except AttributeError as err:
                 if self.job.debug:
                     self.job.logger.info(
                         f"Device {device.name} does not have a management IP address. Not loading. Error: {err}"
                     )
-            except ValueError as err:
-                if self.job.debug:
-                    self.job.logger.info(f"Value Error: {err}")
-            except Exception as err:
+            except ObjectAlreadyExists as err:
                 if self.job.debug:
-                    self.job.logger.info(
-                        f"Device {device.name} does not have a management IP address. Not loading. Interface details: {_interface.__dict__}. Exception: {err}"
-                    )
+                    self.job.logger.info(f"IP Address already exists: {err}")
+
+        if self.job.debug:
+            self.job.logger.info(f"Loaded {len(devices)} devices from Nautobot in {queries.count} database queries.")
 
     def load_interfaces(self):
-        """Load interfaces for devices from Nautobot."""
-        try:
-            interfaces = Interface.objects.filter(device__location__name=self.building_name)
-        except Interface.DoesNotExist:
-            if self.job.debug:
-                self.job.logger.info(f"No interfaces found for {self.device.name} in Nautobot. Not loading.")
-            return
+        """
+        Load interfaces for devices from Nautobot.
 
-        for _interface in interfaces:
-            if _interface.name == "mgmt0":
-                continue
+        Interfaces are read as plain rows with only the columns needed, in chunks, without instantiating Interface
+        objects. This keeps memory and time in check for buildings with tens of thousands of switch ports.
+        """
+        devices = {device.get_unique_id(): device for device in self.get_all(self.device)}
+        interfaces = Interface.objects.filter(device__location__name=self.building_name).exclude(name="mgmt0")
+        if self.incremental_device_names is not None:
+            interfaces = interfaces.filter(device__name__in=self.incremental_device_names)
+        interfaces = interfaces.values_list(
+            "name", "device__name", "device__location__name", "type", "status__name", "_custom_field_data"
+        )
+
+        with QueryCounter() as queries:
+            loaded = 0
+            for name, device_name, location_name, _type, status, custom_field_data in interfaces.iterator(
+                chunk_size=self.interface_chunk_size
+            ):
+                _device = devices.get(f"{device_name}__{location_name}")
+                if _device is None:
+                    if self.job.debug:
+                        self.job.logger.info(f"Device {device_name} for interface {name} is not loaded. Not loading.")
+                    continue
+
+                interface = self.interface(
+                    name=name,
+                    device__name=device_name,
+                    device__location__name=location_name,
+                    type=_type,
+                    status=status,
+                    monitoring_profile=(custom_field_data or {}).get("monitoring_profile"),
+                )
+                self.add(interface)
+                _device.add_child(child=interface)
+                loaded += 1
+                if self.job.debug:
+                    self.job.logger.info(f"Added Nautobot Interface: ```{interface.__dict__}```")
 
-            interface = self.interface(
-                name=_interface.name,
-                device__name=_interface.device.name,
-                device__location__name=_interface.device.location.name,
-                type=_interface.type,
-                status=_interface.status.name,
-                monitoring_profile=_interface.custom_field_data.get("monitoring_profile"),
-            )
-            self.add(interface)
-            _device = self.get(self.device, f"{_interface.device.name}__{_interface.device.location.name}")
-            _device.add_child(child=interface)
-            if self.job.debug:
-                self.job.logger.info(f"Added Nautobot Interface: ```{interface.__dict__}```")
+        if self.job.debug:
+            self.job.logger.info(f"Loaded {loaded} interfaces from Nautobot in {queries.count} database queries.")
 
     # def load_ipaddrs(self):
     #     """
@@ -383,26 +460,55 @@ class NautobotAuvikAdapter(DiffSync):
     #     pass
 
     def load_cables(self):
-        """Load cables for devices from Nautobot."""
-        try:
+        """
+        Load cables for devices from Nautobot.
+
+        Cables are read in one query with the names of the devices at each end, and the names of the interfaces at
+        each end are then read in a second query. Cables with a termination that is not an interface, such as a
+        front or rear port, are skipped.
+        """
+        interface_type = self.reference_data.content_type(Interface)
+        with QueryCounter() as queries:
             cables = Cable.objects.filter(
-                Q(_termination_b_device_id__in=Device.objects.filter(location__name=self.building_name))
-                | Q(_termination_a_device_id__in=Device.objects.filter(location__name=self.building_name))
+                Q(_termination_a_device__location__name=self.building_name)
+                | Q(_termination_b_device__location__name=self.building_name)
             )
-        except Cable.DoesNotExist:
-            if self.job.debug:
-                self.job.logger.info(f"No cables found for {self.building_name} in Nautobot. Not loading.")
-            return
-
-        for _cable in cables:
+            if self.incremental_device_names is not None:
+                cables = cables.filter(
+                    Q(_termination_a_device__name__in=self.incremental_device_names)
+                    | Q(_termination_b_device__name__in=self.incremental_device_names)
+                )
+            cables = list(
+                cables.values_list(
+                    "termination_a_type_id",
+                    "termination_a_id",
+                    "_termination_a_device__name",
+                    "termination_b_type_id",
+                    "termination_b_id",
+                    "_termination_b_device__name",
+                )
+            )
+            interface_ids = {
+                termination_id
+                for a_type, a_id, _, b_type, b_id, _ in cables
+                for termination_type, termination_id in ((a_type, a_id), (b_type, b_id))
+                if termination_type == interface_type.id
+            }
+            interface_names = dict(Interface.objects.filter(id__in=interface_ids).values_list("id", "name"))
+
+        for a_type, a_id, a_device, b_type, b_id, b_device in cables:
+            if a_id not in interface_names or b_id not in interface_names:
+                if self.job.debug:
+                    self.job.logger.info(
+                        f"Cable between {a_device} and {b_device} does not terminate on interfaces. Not loading."
+                    )
+                continue
             try:
-                _termination_a_interface_name = Interface.objects.get(id=_cable.termination_a_id).name
-                _termination_b_interface_name = Interface.objects.get(id=_cable.termination_b_id).name
                 cable = self.cable(
-                    from_device=_cable._termination_a_device.name,
-                    from_interface=_termination_a_interface_name,
-                    to_device=_cable._termination_b_device.name,
-                    to_interface=_termination_b_interface_name,
+                    from_device=a_device,
+                    from_interface=interface_names[a_id],
+                    to_device=b_device,
+                    to_interface=interface_names[b_id],
                 )
                 self.add(cable)
                 if self.job.debug:
@@ -410,9 +516,9 @@ class NautobotAuvikAdapter(DiffSync):
             except ObjectAlreadyExists as err:
                 if self.job.debug:
                     self.job.logger.info(f"Cable already exists: {err}")
-            except Interface.DoesNotExist:
-                if self.job.debug:
-                    self.job.logger.info("Interface for cable does not exist in Nautobot. Not loading.")
+
+        if self.job.debug:
+            self.job.logger.info(f"Loaded {len(cables)} cables from Nautobot in {queries.count} database queries.")
 
     # TODO: Implement (parent) load_devices, (-> child) load_interfaces (mgmt if) and (-> child) load_ipaddrs (mgmt ip) methods
     # Load only one interface per device. The interface will be the management interface for the device.
@@ -1,12 +1,9 @@
 """DiffSyncModel DCIM subclasses for Nautobot data sync."""
 
 from django.core.exceptions import ValidationError
-from django.contrib.contenttypes.models import ContentType
 
 from nautobot.dcim.models import Location as OrmLocation
-from nautobot.dcim.models import LocationType as OrmLocationType
 from nautobot.ipam.models import Namespace as OrmNamespace
-from nautobot.extras.models import Status as OrmStatus
 from nautobot.ipam.models import VLANGroup as OrmVLANGroup
 from nautobot.ipam.models import VLAN as OrmVLAN
 from nautobot.ipam.models import Prefix as OrmPrefix
@@ -14,7 +11,6 @@ from nautobot.dcim.models import Device as OrmDevice
 from nautobot.dcim.models import DeviceType as OrmDeviceType
 from nautobot.dcim.models import Manufacturer as OrmManufacturer
 from nautobot.dcim.models import Cable as OrmCable
-from nautobot.extras.models import Role as OrmRole
 from nautobot.dcim.models import Interface as OrmInterface
 from nautobot.ipam.models import IPAddress as OrmIPAddress
 from nautobot.ipam.models import IPAddressToInterface
@@ -30,19 +26,27 @@ from ..base.dcim import Device
 from ..base.dcim import Interface
 from ..base.dcim import IPAddress
 from ..base.dcim import Cable
+from ....utils.bulk import NEW_INTERFACE_DESCRIPTION
+from ....utils.transactions import in_sync_transaction
 
 
 class NautobotBuilding(Building):
     """Nautobot Building model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Building object in Nautobot."""
         if diffsync.job.debug:
             diffsync.job.logger.info(f"Creating Building: {ids['name']}")
-        loc_type = OrmLocationType.objects.get_or_create(name="Building")[0]
-        status = OrmStatus.objects.get(name="Planned")
+        loc_type = diffsync.reference_data.location_type("Building")
+        status = diffsync.reference_data.status("Planned")
         new_building = OrmLocation(name=ids["name"], status=status, location_type=loc_type)
+        if diffsync.bulk_writer is not None:
+            if attrs.get("external_id"):
+                new_building.custom_field_data.update({"external_id": attrs["external_id"]})
+            diffsync.bulk_writer.add_building(new_building)
+            return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
         new_building.validated_save()
         if attrs.get("external_id"):
             new_building.custom_field_data.update({"external_id": attrs["external_id"]})
@@ -52,6 +56,7 @@ class NautobotBuilding(Building):
         diffsync.building_map[ids["name"]] = new_building.id
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Building object in Nautobot."""
         _building = OrmLocation.objects.get(id=self.uuid)
@@ -62,7 +67,7 @@ class NautobotBuilding(Building):
         building, otherwise leave as is
         """
         if attrs.get("status__name"):
-            _building.status = OrmStatus.objects.get(name=attrs["status__name"])
+            _building.status = self.diffsync.reference_data.status(attrs["status__name"])
         if attrs.get("longitude"):
             _building.longitude = attrs["longitude"]
         if attrs.get("latitude"):
@@ -88,18 +93,22 @@ class NautobotRoom(Room):
     """Nautobot Room model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Room object in Nautobot."""
         if diffsync.job.debug:
             diffsync.job.logger.info(f"Creating Room: {ids['name']}")
         try:
-            loc_type = OrmLocationType.objects.get_or_create(name="Room")[0]
-            status = OrmStatus.objects.get(name="Planned")
+            loc_type = diffsync.reference_data.location_type("Room")
+            status = diffsync.reference_data.status("Planned")
             new_room = OrmLocation(name=ids["name"], status=status, location_type=loc_type)
             # new_room.validated_save()
             if ids.get("external_id"):
                 new_room.custom_field_data.update({"external_id": ids["external_id"]})
                 # new_room.validated_save()
+            if diffsync.bulk_writer is not None:
+                diffsync.bulk_writer.add_room(new_room, ids.get("parent__name"))
+                return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
             if ids.get("parent__name"):
                 parent = OrmLocation.objects.get(name=ids["parent__name"])
                 new_room.parent = parent
@@ -115,6 +124,7 @@ class NautobotRoom(Room):
             return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Room object in Nautobot."""
         _room = OrmLocation.objects.get(id=self.uuid)
@@ -123,7 +133,7 @@ class NautobotRoom(Room):
         # We wouldn't update any room fields, perhaps just the status if the room is marked as inactive?
         if attrs.get("status__name"):
             if attrs["status__name"] == "Retired":
-                _room.status = OrmStatus.objects.get(name="Retired")
+                _room.status = self.diffsync.reference_data.status("Retired")
         _room.validated_save()
         return super().update(attrs)
 
@@ -148,6 +158,7 @@ class NautobotNamespace(Namespace):
     """Nautobot Namespace model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Namespace object in Nautobot."""
         if diffsync.job.debug:
@@ -161,6 +172,7 @@ class NautobotNamespace(Namespace):
         # diffsync.namespace_map[ids["name"]] = new_namespace.id
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Namespace object in Nautobot."""
         _namespace = OrmNamespace.objects.get(name=self.name)
@@ -188,6 +200,7 @@ class NautobotVLANGroup(VLANGroup):
     """Nautobot VLANGroup model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create VLANGroup object in Nautobot."""
         if diffsync.job.debug:
@@ -201,6 +214,7 @@ class NautobotVLANGroup(VLANGroup):
             return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update VLANGroup object in Nautobot."""
         _vlangroup = OrmVLANGroup.objects.get(name=self.name)
@@ -226,6 +240,7 @@ class NautobotVLAN(VLAN):
     """Nautobot VLAN model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create VLAN object in Nautobot."""
         if diffsync.job.debug:
@@ -233,7 +248,7 @@ class NautobotVLAN(VLAN):
 
         try:
             vlan_group = OrmVLANGroup.objects.get(name=ids["vlangroup"])
-            status = OrmStatus.objects.get(name="Active")
+            status = diffsync.reference_data.status("Active")
             location = OrmLocation.objects.get(name=attrs["location__name"])
             new_vlan = OrmVLAN(
                 name=ids["name"], vid=ids["vid"], vlan_group=vlan_group, status=status, location=location
@@ -244,6 +259,7 @@ class NautobotVLAN(VLAN):
             return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update VLAN object in Nautobot."""
         _vlan = OrmVLAN.objects.get(name=self.name)
@@ -268,6 +284,7 @@ class NautobotPrefix(Prefix):
     """Nautobot Prefix model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Prefix object in Nautobot."""
         if diffsync.job.debug:
@@ -275,7 +292,7 @@ class NautobotPrefix(Prefix):
 
         try:
             namespace = OrmNamespace.objects.get(name=ids["namespace"])
-            status = OrmStatus.objects.get(name="Active")
+            status = diffsync.reference_data.status("Active")
             new_prefix = OrmPrefix(
                 prefix=ids["prefix"],
                 namespace=namespace,
@@ -289,6 +306,7 @@ class NautobotPrefix(Prefix):
             return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Prefix object in Nautobot."""
         try:
@@ -320,13 +338,17 @@ class NautobotDevice(Device):
     """Nautobot Device model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Device object in Nautobot."""
         if diffsync.job.debug:
             diffsync.job.logger.info(f"Creating Device: {ids['name']}")
+        if diffsync.write_queue is not None:
+            diffsync.write_queue.add_create("device", ids, attrs)
+            return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
         try:
             location = OrmLocation.objects.get(name=ids["location__name"])
-            status = OrmStatus.objects.get(name="Active")
+            status = diffsync.reference_data.status("Active")
             manufacturer = OrmManufacturer.objects.get(name=attrs["manufacturer"])
             device_type = OrmDeviceType.objects.get(model=attrs["device_type"], manufacturer=manufacturer)
             new_device = OrmDevice(
@@ -340,18 +362,20 @@ class NautobotDevice(Device):
             if attrs.get("monitoring_profile"):
                 new_device.custom_field_data.update({"monitoring_profile": attrs["monitoring_profile"]})
             if attrs.get("role"):
-                role = OrmRole.objects.get_or_create(name=attrs["role"])[0]
-                role.content_types.add(ContentType.objects.get_for_model(OrmDevice))
-                new_device.role = role
+                new_device.role = diffsync.reference_data.role(attrs["role"], OrmDevice)
             new_device.validated_save()
         except ValidationError as e:
             diffsync.job.logger.error(f"Failed to create Device: {e} - {ids['name']}")
             return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Device object in Nautobot."""
         self.diffsync.job.logger.info(f"Attempting device update in Nautobot for device with name: {self.name} ")
+        if self.diffsync.write_queue is not None:
+            self.diffsync.write_queue.add_update("device", self.get_identifiers(), attrs)
+            return super().update(attrs)
         try:
             _device = OrmDevice.objects.get(name=self.name)
             if self.diffsync.job.debug:
@@ -385,12 +409,16 @@ class NautobotInterface(Interface):
     """Nautobot Interface model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Interface object in Nautobot."""
         if diffsync.job.debug:
             diffsync.job.logger.info(
                 f"Creating Interface if it doesn't already exist: {ids['name']} - {ids['device__name']} - {ids['device__location__name']}"
             )
+        if diffsync.write_queue is not None:
+            diffsync.write_queue.add_create("interface", ids, attrs)
+            return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
         try:
             existing_interface = OrmInterface.objects.get(
@@ -410,15 +438,13 @@ class NautobotInterface(Interface):
         except OrmInterface.DoesNotExist:
             try:
                 device = OrmDevice.objects.get(name=ids["device__name"], location__name=ids["device__location__name"])
-                status = OrmStatus.objects.get(name=attrs["status"])
+                status = diffsync.reference_data.status(attrs["status"])
                 if ids["name"] != "mgmt0":
-                    status = OrmStatus.objects.get(
-                        name="Planned"
+                    status = diffsync.reference_data.status(
+                        "Planned"
                     )  # Set status to Planned for new interfaces from Auvik, because they will need to be validated.
                 if attrs["description"] is None:
-                    attrs["description"] = (
-                        "Interface created by Auvik Sync, please validate and update/remove interface status and this notice once complete."
-                    )
+                    attrs["description"] = NEW_INTERFACE_DESCRIPTION
                 new_interface = OrmInterface(
                     name=ids["name"],
                     device=device,
@@ -437,8 +463,12 @@ class NautobotInterface(Interface):
                 return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Interface object in Nautobot."""
+        if self.diffsync.write_queue is not None:
+            self.diffsync.write_queue.add_update("interface", self.get_identifiers(), attrs)
+            return super().update(attrs)
         try:
             _interface = OrmInterface.objects.get(
                 name=self.name, device__name=self.device__name, device__location__name=self.device__location__name
@@ -483,14 +513,18 @@ class NautobotIPAddress(IPAddress):
     """Nautobot IPAddress model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create IPAddress object in Nautobot."""
         if diffsync.job.debug:
             diffsync.job.logger.info(f"Creating IPAddress: {ids['address']}")
+        if diffsync.write_queue is not None:
+            diffsync.write_queue.add_create("ipaddr", ids, attrs)
+            return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
         try:
             namespace = OrmNamespace.objects.get(name=ids["namespace"])
-            status = OrmStatus.objects.get(name=attrs["status"])
+            status = diffsync.reference_data.status(attrs["status"])
             try:
                 existing_ip = OrmIPAddress.objects.get(address=ids["address"])
                 ipaddress = existing_ip
@@ -530,6 +564,7 @@ class NautobotIPAddress(IPAddress):
 
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update IPAddress object in Nautobot."""
         if self.diffsync.job.debug:
@@ -554,12 +589,16 @@ class NautobotCable(Cable):
     """Nautobot Cable model."""
 
     @classmethod
+    @in_sync_transaction
     def create(cls, diffsync, ids, attrs):
         """Create Cable object in Nautobot."""
         if diffsync.job.debug:
             diffsync.job.logger.info(
                 f"Creating Cable: {ids['from_device']}:{ids['from_interface']} <-> {ids['to_device']}:{ids['to_interface']}"
             )
+        if diffsync.write_queue is not None:
+            diffsync.write_queue.add_create("cable", ids, attrs)
+            return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
         try:
             from_device = OrmDevice.objects.get(name=ids["from_device"])
@@ -587,11 +626,11 @@ class NautobotCable(Cable):
             return None
         try:
             new_cable = OrmCable(
-                termination_a_type=ContentType.objects.get(app_label="dcim", model="interface"),
+                termination_a_type=diffsync.reference_data.content_type(OrmInterface),
                 termination_a_id=from_interface.id,
-                termination_b_type=ContentType.objects.get(app_label="dcim", model="interface"),
+                termination_b_type=diffsync.reference_data.content_type(OrmInterface),
                 termination_b_id=to_interface.id,
-                status=OrmStatus.objects.get(name="Connected"),
+                status=diffsync.reference_data.status("Connected"),
             )
             new_cable.validated_save()
         except ValidationError as e:
@@ -601,6 +640,7 @@ class NautobotCable(Cable):
             return None
         return super().create(ids=ids, diffsync=diffsync, attrs=attrs)
 
+    @in_sync_transaction
     def update(self, attrs):
         """Update Cable object in Nautobot."""
         _cable = OrmCable.objects.get(termination_a_id=self.termination_a_id, termination_b_id=self.termination_b_id)
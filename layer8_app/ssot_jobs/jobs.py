@@ -1,8 +1,14 @@
 """Jobs for Layer8 integration with SSoT App."""
 
+import resource
+import time
+
 from diffsync.enum import DiffSyncFlags
 from django.urls import reverse
-from nautobot.extras.jobs import BooleanVar, ObjectVar
+from nautobot.core.celery import app as celery_app
+from nautobot.extras.choices import JobResultStatusChoices
+from nautobot.extras.jobs import BooleanVar, ChoiceVar, DryRunVar, IntegerVar, Job, MultiObjectVar, ObjectVar
+from nautobot.extras.models import Job as JobModel, JobResult
 from nautobot_ssot.jobs.base import DataSource, DataMapping
 
 from .diffsync.adapters.layer8 import Layer8Adapter
@@ -11,8 +17,12 @@ from .diffsync.adapters.nautobot import NautobotAdapter, NautobotAuvikAdapter
 
 import openapi_client
 
+from ..helpers.auvik_api import get_auvik_api_client_stats
+from ..helpers.auvik_scheduler import get_auvik_scheduler
 from ..helpers.get_m2m_token import get_api_token
+from ..helpers.secrets import get_secret_cache_stats
 from ..models import AuvikTenantBuildingRelationship
+from .utils.transactions import TRANSACTION_STRATEGY_CHOICES
 
 name = "Wavenet App SSoT Jobs"  # pylint:disable=invalid-name
 
@@ -28,11 +38,26 @@ def tenant_api(get_api_token=get_api_token):
     return api_instance
 
 
+def peak_rss_mib():
+    """Return the peak resident set size of the current process in MiB."""
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
 class Layer8DataSource(DataSource):
     """Class to provide a data source for Layer8 integration with SSoT App."""
 
     debug = BooleanVar(description="Enable for more verbose debug logging", default=False)
-    bulk_import = BooleanVar(description="Enable using bulk create option for object creation.", default=False)
+    bulk_import = BooleanVar(
+        description="Enable using bulk create option for object creation. Buildings and rooms created in bulk get no change log entries and do not trigger webhooks, job hooks or other post_save signal handlers.",
+        default=False,
+    )
+    transaction_strategy = ChoiceVar(
+        choices=TRANSACTION_STRATEGY_CHOICES,
+        default="autocommit",
+        description="How writes to Nautobot are grouped into database transactions. Objects failing with a database error are rolled back on their own.",
+        required=False,
+    )
 
     class Meta:
         """Metadata for the data source."""
@@ -69,19 +94,29 @@ class Layer8DataSource(DataSource):
         if self.debug:
             self.logger.info("Loading data from Wavenet Tenant API.")
         self.source_adapter.load()
+        if self.debug:
+            self.logger.info(f"Secret cache: {get_secret_cache_stats()}")
 
     def load_target_adapter(self):
         """Load data from Nautobot into DiffSync models."""
-        self.target_adapter = NautobotAdapter(job=self, sync=self.sync)
+        self.target_adapter = NautobotAdapter(
+            job=self, sync=self.sync, bulk_import=self.bulk_import, transaction_strategy=self.transaction_strategy
+        )
         if self.debug:
             self.logger.info("Loading data from Nautobot.")
         self.target_adapter.load()
 
+    def execute_sync(self):
+        """Write the diff to Nautobot, grouping writes into transactions according to the transaction strategy."""
+        with self.target_adapter.transactions:
+            super().execute_sync()
+
     def run(  # pylint: disable=arguments-differ, too-many-arguments
-        self, dryrun, memory_profiling, debug, bulk_import, *args, **kwargs
+        self, dryrun, memory_profiling, debug, bulk_import, transaction_strategy="autocommit", *args, **kwargs
     ):
         """Perform data syncrhonization."""
         self.bulk_import = bulk_import
+        self.transaction_strategy = transaction_strategy or "autocommit"
         self.debug = debug
         self.dryrun = dryrun
         self.memory_profiling = memory_profiling
@@ -106,6 +141,35 @@ class AuvikDataSource(DataSource):
         },
     )
 
+    response_cache_max_age = IntegerVar(
+        description="Replay Auvik API responses cached on disk by previous runs if they are newer than this many seconds. Leave at 0 to always fetch from Auvik.",
+        label="Auvik response cache max age (seconds)",
+        default=0,
+        min_value=0,
+        required=False,
+    )
+
+    deferred_writes = BooleanVar(
+        description="Queue the devices, interfaces, IP addresses and cables to create or update and write them in bulk, in a single transaction, once the diff has been processed. Devices, interfaces and IP address assignments written in bulk get no change log entries and do not trigger webhooks, job hooks or other post_save signal handlers.",
+        default=False,
+    )
+
+    transaction_strategy = ChoiceVar(
+        choices=TRANSACTION_STRATEGY_CHOICES,
+        default="autocommit",
+        description="How writes to Nautobot are grouped into database transactions. Objects failing with a database error are rolled back on their own.",
+        required=False,
+    )
+
+    incremental = BooleanVar(
+        description="Only synchronize devices that changed in Auvik since the last sync of the building. A full sync is still run when one is due.",
+        default=False,
+    )
+    full_sync = BooleanVar(
+        description="With incremental sync enabled, synchronize every device now and reset the change tracking.",
+        default=False,
+    )
+
     # Add DiffSync_Flags to skip unmatched records in Nautobot
     # i.e. if a record is in Nautobot but not in Auvik, it will not be deleted
     # This is useful for keeping records in Nautobot that are not present in / managed by Auvik
@@ -143,26 +207,80 @@ class AuvikDataSource(DataSource):
         """Load data from Auvik into DiffSync models."""
         if self.debug:
             self.logger.info("Connecting to Auvik API...")
+        connection_stats = get_auvik_api_client_stats()
+        peak_rss_before = peak_rss_mib()
         self.source_adapter = AuvikAdapter(job=self, sync=self.sync, building_id=self.building_to_sync)
         if self.debug:
             self.logger.info("Loading data from Auvik API.")
         self.source_adapter.load()
+        if self.memory_profiling:
+            # The peak is that of the worker process, so it only grows when loading Auvik data sets a new high
+            self.logger.info(
+                f"Peak RSS: {peak_rss_before:.1f} MiB before loading Auvik data, {peak_rss_mib():.1f} MiB after"
+            )
+        self.log_auvik_connection_stats(connection_stats)
+        if self.source_adapter.response_cache is not None:
+            self.logger.info(
+                f"Auvik response cache: {self.source_adapter.response_cache.hits} collections replayed from disk, "
+                f"{self.source_adapter.response_cache.misses} fetched from the API"
+            )
+        if self.debug:
+            self.logger.info(f"Secret cache: {get_secret_cache_stats()}")
+            self.logger.info(f"Auvik request scheduler: {get_auvik_scheduler().stats()}")
+
+    def log_auvik_connection_stats(self, previous_stats):
+        """Log how many Auvik API requests reused a pooled connection since previous_stats was taken."""
+        current_stats = get_auvik_api_client_stats()
+        requests_made = current_stats["requests"] - previous_stats["requests"]
+        new_connections = current_stats["new_connections"] - previous_stats["new_connections"]
+        self.logger.info(
+            f"Auvik API requests: {requests_made} ({max(0, requests_made - new_connections)} on reused connections, "
+            f"{new_connections} new connections)"
+        )
 
     def load_target_adapter(self):
         """Load data from Nautobot into DiffSync models."""
-        self.target_adapter = NautobotAuvikAdapter(job=self, sync=self.sync)
+        self.target_adapter = NautobotAuvikAdapter(
+            job=self,
+            sync=self.sync,
+            deferred_writes=self.deferred_writes,
+            transaction_strategy=self.transaction_strategy,
+        )
         if self.debug:
             self.logger.info("Loading data from Nautobot.")
         self.target_adapter.load()
 
+    def execute_sync(self):
+        """Write the diff to Nautobot, grouping writes into transactions according to the transaction strategy."""
+        with self.target_adapter.transactions:
+            super().execute_sync()
+        self.source_adapter.save_sync_state(self.target_adapter)
+
     def run(  # pylint: disable=arguments-differ, too-many-arguments
-        self, dryrun, memory_profiling, debug, building_to_sync, *args, **kwargs
+        self,
+        dryrun,
+        memory_profiling,
+        debug,
+        building_to_sync,
+        response_cache_max_age=0,
+        deferred_writes=False,
+        transaction_strategy="autocommit",
+        incremental=False,
+        full_sync=False,
+        *args,
+        **kwargs,
     ):
         """Perform data syncrhonization."""
         self.debug = debug
+        self.deferred_writes = deferred_writes
+        self.incremental = incremental
+        self.full_sync = full_sync
+        self.incremental_device_names = None
+        self.transaction_strategy = transaction_strategy or "autocommit"
         self.dryrun = dryrun
         self.memory_profiling = memory_profiling
         self.building_to_sync = building_to_sync
+        self.response_cache_max_age = response_cache_max_age or 0
         super().run(
             dryrun=self.dryrun,
             memory_profiling=self.memory_profiling,
@@ -172,4 +290,151 @@ class AuvikDataSource(DataSource):
         )
 
 
-jobs = [Layer8DataSource, AuvikDataSource]
+class AuvikFleetSync(Job):
+    """Job to run the Auvik Data Source job for many buildings in parallel."""
+
+    buildings = MultiObjectVar(
+        model=AuvikTenantBuildingRelationship,
+        display_field="building.name",
+        description="Choose the buildings to synchronize from Auvik.",
+        query_params={
+            "depth": 1,
+        },
+        required=False,
+    )
+    all_buildings = BooleanVar(description="Synchronize every building mapped to an Auvik Tenant.", default=False)
+    dryrun = DryRunVar(description="Perform a dry-run, making no actual changes to Nautobot data.")
+    debug = BooleanVar(description="Enable for more verbose debug logging", default=False)
+    incremental = BooleanVar(
+        description="Only synchronize devices that changed in Auvik since the last sync of each building.",
+        default=False,
+    )
+    max_concurrency = IntegerVar(
+        description="Maximum number of buildings synchronized at the same time. Each building runs as its own Auvik Data Source job on a Celery worker, and this job occupies a worker process while it waits, so it is lowered to one less than the number of worker processes.",
+        default=4,
+        min_value=1,
+    )
+    building_timeout = IntegerVar(
+        description="Revoke a building's sync after this many seconds and report it as timed out, freeing its slot for the next building.",
+        default=3600,
+        min_value=60,
+    )
+
+    # Seconds between checks of the status of the running building syncs
+    poll_interval = 5
+
+    class Meta:
+        """Metadata for the job."""
+
+        name = "Auvik Fleet Sync"
+        description = "Synchronize many buildings from Auvik by running the Auvik Data Source job for each of them in parallel, and summarize the results. Needs at least two Celery worker processes, as this job keeps one busy until every building has finished."
+        has_sensitive_variables = False
+        dryrun_default = True
+
+    def run(  # pylint: disable=arguments-differ, too-many-arguments
+        self, buildings, all_buildings, dryrun, debug, incremental, max_concurrency, building_timeout
+    ):
+        """Enqueue a sync per building, at most max_concurrency at a time, and report the results."""
+        if all_buildings:
+            buildings = AuvikTenantBuildingRelationship.objects.all()
+        if not buildings:
+            self.logger.error("No buildings selected.")
+            return None
+        pending = list(buildings.select_related("building", "auvik_tenant"))
+
+        job_model = JobModel.objects.get_for_class_path(AuvikDataSource.class_path)
+        if not job_model.enabled:
+            raise Exception(f"Job {job_model} is not enabled.")
+
+        # This job holds a worker process until every building has finished, so the building syncs can only use the
+        # remaining ones. With a single worker process they would never start.
+        workers = self.worker_processes()
+        if workers is not None:
+            if workers < 2:
+                raise Exception(
+                    f"Auvik Fleet Sync needs at least two Celery worker processes, one to run this job and one to run "
+                    f"the building syncs, but {workers} is available."
+                )
+            if max_concurrency > workers - 1:
+                self.logger.warning(
+                    f"Only {workers} Celery worker processes are available and this job uses one of them, "
+                    f"synchronizing {workers - 1} buildings at a time instead of {max_concurrency}."
+                )
+                max_concurrency = workers - 1
+
+        self.logger.info(f"Synchronizing {len(pending)} buildings from Auvik, {max_concurrency} at a time.")
+        started = time.monotonic()
+        running = {}
+        results = []
+        while pending or running:
+            while pending and len(running) < max_concurrency:
+                relationship = pending.pop(0)
+                job_result = JobResult.enqueue_job(
+                    job_model,
+                    self.user,
+                    dryrun=dryrun,
+                    memory_profiling=False,
+                    debug=debug,
+                    building_to_sync=str(relationship.pk),
+                    incremental=incremental,
+                )
+                running[job_result.pk] = (relationship, job_result, time.monotonic())
+                if debug:
+                    self.logger.info(f"Started sync of {self.building_label(relationship)}: {job_result.pk}")
+
+            time.sleep(self.poll_interval)
+            for pk, status in JobResult.objects.filter(pk__in=list(running)).values_list("pk", "status"):
+                relationship, job_result, building_started = running[pk]
+                elapsed = time.monotonic() - building_started
+                if status not in JobResultStatusChoices.READY_STATES:
+                    if elapsed < building_timeout:
+                        continue
+                    # Stop the sync, so that it does not keep running on a worker once its slot has been freed
+                    celery_app.control.revoke(str(pk), terminate=True)
+                    status = "TIMED OUT"
+                del running[pk]
+                results.append(
+                    {
+                        "building": self.building_label(relationship),
+                        "status": status,
+                        "seconds": round(elapsed, 1),
+                        "job_result": str(job_result.pk),
+                    }
+                )
+                self.log_building_result(results[-1], job_result)
+
+        succeeded = sum(1 for result in results if result["status"] == JobResultStatusChoices.STATUS_SUCCESS)
+        self.logger.info(
+            f"Synchronized {len(results)} buildings in {time.monotonic() - started:.0f}s: {succeeded} succeeded, "
+            f"{len(results) - succeeded} failed or timed out."
+        )
+        return {"buildings": results}
+
+    @staticmethod
+    def worker_processes():
+        """Return the total number of Celery worker processes, or None if no worker replied."""
+        try:
+            stats = celery_app.control.inspect(timeout=1.0).stats()
+        except Exception:  # pylint: disable=broad-except
+            return None
+        if not stats:
+            return None
+        return sum(worker.get("pool", {}).get("max-concurrency", 1) for worker in stats.values())
+
+    @staticmethod
+    def building_label(relationship):
+        """Return the name used for a building in the summary."""
+        if relationship.building is not None:
+            return relationship.building.name
+        return str(relationship.auvik_tenant)
+
+    def log_building_result(self, result, job_result):
+        """Log the outcome of one building's sync."""
+        message = f"{result['building']}: {result['status']} in {result['seconds']}s ({job_result.get_absolute_url()})"
+        if result["status"] == JobResultStatusChoices.STATUS_SUCCESS:
+            self.logger.info(message)
+        else:
+            self.logger.error(message)
+
+
+jobs = [Layer8DataSource, AuvikDataSource, AuvikFleetSync]
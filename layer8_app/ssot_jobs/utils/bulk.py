@@ -0,0 +1,537 @@
+"""Bulk creation of Nautobot objects buffered during a DiffSync sync."""
+
+import time
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from nautobot.dcim.models import Cable, Device, DeviceType, Interface, Location
+from nautobot.ipam.models import IPAddress, IPAddressToInterface, Namespace
+
+# Description given to interfaces created from Auvik until they have been validated
+NEW_INTERFACE_DESCRIPTION = (
+    "Interface created by Auvik Sync, please validate and update/remove interface status and this notice once complete."
+)
+
+# Foreign keys of buffered Locations, which refer to reference data or to buildings created earlier in the same flush
+LOCATION_FKS = ("location_type", "parent", "status")
+
+
+def bulk_create_in_batches(model, objects, batch_size, logger, label, exclude=(), after_bulk_create=None):
+    """
+    Validate and insert unsaved model instances in batches, logging and skipping those that fail.
+
+    Foreign keys named in exclude are not checked against the database and uniqueness is left to the database. A batch
+    rejected by the database is rolled back to its savepoint and its objects are saved one by one with
+    validated_save(), so only the offending objects are lost.
+
+    :param model: The model class of the objects.
+    :param objects: The list of unsaved instances.
+    :param batch_size: The number of objects validated and inserted at a time.
+    :param logger: The logger to report failures to.
+    :param label: The name of the object type used in log messages.
+    :param exclude: Names of fields not validated by full_clean().
+    :param after_bulk_create: Optional callable run, within the batch's savepoint, with each list of objects created
+        by bulk_create, for work that save() would otherwise have done.
+    :return: The list of objects created.
+    """
+    batch_size = max(1, batch_size)
+    created = []
+    for start in range(0, len(objects), batch_size):
+        end = start + batch_size
+        batch = []
+        for obj in objects[start:end]:
+            try:
+                obj.full_clean(exclude=list(exclude), validate_unique=False)
+            except ValidationError as e:
+                logger.error(f"Failed to create {label}: {e} - {obj}")
+                continue
+            batch.append(obj)
+        try:
+            with transaction.atomic():
+                batch = model.objects.bulk_create(batch)
+                if after_bulk_create is not None:
+                    after_bulk_create(batch)
+            created.extend(batch)
+            continue
+        except IntegrityError as e:
+            logger.warning(f"Bulk create of {len(batch)} {label} objects failed, saving individually: {e}")
+        for obj in batch:
+            try:
+                with transaction.atomic():
+                    obj.validated_save()
+                created.append(obj)
+            except (IntegrityError, ValidationError) as e:
+                logger.error(f"Failed to create {label}: {e} - {obj}")
+    return created
+
+
+class LocationBulkWriter:
+    """
+    Buffer the buildings and rooms created during a sync and write them with bulk_create when the sync completes.
+
+    Objects are validated and inserted in batches, buildings before rooms so that rooms can reference buildings
+    created in the same sync. Custom field data set on the buffered objects is written in the same insert. Note that
+    bulk_create bypasses save(), so no change log entries are recorded for the objects created.
+    """
+
+    def __init__(self, job, batch_size):
+        """
+        Initialize the writer.
+
+        :param job: The job running the sync, used for logging.
+        :param batch_size: The number of objects validated and inserted at a time.
+        """
+        self.job = job
+        self.batch_size = max(1, batch_size)
+        self.buildings = {}
+        self.rooms = []
+
+    def add_building(self, building):
+        """Buffer an unsaved building Location."""
+        self.buildings[building.name] = building
+
+    def add_room(self, room, parent_name):
+        """Buffer an unsaved room Location, to be created under the building named parent_name."""
+        self.rooms.append((room, parent_name))
+
+    def flush(self, building_map, room_map):
+        """
+        Write the buffered buildings and rooms to the database.
+
+        :param building_map: Mapping of building name to Location ID, updated with the buildings created.
+        :param room_map: Mapping of building name to a mapping of room name to Location ID, updated with the rooms
+            created.
+        """
+        if not self.buildings and not self.rooms:
+            return
+        started = time.monotonic()
+
+        buildings = {}
+        for building in bulk_create_in_batches(
+            Location, list(self.buildings.values()), self.batch_size, self.job.logger, "Building", LOCATION_FKS
+        ):
+            buildings[building.name] = building
+            building_map[building.name] = building.id
+
+        # Rooms may be created under buildings that already existed, so look those up in a single query. Parents are
+        # matched on name and on the parent location type of the room, as the immediate path's get() would be.
+        parents = defaultdict(list)
+        parent_names = {name for _, name in self.rooms if name}
+        parent_types = {room.location_type.parent_id for room, name in self.rooms if name}
+        for parent in Location.objects.filter(name__in=parent_names, location_type__in=parent_types).select_related(
+            "location_type"
+        ):
+            parents[(parent.name, parent.location_type_id)].append(parent)
+
+        rooms = []
+        for room, parent_name in self.rooms:
+            if parent_name:
+                candidates = parents.get((parent_name, room.location_type.parent_id), [])
+                if not candidates:
+                    self.job.logger.error(f"Failed to create Room: building {parent_name} not found - {room.name}")
+                    continue
+                if len(candidates) > 1:
+                    self.job.logger.error(
+                        f"Failed to create Room: {len(candidates)} buildings named {parent_name} - {room.name}"
+                    )
+                    continue
+                room.parent = candidates[0]
+            rooms.append(room)
+        rooms = bulk_create_in_batches(Location, rooms, self.batch_size, self.job.logger, "Room", LOCATION_FKS)
+        for room in rooms:
+            parent_name = room.parent.name if room.parent is not None else None
+            room_map.setdefault(parent_name, {})[room.name] = room.id
+
+        self.job.logger.info(
+            f"Bulk created {len(buildings)} buildings and {len(rooms)} rooms in {time.monotonic() - started:.2f}s"
+        )
+        self.buildings.clear()
+        self.rooms.clear()
+
+
+class AuvikWriteQueue:
+    """
+    Collect the devices, interfaces, IP addresses and cables created or updated during an Auvik sync.
+
+    Nothing is written while the diff is processed. When the sync completes, the queued changes are written in
+    dependency order inside a single transaction: devices, interfaces, IP addresses, IP address to interface
+    assignments, primary IPv4 addresses and then cables. The objects each step refers to are looked up in a few queries
+    per step instead of several per object. Devices, interfaces and assignments are inserted with bulk_create and
+    monitoring profile updates written with bulk_update. IP addresses and cables are saved one by one, as their save()
+    and signal handlers compute the parent prefix and cable paths, but each within its own savepoint. A failing object
+    is logged and skipped without aborting the rest of the batch, and its device recorded in failed_devices. Objects
+    written with bulk_create and bulk_update get no change log entries and send no post_save signals, so webhooks and
+    job hooks do not fire for them.
+    """
+
+    def __init__(self, job, reference_data, batch_size):
+        """
+        Initialize the queue.
+
+        :param job: The job running the sync, used for logging.
+        :param reference_data: The adapter's ReferenceDataCache.
+        :param batch_size: The number of objects validated and written at a time.
+        """
+        self.job = job
+        self.reference_data = reference_data
+        self.batch_size = max(1, batch_size)
+        self.creates = defaultdict(list)
+        self.updates = defaultdict(list)
+        self.written = defaultdict(int)
+        # Names of the devices for which a queued change could not be written
+        self.failed_devices = set()
+
+    def add_create(self, modelname, ids, attrs):
+        """Queue the creation of a DiffSync model of type modelname."""
+        self.creates[modelname].append((ids, attrs))
+
+    def add_update(self, modelname, ids, attrs):
+        """Queue an update of a DiffSync model of type modelname."""
+        self.updates[modelname].append((ids, attrs))
+
+    def flush(self):
+        """Write all queued changes to the database in a single transaction."""
+        if not self.creates and not self.updates:
+            return
+        started = time.monotonic()
+        with transaction.atomic():
+            self._write_devices()
+            self._write_interfaces()
+            ip_addresses = self._write_ip_addresses()
+            assignments = self._write_ip_assignments(ip_addresses)
+            self._set_primary_ip4(assignments)
+            self._write_cables()
+        self.job.logger.info(f"Wrote queued Auvik changes in {time.monotonic() - started:.2f}s: {dict(self.written)}")
+        self.creates.clear()
+        self.updates.clear()
+
+    def _bulk_create(self, model, objects, label, exclude=(), after_bulk_create=None, device_name=None):
+        """
+        Bulk create objects, counting those created.
+
+        :param device_name: Optional callable returning the name of the device an object belongs to, used to record
+            the devices of objects that could not be created in failed_devices.
+        """
+        created = bulk_create_in_batches(
+            model, objects, self.batch_size, self.job.logger, label, exclude, after_bulk_create
+        )
+        if device_name is not None and len(created) < len(objects):
+            created_ids = {id(obj) for obj in created}
+            self.failed_devices.update(device_name(obj) for obj in objects if id(obj) not in created_ids)
+        self.written[f"{label} created"] += len(created)
+        return created
+
+    def _bulk_update_monitoring_profiles(self, model, objects, label):
+        """Write the custom field data of objects whose monitoring profile was updated."""
+        model.objects.bulk_update(objects, ["_custom_field_data"], batch_size=self.batch_size)
+        self.written[f"{label} updated"] += len(objects)
+
+    @staticmethod
+    def _create_components(devices):
+        """Instantiate the components of the device types of bulk created devices, as Device.save() would."""
+        for device in devices:
+            device.create_components()
+
+    def _devices_by_location(self, keys):
+        """
+        Return the existing devices for (device name, location name) pairs.
+
+        :return: Dict mapping (device name, location name) to Device.
+        """
+        devices = Device.objects.filter(
+            name__in={name for name, _ in keys}, location__name__in={location for _, location in keys}
+        ).select_related("location")
+        return {(device.name, device.location.name): device for device in devices}
+
+    def _write_devices(self):
+        """Create and update queued devices."""
+        creates = self.creates["device"]
+        locations = {
+            location.name: location
+            for location in Location.objects.filter(
+                name__in={ids["location__name"] for ids, _ in creates}
+            ).select_related("location_type")
+        }
+        device_types = {
+            (device_type.manufacturer.name, device_type.model): device_type
+            for device_type in DeviceType.objects.filter(
+                model__in={attrs["device_type"] for _, attrs in creates}
+            ).select_related("manufacturer")
+        }
+        status = self.reference_data.status("Active") if creates else None
+        new_devices = []
+        for ids, attrs in creates:
+            location = locations.get(ids["location__name"])
+            device_type = device_types.get((attrs["manufacturer"], attrs["device_type"]))
+            if location is None or device_type is None:
+                self.job.logger.error(
+                    f"Failed to create Device: location {ids['location__name']} or device type "
+                    f"{attrs['manufacturer']} {attrs['device_type']} not found - {ids['name']}"
+                )
+                self.failed_devices.add(ids["name"])
+                continue
+            device = Device(name=ids["name"], device_type=device_type, location=location, status=status)
+            if attrs.get("serial"):
+                device.serial = attrs["serial"]
+            if attrs.get("monitoring_profile"):
+                device.custom_field_data.update({"monitoring_profile": attrs["monitoring_profile"]})
+            if attrs.get("role"):
+                device.role = self.reference_data.role(attrs["role"], Device)
+            new_devices.append(device)
+        self._bulk_create(
+            Device,
+            new_devices,
+            "Device",
+            exclude=("location", "device_type", "status", "role"),
+            after_bulk_create=self._create_components,
+            device_name=lambda device: device.name,
+        )
+
+        updates = [(ids, attrs) for ids, attrs in self.updates["device"] if attrs.get("monitoring_profile")]
+        devices = {
+            device.name: device for device in Device.objects.filter(name__in={ids["name"] for ids, _ in updates})
+        }
+        changed = []
+        for ids, attrs in updates:
+            device = devices.get(ids["name"])
+            if device is None:
+                self.job.logger.error(f"Failed to update Device monitoring profile for {ids['name']}: not found")
+                self.failed_devices.add(ids["name"])
+                continue
+            device.custom_field_data.update({"monitoring_profile": attrs["monitoring_profile"]})
+            changed.append(device)
+        self._bulk_update_monitoring_profiles(Device, changed, "Device")
+
+    def _write_interfaces(self):
+        """Create and update queued interfaces, updating interfaces already created from device type templates."""
+        queued = [(ids, attrs, False) for ids, attrs in self.creates["interface"]]
+        queued += [(ids, attrs, True) for ids, attrs in self.updates["interface"]]
+        devices = self._devices_by_location(
+            {(ids["device__name"], ids["device__location__name"]) for ids, _, _ in queued}
+        )
+        existing = {
+            (interface.device_id, interface.name): interface
+            for interface in Interface.objects.filter(
+                device__in=list(devices.values()), name__in={ids["name"] for ids, _, _ in queued}
+            )
+        }
+
+        new_interfaces = []
+        changed = {}
+        for ids, attrs, is_update in queued:
+            device = devices.get((ids["device__name"], ids["device__location__name"]))
+            if device is None:
+                self.job.logger.error(
+                    f"Failed to write Interface: Device {ids['device__name']} at {ids['device__location__name']} "
+                    f"not found - {ids['name']}"
+                )
+                self.failed_devices.add(ids["device__name"])
+                continue
+            interface = existing.get((device.id, ids["name"]))
+            if interface is not None:
+                if attrs.get("monitoring_profile"):
+                    interface.custom_field_data.update({"monitoring_profile": attrs["monitoring_profile"]})
+                    changed[interface.id] = interface
+                continue
+            if is_update:
+                self.job.logger.error(
+                    f"Failed to update Interface: {ids['name']} on {ids['device__name']} at "
+                    f"{ids['device__location__name']}"
+                )
+                self.failed_devices.add(ids["device__name"])
+                continue
+            # New interfaces from Auvik are Planned, because they will need to be validated
+            status = self.reference_data.status(attrs["status"] if ids["name"] == "mgmt0" else "Planned")
+            interface = Interface(
+                name=ids["name"],
+                device=device,
+                description=attrs.get("description") or NEW_INTERFACE_DESCRIPTION,
+                mgmt_only=attrs.get("mgmt_only") or False,
+                status=status,
+                type=attrs["type"],
+            )
+            if attrs.get("monitoring_profile"):
+                interface.custom_field_data.update({"monitoring_profile": attrs["monitoring_profile"]})
+            new_interfaces.append(interface)
+        self._bulk_create(
+            Interface,
+            new_interfaces,
+            "Interface",
+            exclude=("device", "status"),
+            device_name=lambda interface: interface.device.name,
+        )
+        self._bulk_update_monitoring_profiles(Interface, list(changed.values()), "Interface")
+
+    def _write_ip_addresses(self):
+        """
+        Create queued IP addresses that do not already exist.
+
+        :return: List of (IPAddress, DiffSync attrs) pairs for the queued IP addresses that exist after the step.
+        """
+        creates = self.creates["ipaddr"]
+        namespaces = {
+            namespace.name: namespace
+            for namespace in Namespace.objects.filter(name__in={ids["namespace"] for ids, _ in creates})
+        }
+        existing = {}
+        for ip_address in IPAddress.objects.filter(host__in={ids["address"] for ids, _ in creates}):
+            existing.setdefault(str(ip_address.host), ip_address)
+
+        ip_addresses = []
+        for ids, attrs in creates:
+            ip_address = existing.get(ids["address"])
+            if ip_address is not None:
+                self.job.logger.info(f"IPAddress already exists: {ip_address.address}, skipping")
+                ip_addresses.append((ip_address, attrs))
+                continue
+            if ids["namespace"] not in namespaces:
+                self.job.logger.error(
+                    f"Failed to create IPAddress: Namespace {ids['namespace']} not found - {ids['address']}"
+                )
+                self._ip_address_failed(attrs)
+                continue
+            ip_address = IPAddress(
+                address=ids["address"],
+                namespace=namespaces[ids["namespace"]],
+                status=self.reference_data.status(attrs["status"]),
+            )
+            try:
+                with transaction.atomic():
+                    ip_address.validated_save()
+            except (IntegrityError, ValidationError) as e:
+                self.job.logger.error(f"Failed to create IPAddress: {e} - {ids['address']}")
+                self._ip_address_failed(attrs)
+                continue
+            self.written["IPAddress created"] += 1
+            ip_addresses.append((ip_address, attrs))
+        return ip_addresses
+
+    def _ip_address_failed(self, attrs):
+        """Record the device of an IP address that could not be written, if it belongs to one."""
+        if attrs.get("device"):
+            self.failed_devices.add(attrs["device"])
+
+    def _write_ip_assignments(self, ip_addresses):
+        """
+        Assign IP addresses to the interfaces named in their DiffSync attrs.
+
+        :param ip_addresses: List of (IPAddress, DiffSync attrs) pairs.
+        :return: List of (IPAddress, Interface) pairs assigned, including those that were already assigned.
+        """
+        interfaces = {}
+        for interface in Interface.objects.filter(
+            name__in={attrs["interface__name"] for _, attrs in ip_addresses},
+            device__name__in={attrs["device"] for _, attrs in ip_addresses},
+        ).select_related("device"):
+            interfaces.setdefault((interface.device.name, interface.name), interface)
+
+        pairs = []
+        for ip_address, attrs in ip_addresses:
+            interface = interfaces.get((attrs["device"], attrs["interface__name"]))
+            if interface is None:
+                self.job.logger.error(
+                    f"Failed to assign IP to interface: Interface {attrs['interface__name']} not found on Device "
+                    f"{attrs['device']}"
+                )
+                self._ip_address_failed(attrs)
+                continue
+            pairs.append((ip_address, interface))
+
+        assigned = set(
+            IPAddressToInterface.objects.filter(
+                ip_address__in=[ip_address for ip_address, _ in pairs],
+                interface__in=[interface for _, interface in pairs],
+            ).values_list("ip_address_id", "interface_id")
+        )
+        self._bulk_create(
+            IPAddressToInterface,
+            [
+                IPAddressToInterface(ip_address=ip_address, interface=interface, vm_interface=None)
+                for ip_address, interface in pairs
+                if (ip_address.id, interface.id) not in assigned
+            ],
+            "IPAddressToInterface",
+            exclude=("ip_address", "interface", "vm_interface"),
+            device_name=lambda assignment: assignment.interface.device.name,
+        )
+        return pairs
+
+    def _set_primary_ip4(self, assignments):
+        """
+        Set the primary IPv4 address of the devices of assigned interfaces.
+
+        bulk_update skips Device.clean(), so its primary IP checks are made here instead: the address must be IPv4 and
+        assigned to an interface of the device. Devices failing them are logged and keep their primary IPv4 address.
+        """
+        assigned = set(
+            IPAddressToInterface.objects.filter(
+                ip_address__in=[ip_address for ip_address, _ in assignments],
+                interface__in=[interface for _, interface in assignments],
+            ).values_list("ip_address_id", "interface_id")
+        )
+        devices = {}
+        for ip_address, interface in assignments:
+            device = interface.device
+            if device.primary_ip4_id == ip_address.id:
+                continue
+            if ip_address.ip_version != 4:
+                self.job.logger.error(
+                    f"Failed to set primary_ip4 of {device.name}: {ip_address} is not an IPv4 address"
+                )
+                self.failed_devices.add(device.name)
+                continue
+            if (ip_address.id, interface.id) not in assigned:
+                self.job.logger.error(
+                    f"Failed to set primary_ip4 of {device.name}: {ip_address} is not assigned to {interface.name}"
+                )
+                self.failed_devices.add(device.name)
+                continue
+            device.primary_ip4 = ip_address
+            devices[device.id] = device
+        Device.objects.bulk_update(list(devices.values()), ["primary_ip4"], batch_size=self.batch_size)
+        self.written["Device primary_ip4 set"] += len(devices)
+
+    def _write_cables(self):
+        """Create queued cables between interfaces."""
+        creates = [ids for ids, _ in self.creates["cable"]]
+        device_names = {ids["from_device"] for ids in creates} | {ids["to_device"] for ids in creates}
+        devices = {}
+        for device in Device.objects.filter(name__in=device_names):
+            devices.setdefault(device.name, device)
+        interfaces = {
+            (interface.device_id, interface.name): interface
+            for interface in Interface.objects.filter(
+                device__in=list(devices.values()),
+                name__in={ids["from_interface"] for ids in creates} | {ids["to_interface"] for ids in creates},
+            )
+        }
+        interface_type = self.reference_data.content_type(Interface) if creates else None
+        status = self.reference_data.status("Connected") if creates else None
+
+        for ids in creates:
+            description = f"{ids['from_device']}:{ids['from_interface']} <-> {ids['to_device']}:{ids['to_interface']}"
+            from_device = devices.get(ids["from_device"])
+            to_device = devices.get(ids["to_device"])
+            from_interface = interfaces.get((from_device.id, ids["from_interface"])) if from_device else None
+            to_interface = interfaces.get((to_device.id, ids["to_interface"])) if to_device else None
+            if from_interface is None or to_interface is None:
+                self.job.logger.error(f"Failed to create Cable: device or interface not found - {description}")
+                self.failed_devices.update((ids["from_device"], ids["to_device"]))
+                continue
+            cable = Cable(
+                termination_a_type=interface_type,
+                termination_a_id=from_interface.id,
+                termination_b_type=interface_type,
+                termination_b_id=to_interface.id,
+                status=status,
+            )
+            try:
+                with transaction.atomic():
+                    cable.validated_save()
+            except (IntegrityError, ValidationError) as e:
+                self.job.logger.error(f"Failed to create Cable: {e} - {description}")
+                self.failed_devices.update((ids["from_device"], ids["to_device"]))
+                continue
+            self.written["Cable created"] += 1
@@ -0,0 +1,119 @@
+"""Registry of the Auvik devices retrieved for a sync, with their interfaces and skip state."""
+
+from collections import Counter
+
+
+class AuvikDeviceEntry:
+    """A device retrieved from Auvik, its interfaces and, if it is not loaded into DiffSync, why."""
+
+    __slots__ = ("id", "record", "interfaces", "skip_reason")
+
+    def __init__(self, record):
+        """
+        Initialize the entry.
+
+        :param record: The AuvikDevice record.
+        """
+        self.id = record.id
+        self.record = record
+        self.interfaces = []
+        self.skip_reason = None
+
+    @property
+    def name(self):
+        """Return the Auvik device name."""
+        return self.record.device_name
+
+    @property
+    def skipped(self):
+        """Return True if the device has been skipped."""
+        return self.skip_reason is not None
+
+
+class AuvikDeviceRegistry:
+    """
+    Auvik devices of a sync keyed by Auvik device ID, in the order they were retrieved.
+
+    Lookups, membership and skip checks are dictionary lookups, so loaders can check every interface against the
+    registry without scanning it. Loaders iterate the devices through devices() rather than keeping their own lists.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._entries = {}
+
+    def __len__(self):
+        """Return the number of devices in the registry."""
+        return len(self._entries)
+
+    def __contains__(self, device_id):
+        """Return True if the Auvik device ID is in the registry."""
+        return device_id in self._entries
+
+    def __iter__(self):
+        """Iterate over all the entries, skipped or not."""
+        return iter(self._entries.values())
+
+    def add(self, record):
+        """
+        Add an Auvik device, replacing any device with the same ID.
+
+        :param record: The AuvikDevice record.
+        :return: The device's entry.
+        """
+        entry = self._entries[record.id] = AuvikDeviceEntry(record)
+        return entry
+
+    def get(self, device_id):
+        """Return the entry of an Auvik device ID, or None if it is not in the registry."""
+        return self._entries.get(device_id)
+
+    def add_interface(self, device_id, interface):
+        """
+        Add an interface to its parent device.
+
+        :param device_id: The Auvik ID of the parent device.
+        :param interface: The AuvikInterface record.
+        :return: True if the interface was added, False if the parent device is not in the registry.
+        """
+        entry = self._entries.get(device_id)
+        if entry is None:
+            return False
+        entry.interfaces.append(interface)
+        return True
+
+    def skip(self, device_id, reason):
+        """
+        Mark a device as skipped, so that its interfaces and cables are not loaded either.
+
+        :param device_id: The Auvik device ID.
+        :param reason: Why the device is skipped.
+        """
+        self._entries[device_id].skip_reason = reason
+
+    def is_skipped(self, device_id):
+        """Return True if the Auvik device ID is in the registry and has been skipped."""
+        entry = self._entries.get(device_id)
+        return entry is not None and entry.skip_reason is not None
+
+    def retain(self, device_ids):
+        """
+        Drop every device whose ID is not in device_ids, keeping the order of the others.
+
+        :param device_ids: Set of the Auvik device IDs to keep.
+        """
+        self._entries = {device_id: entry for device_id, entry in self._entries.items() if device_id in device_ids}
+
+    def devices(self, skipped=False):
+        """
+        Iterate over the entries of the devices that are loaded, or of the skipped devices.
+
+        :param skipped: Iterate over the skipped devices instead of the loaded ones.
+        """
+        return (entry for entry in self._entries.values() if (entry.skip_reason is not None) == skipped)
+
+    def skip_summary(self):
+        """Return the number of skipped devices per skip reason, most common first."""
+        return Counter(entry.skip_reason for entry in self.devices(skipped=True)).most_common()
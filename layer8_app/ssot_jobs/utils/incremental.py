@@ -0,0 +1,19 @@
+"""Change detection for incremental Auvik syncs."""
+
+import hashlib
+import json
+
+
+def record_hash(record, children=()):
+    """
+    Return a hash of a compact Auvik record and, optionally, its child records.
+
+    Records only carry the fields synchronized to Nautobot, so attributes that change without affecting Nautobot,
+    such as the time a device was last seen, do not change the hash.
+
+    :param record: The Auvik record, e.g. an AuvikDevice.
+    :param children: Child records included in the hash, e.g. the device's AuvikInterface records.
+    :return: Hex digest that changes whenever a field of the record or its children changes.
+    """
+    payload = [record, list(children)]
+    return hashlib.sha256(json.dumps(payload, default=str).encode()).hexdigest()
@@ -0,0 +1,64 @@
+"""Resolve Auvik device models and vendors to Nautobot device types and manufacturers."""
+
+from ...models import AuvikDeviceModels, AuvikDeviceVendors
+
+
+class AuvikMappingResolver:
+    """
+    In-memory copy of the Auvik model and vendor mapping tables.
+
+    Both tables are loaded once, with their Nautobot objects, in two queries. Lookups are then dictionary lookups,
+    so resolving devices costs no further queries regardless of the number of devices. Names that could not be
+    resolved are recorded for reporting at the end of the job.
+    """
+
+    def __init__(self):
+        """Load the Auvik model and vendor mapping tables."""
+        # Auvik name -> Nautobot object name, or None if the mapping exists but is not linked to a Nautobot object
+        self.device_types = {
+            mapping.auvik_model_name: (
+                str(mapping.nautobot_device_type) if mapping.nautobot_device_type is not None else None
+            )
+            for mapping in AuvikDeviceModels.objects.select_related("nautobot_device_type__manufacturer")
+        }
+        self.manufacturers = {
+            mapping.auvik_vendor_name: (
+                str(mapping.nautobot_manufacturer) if mapping.nautobot_manufacturer is not None else None
+            )
+            for mapping in AuvikDeviceVendors.objects.select_related("nautobot_manufacturer")
+        }
+        self.unmapped_models = set()
+        self.unmapped_vendors = set()
+
+    def device_type(self, auvik_model_name):
+        """
+        Return the name of the Nautobot device type mapped to an Auvik model.
+
+        :param auvik_model_name: The Auvik make_model value.
+        :return: The device type name, or None if the model is not mapped to a device type.
+        """
+        device_type = self.device_types.get(auvik_model_name)
+        if device_type is None:
+            self.unmapped_models.add(auvik_model_name)
+        return device_type
+
+    def manufacturer(self, auvik_vendor_name):
+        """
+        Return the name of the Nautobot manufacturer mapped to an Auvik vendor.
+
+        :param auvik_vendor_name: The Auvik vendor_name value.
+        :return: The manufacturer name, or None if the vendor is not mapped to a manufacturer.
+        """
+        manufacturer = self.manufacturers.get(auvik_vendor_name)
+        if manufacturer is None:
+            self.unmapped_vendors.add(auvik_vendor_name)
+        return manufacturer
+
+    def report(self):
+        """Return a description of the Auvik models and vendors that could not be resolved, or None."""
+        lines = []
+        if self.unmapped_models:
+            lines.append(f"Auvik models without a Nautobot device type: {', '.join(sorted(self.unmapped_models))}")
+        if self.unmapped_vendors:
+            lines.append(f"Auvik vendors without a Nautobot manufacturer: {', '.join(sorted(self.unmapped_vendors))}")
+        return "\n".join(lines) or None
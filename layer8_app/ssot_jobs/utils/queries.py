@@ -0,0 +1,31 @@
+"""Database query counting for SSoT job diagnostics."""
+
+from django.db import connection
+
+
+class QueryCounter:
+    """
+    Context manager counting the database queries executed on the default connection inside the block.
+
+    Unlike connection.queries, this does not require settings.DEBUG to be enabled.
+    """
+
+    def __init__(self):
+        """Initialize the counter."""
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Count one query and execute it."""
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        """Start counting queries."""
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stop counting queries."""
+        return self._wrapper.__exit__(*exc_info)
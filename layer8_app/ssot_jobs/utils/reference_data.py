@@ -0,0 +1,92 @@
+"""Per-sync cache of constant Nautobot reference data used by the DiffSync CRUD models."""
+
+from django.contrib.contenttypes.models import ContentType
+
+from nautobot.dcim.models import LocationType
+from nautobot.extras.models import Role, Status
+
+
+class ReferenceDataCache:
+    """
+    Statuses, roles, location types and content types looked up by the DiffSync models during a sync.
+
+    Each object is fetched from the database the first time it is needed and reused for the rest of the sync.
+    The adapter that owns the cache clears it when the sync completes, so changes made between syncs are picked up.
+    Objects cached inside a savepoint that is rolled back, which may have been created or changed within it, are
+    forgotten with forget_since(), so they are fetched again rather than referring to rows that no longer exist.
+    """
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._statuses = {}
+        self._location_types = {}
+        self._roles = {}
+        self._content_types = {}
+        # (store, key) of every cached object, in the order they were cached
+        self._cached = []
+
+    def _cache(self, store, key, value):
+        """Store a looked up object and return it."""
+        store[key] = value
+        self._cached.append((store, key))
+        return value
+
+    def mark(self):
+        """Return a marker of the objects cached so far, to pass to forget_since()."""
+        return len(self._cached)
+
+    def forget_since(self, mark):
+        """
+        Discard the objects cached since mark() was called.
+
+        :param mark: The value returned by mark().
+        """
+        for store, key in self._cached[mark:]:
+            store.pop(key, None)
+        del self._cached[mark:]
+
+    def status(self, name):
+        """
+        Return the Status with the given name.
+
+        :param name: The name of the Status.
+        :return: The Status object. Raises Status.DoesNotExist if there is no such Status.
+        """
+        if name not in self._statuses:
+            self._cache(self._statuses, name, Status.objects.get(name=name))
+        return self._statuses[name]
+
+    def location_type(self, name):
+        """Return the LocationType with the given name, creating it if it does not exist."""
+        if name not in self._location_types:
+            self._cache(self._location_types, name, LocationType.objects.get_or_create(name=name)[0])
+        return self._location_types[name]
+
+    def content_type(self, model):
+        """Return the ContentType for a model class."""
+        if model not in self._content_types:
+            self._cache(self._content_types, model, ContentType.objects.get_for_model(model))
+        return self._content_types[model]
+
+    def role(self, name, model):
+        """
+        Return the Role with the given name, creating it if it does not exist.
+
+        :param name: The name of the Role.
+        :param model: The model class the Role is assigned to. It is added to the Role's content types once per sync.
+        :return: The Role object.
+        """
+        key = (name, model)
+        if key not in self._roles:
+            role = Role.objects.get_or_create(name=name)[0]
+            role.content_types.add(self.content_type(model))
+            self._cache(self._roles, key, role)
+        return self._roles[key]
+
+    def clear(self):
+        """Discard all cached objects."""
+        self._statuses.clear()
+        self._location_types.clear()
+        self._roles.clear()
+        self._content_types.clear()
+        self._cached.clear()
@@ -0,0 +1,62 @@
+"""Classify Auvik devices into Nautobot device roles by their names."""
+
+import re
+
+
+class DeviceRoleClassifier:
+    """
+    Assign device roles from an ordered table of (substring, role) rules.
+
+    A device gets the role of the first rule in the table whose substring occurs anywhere in its name, ignoring case,
+    or the default role if none does. All substrings are compiled into one regular expression, so a name is scanned
+    once whatever the number of rules. Results are cached by name.
+    """
+
+    def __init__(self, rules, default="Unknown"):
+        """
+        Compile the rule table.
+
+        :param rules: Ordered iterable of (substring, role) pairs. Earlier rules take precedence.
+        :param default: The role of devices matching no rule.
+        """
+        self.roles = [role for _, role in rules]
+        self.default = default
+        self._cache = {}
+        # A lookahead is tried at every position of the name, so overlapping occurrences are all seen. At a given
+        # position the alternatives are tried in table order, so the first group to match has the highest precedence.
+        alternatives = "|".join(f"({re.escape(substring)})" for substring, _ in rules)
+        self._pattern = re.compile(f"(?=(?:{alternatives}))", re.IGNORECASE) if self.roles else None
+
+    def classify(self, name):
+        """
+        Return the role of a device.
+
+        :param name: The device name.
+        :return: The role of the first rule matching the name, or the default role.
+        """
+        role = self._cache.get(name)
+        if role is None:
+            role = self._cache[name] = self._classify(name)
+        return role
+
+    def _classify(self, name):
+        """Return the role of a device, without caching."""
+        if not name or self._pattern is None:
+            return self.default
+        best = None
+        for match in self._pattern.finditer(name):
+            rule = match.lastindex - 1
+            if best is None or rule < best:
+                best = rule
+                if best == 0:
+                    break
+        return self.default if best is None else self.roles[best]
+
+    def classify_many(self, names):
+        """
+        Return the roles of many devices.
+
+        :param names: Iterable of device names.
+        :return: Dictionary of device name to role.
+        """
+        return {name: self.classify(name) for name in names}
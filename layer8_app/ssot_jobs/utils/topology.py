@@ -0,0 +1,88 @@
+"""Cable topology built from the interface connections reported by Auvik."""
+
+# Name of the Auvik management interface. Links reported to a remote me0 are redirected to the link of the local me0.
+MGMT_INTERFACE_NAME = "me0"
+
+
+class InterfaceTopology:
+    """
+    Adjacency index of Auvik interface connections, keyed by interface.
+
+    Interfaces are numbered in the order they are added and all per-interface data is held in flat lists indexed by
+    that number, so building the index and walking it are both linear in the number of interfaces and links.
+
+    Only interfaces with exactly one connection to another known interface are considered cabled; interfaces connected
+    to several interfaces do not represent a physical cable. Each cable is reported once, regardless of direction.
+    """
+
+    __slots__ = ("_index", "_names", "_devices", "_connected_to", "_device_names")
+
+    def __init__(self):
+        """Initialize an empty topology."""
+        self._index = {}
+        self._names = []
+        self._devices = []
+        self._connected_to = []
+        self._device_names = []
+
+    def __len__(self):
+        """Return the number of interfaces in the topology."""
+        return len(self._names)
+
+    def add_device(self, device_name, interfaces):
+        """
+        Add a device and its interfaces.
+
+        :param device_name: The name of the device.
+        :param interfaces: Iterable of (interface ID, interface name, IDs of the interfaces it is connected to).
+        """
+        device = len(self._device_names)
+        self._device_names.append(device_name)
+        for interface_id, interface_name, connected_to in interfaces:
+            self._index[interface_id] = len(self._names)
+            self._names.append(interface_name)
+            self._devices.append(device)
+            self._connected_to.append(connected_to)
+
+    def _peers(self):
+        """Return the peer of each interface, or -1 if it is not connected to exactly one known interface."""
+        index = self._index
+        peers = []
+        for connected_to in self._connected_to:
+            known = [index[interface_id] for interface_id in connected_to if interface_id in index]
+            peers.append(known[0] if len(known) == 1 else -1)
+        return peers
+
+    def cables(self):
+        """
+        Yield the cables of the topology, in the order their first end was added.
+
+        :return: Generator of (from device name, from interface name, to device name, to interface name) tuples.
+        """
+        names = self._names
+        devices = self._devices
+        device_names = self._device_names
+        peers = self._peers()
+
+        # The first connected me0 interface of each device, used to redirect links reported to a remote me0
+        mgmt_interfaces = [-1] * len(device_names)
+        for interface, name in enumerate(names):
+            if name == MGMT_INTERFACE_NAME and peers[interface] >= 0 and mgmt_interfaces[devices[interface]] < 0:
+                mgmt_interfaces[devices[interface]] = interface
+
+        size = len(names)
+        seen = set()
+        for interface, peer in enumerate(peers):
+            if peer < 0 or names[interface] == MGMT_INTERFACE_NAME:
+                continue
+            if names[peer] == MGMT_INTERFACE_NAME:
+                mgmt_interface = mgmt_interfaces[devices[interface]]
+                if mgmt_interface < 0:
+                    continue
+                peer = peers[mgmt_interface]
+            # Canonical key of the undirected edge between the two interfaces
+            key = interface * size + peer if interface < peer else peer * size + interface
+            if key in seen:
+                continue
+            seen.add(key)
+            yield device_names[devices[interface]], names[interface], device_names[devices[peer]], names[peer]
@@ -0,0 +1,142 @@
+"""Transaction strategies for writing DiffSync changes to Nautobot."""
+
+import functools
+import time
+
+from django.db import DatabaseError, transaction
+
+TRANSACTION_STRATEGY_CHOICES = (
+    ("autocommit", "Autocommit each write"),
+    ("object", "One transaction per top-level object"),
+    ("batch", "One transaction per batch of top-level objects"),
+    ("sync", "One transaction for the whole sync"),
+)
+
+
+class SyncTransactions:
+    """
+    Group the writes made by the DiffSync CRUD models of an adapter into transactions.
+
+    With the "autocommit" strategy every write is committed on its own, as Django does by default. The other
+    strategies hold a transaction open across writes and commit it when a new top-level object starts ("object"),
+    after every batch_size top-level objects ("batch") or when the sync ends ("sync"). Each create and update then
+    runs in its own savepoint, so an object failing with a database error is rolled back alone and the sync carries on.
+
+    Use as a context manager around the sync. The open transaction is committed when the block exits normally and
+    rolled back if it raises.
+    """
+
+    def __init__(self, strategy, top_level, batch_size, logger, reference_data=None):
+        """
+        Initialize the transaction strategy.
+
+        :param strategy: One of the keys of TRANSACTION_STRATEGY_CHOICES.
+        :param top_level: The DiffSync model types that are top-level objects of the adapter.
+        :param batch_size: The number of top-level objects per transaction with the "batch" strategy.
+        :param logger: The logger to report failed objects and commit statistics to.
+        :param reference_data: Optional ReferenceDataCache of the adapter. Objects it cached inside a savepoint that is
+            rolled back are discarded from it.
+        """
+        if strategy not in dict(TRANSACTION_STRATEGY_CHOICES):
+            raise Exception(f"Unknown transaction strategy '{strategy}'.")
+        self.strategy = strategy
+        self.top_level = set(top_level)
+        self.batch_size = max(1, batch_size)
+        self.logger = logger
+        self.reference_data = reference_data
+        self._atomic = None
+        self._objects_in_transaction = 0
+        self.commits = 0
+        self.commit_seconds = 0.0
+        self.rolled_back = 0
+
+    def __enter__(self):
+        """Start grouping writes."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Commit the open transaction, or roll it back if the sync raised, and log the commit statistics."""
+        self._close(exc_type, exc_value, traceback)
+        if self.strategy != "autocommit":
+            self.logger.info(
+                f"Transactions ({self.strategy}): {self.commits} commits taking {self.commit_seconds:.2f}s, "
+                f"{self.rolled_back} objects rolled back"
+            )
+
+    def _open(self):
+        """Start a transaction if none is open."""
+        if self._atomic is None:
+            self._atomic = transaction.atomic()
+            self._atomic.__enter__()  # pylint: disable=unnecessary-dunder-call
+            self._objects_in_transaction = 0
+
+    def _close(self, exc_type=None, exc_value=None, traceback=None):
+        """Commit the open transaction, or roll it back if an exception is passed."""
+        if self._atomic is None:
+            return
+        atomic, self._atomic = self._atomic, None
+        started = time.monotonic()
+        atomic.__exit__(exc_type, exc_value, traceback)  # pylint: disable=unnecessary-dunder-call
+        if exc_type is None:
+            self.commits += 1
+            self.commit_seconds += time.monotonic() - started
+
+    def run(self, modelname, method, *args, **kwargs):
+        """
+        Run a DiffSync model CRUD method under the transaction strategy.
+
+        :param modelname: The DiffSync model type the method belongs to.
+        :param method: The method to run.
+        :return: The return value of method, or None if it failed with a database error.
+        """
+        if self.strategy == "autocommit":
+            return method(*args, **kwargs)
+
+        if modelname in self.top_level:
+            if self.strategy == "object" or (
+                self.strategy == "batch" and self._objects_in_transaction >= self.batch_size
+            ):
+                self._close()
+            self._open()
+            self._objects_in_transaction += 1
+        else:
+            self._open()
+
+        mark = self.reference_data.mark() if self.reference_data is not None else None
+        try:
+            with transaction.atomic():
+                return method(*args, **kwargs)
+        except DatabaseError as e:
+            self._forget_reference_data(mark)
+            self.rolled_back += 1
+            self.logger.error(f"Failed to write {modelname}, rolled back: {e}")
+            return None
+        except Exception:
+            self._forget_reference_data(mark)
+            raise
+
+    def _forget_reference_data(self, mark):
+        """Discard the reference data cached inside a savepoint that was rolled back."""
+        if self.reference_data is not None:
+            self.reference_data.forget_since(mark)
+
+
+def in_sync_transaction(method):
+    """
+    Decorate a DiffSync model create or update method to run it under the adapter's transaction strategy.
+
+    For classmethods, apply beneath @classmethod. Adapters without a transactions attribute run the method directly.
+    """
+
+    @functools.wraps(method)
+    def wrapper(model, *args, **kwargs):
+        if isinstance(model, type):
+            diffsync = kwargs["diffsync"] if "diffsync" in kwargs else args[0]
+        else:
+            diffsync = model.diffsync
+        transactions = getattr(diffsync, "transactions", None)
+        if transactions is None:
+            return method(model, *args, **kwargs)
+        return transactions.run(model.get_type(), method, model, *args, **kwargs)
+
+    return wrapper
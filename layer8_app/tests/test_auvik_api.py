@@ -0,0 +1,120 @@
+"""Unit tests for the Auvik API helpers."""
+
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from layer8_app.helpers import auvik_api as auvik_api_module
+from layer8_app.helpers.auvik_api import fetch_all_pages, fetch_all_pages_concurrently, iter_all_pages
+from layer8_app.helpers.auvik_records import AuvikInterface, AuvikNetwork, parse_interface, parse_network
+
+NEXT_PAGE_URL = "https://auvikapi.eu1.my.auvik.com/v1/inventory/device/info?page%5Bafter%5D=abc"
+
+
+class FakePagedApi:
+    """Fake Auvik API instance returning two pages linked by a links.next cursor."""
+
+    def __init__(self):
+        self.calls = []
+
+    def read_multiple_device_info(self, **kwargs):
+        self.calls.append(dict(kwargs))
+        if kwargs.get("page_after") is None:
+            return SimpleNamespace(
+                data=[f"{kwargs['tenants']}-1", f"{kwargs['tenants']}-2"],
+                links=SimpleNamespace(next=NEXT_PAGE_URL),
+            )
+        return SimpleNamespace(data=[f"{kwargs['tenants']}-3"], links=SimpleNamespace(next=None))
+
+
+class FakeRawApi:
+    """Fake Auvik API instance returning raw JSON interface pages, as urllib3 responses do without preloading."""
+
+    def __init__(self):
+        self.released = 0
+
+    def read_multiple_interface_info_with_http_info(self, _preload_content=True, **kwargs):
+        assert _preload_content is False
+        item = {
+            "id": "i1" if kwargs.get("page_after") is None else "i2",
+            "attributes": {"interfaceName": "ge-0/0/1", "interfaceType": "ethernet"},
+            "relationships": {"connectedTo": {"data": [{"id": "i9"}]}, "parentDevice": {"data": {"id": "d1"}}},
+        }
+        page = {"data": [item], "links": {"next": NEXT_PAGE_URL if kwargs.get("page_after") is None else None}}
+        return SimpleNamespace(data=json.dumps(page).encode(), release_conn=self.release_conn)
+
+    def release_conn(self):
+        self.released += 1
+
+
+class TestIterAllPages(unittest.TestCase):
+    """Test paging through Auvik API collections."""
+
+    def test_follows_next_cursor(self):
+        api = FakePagedApi()
+        items = list(iter_all_pages(api, "read_multiple_device_info", tenants="t1", page_first=2))
+        self.assertEqual(items, ["t1-1", "t1-2", "t1-3"])
+        self.assertEqual(api.calls[1], {"tenants": "t1", "page_first": 2, "page_after": "abc"})
+
+    def test_by_page(self):
+        pages = list(iter_all_pages(FakePagedApi(), "read_multiple_device_info", by_page=True, tenants="t1"))
+        self.assertEqual(pages, [["t1-1", "t1-2"], ["t1-3"]])
+
+    def test_prefetch_yields_same_items(self):
+        items = list(iter_all_pages(FakePagedApi(), "read_multiple_device_info", prefetch=1, tenants="t1"))
+        self.assertEqual(items, ["t1-1", "t1-2", "t1-3"])
+
+    def test_prefetch_reraises_errors(self):
+        api = FakePagedApi()
+        api.read_multiple_device_info = lambda **kwargs: 1 / 0
+        with self.assertRaises(ZeroDivisionError):
+            list(iter_all_pages(api, "read_multiple_device_info", prefetch=1, tenants="t1"))
+
+    def test_fetch_all_pages(self):
+        items = fetch_all_pages(FakePagedApi(), "read_multiple_device_info", tenants="t1")
+        self.assertEqual(items, ["t1-1", "t1-2", "t1-3"])
+
+    def test_concurrent_results_keep_request_order(self):
+        param_sets = [{"tenants": f"t{index}"} for index in range(10)]
+        results = fetch_all_pages_concurrently(FakePagedApi(), "read_multiple_device_info", param_sets, max_workers=4)
+        self.assertEqual(results, [[f"t{index}-1", f"t{index}-2", f"t{index}-3"] for index in range(10)])
+
+    def test_parse_reads_raw_pages(self):
+        api = FakeRawApi()
+        items = list(iter_all_pages(api, "read_multiple_interface_info", parse=parse_interface, raw=True, tenants="t1"))
+        self.assertEqual(
+            items,
+            [
+                AuvikInterface("i1", "ge-0/0/1", "ethernet", ("i9",), "d1"),
+                AuvikInterface("i2", "ge-0/0/1", "ethernet", ("i9",), "d1"),
+            ],
+        )
+        self.assertEqual(api.released, 2)
+
+    def test_parse_without_raw_uses_model_dicts(self):
+        model = SimpleNamespace(to_dict=lambda: {"id": "n1", "attributes": {"networkName": "VLAN 10"}})
+        api = SimpleNamespace(
+            read_multiple_network_info=lambda **kwargs: SimpleNamespace(data=[model], links=SimpleNamespace(next=None))
+        )
+        items = list(iter_all_pages(api, "read_multiple_network_info", parse=parse_network, raw=False, tenants="t1"))
+        self.assertEqual(items, [AuvikNetwork("n1", "VLAN 10", None)])
+
+
+class TestSharedApiClients(unittest.TestCase):
+    """Test sharing Auvik API clients across credential changes."""
+
+    def tearDown(self):
+        auvik_api_module.close_auvik_api_clients()
+
+    def test_client_replaced_on_credential_change_stays_open_until_shutdown(self):
+        with mock.patch.object(auvik_api_module, "_new_auvik_api_client", side_effect=lambda user, key: mock.Mock()):
+            old_client = auvik_api_module.auvik_api(lambda: ("user", "old-key"))
+            self.assertIs(auvik_api_module.auvik_api(lambda: ("user", "old-key")), old_client)
+            new_client = auvik_api_module.auvik_api(lambda: ("user", "new-key"))
+
+        self.assertIsNot(new_client, old_client)
+        old_client.close.assert_not_called()
+        auvik_api_module.close_auvik_api_clients()
+        old_client.close.assert_called_once()
+        new_client.close.assert_called_once()
@@ -0,0 +1,65 @@
+"""Unit tests for the on-disk Auvik response cache."""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from layer8_app.helpers.auvik_cache import AuvikResponseCache
+
+PARAMS = {"tenants": "tenant-1", "page_first": 100}
+PAGES = [{"data": [{"id": "device-1"}], "links": {"next": "page-2"}}, {"data": [{"id": "device-2"}], "links": {}}]
+
+
+class TestAuvikResponseCache(unittest.TestCase):
+    """Test expiry, page type checks and atomic writes of cached collections."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.directory.cleanup)
+        self.cache = AuvikResponseCache(max_age=60, directory=self.directory.name)
+
+    def write(self, pages, commit=True):
+        writer = self.cache.writer("read_multiple_device_info", PARAMS)
+        for page in pages:
+            writer.add(page)
+        if commit:
+            writer.commit()
+        return writer
+
+    def test_committed_collection_is_replayed(self):
+        self.write(PAGES)
+        self.assertEqual(list(self.cache.read("read_multiple_device_info", PARAMS, raw=True)), PAGES)
+        self.assertIsNone(self.cache.read("read_multiple_device_info", {**PARAMS, "page_first": 50}, raw=True))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_expired_collection_is_not_replayed(self):
+        self.write(PAGES)
+        with mock.patch("layer8_app.helpers.auvik_cache.time.time", return_value=time.time() + 61):
+            self.assertIsNone(self.cache.read("read_multiple_device_info", PARAMS, raw=True))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_raw_pages_are_not_replayed_as_api_objects(self):
+        self.write(PAGES)
+        self.assertIsNone(self.cache.read("read_multiple_device_info", PARAMS, raw=False))
+
+    def test_partial_collection_is_never_replayed(self):
+        writer = self.write(PAGES[:1], commit=False)
+        self.assertIsNone(self.cache.read("read_multiple_device_info", PARAMS, raw=True))
+        writer.discard()
+        tenant_directory = os.path.dirname(self.cache.path("read_multiple_device_info", PARAMS))
+        self.assertEqual(os.listdir(tenant_directory), [])
+
+    def test_directory_writable_by_others_is_rejected(self):
+        os.chmod(self.directory.name, 0o777)
+        with self.assertRaises(Exception):
+            AuvikResponseCache(max_age=60, directory=self.directory.name)
+
+    def test_default_directory_is_private(self):
+        with mock.patch("layer8_app.helpers.auvik_cache.get_app_setting", return_value=None), mock.patch(
+            "layer8_app.helpers.auvik_cache.tempfile.gettempdir", return_value=self.directory.name
+        ):
+            directory = AuvikResponseCache(max_age=60).directory
+        self.assertEqual(directory, os.path.join(self.directory.name, f"layer8_app_auvik_cache-{os.getuid()}"))
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
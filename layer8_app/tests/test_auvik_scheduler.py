@@ -0,0 +1,100 @@
+"""Unit tests for the Auvik request scheduler."""
+
+import threading
+import unittest
+from unittest import mock
+
+from layer8_auvik_api_client.rest import ApiException
+
+from layer8_app.helpers.auvik_scheduler import AuvikRequestScheduler, TokenBucket, retry_after_seconds
+
+
+def api_error(status, headers=None):
+    error = ApiException(status=status, reason="error")
+    error.headers = headers
+    return error
+
+
+class TestAuvikRequestScheduler(unittest.TestCase):
+    """Test retries, backoff and Retry-After handling."""
+
+    def setUp(self):
+        self.scheduler = AuvikRequestScheduler(rate=0, burst=1, tenant_concurrency=2, max_retries=2)
+
+    @mock.patch("layer8_app.helpers.auvik_scheduler.time.sleep")
+    def test_retries_rate_limited_requests(self, sleep):
+        responses = [api_error(429, {"Retry-After": "3"}), "ok"]
+
+        def request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.assertEqual(self.scheduler.call("tenant", request), "ok")
+        sleep.assert_any_call(3.0)
+        self.assertEqual(self.scheduler.stats()["retries"], 1)
+
+    @mock.patch("layer8_app.helpers.auvik_scheduler.time.sleep")
+    def test_raises_after_max_retries(self, sleep):
+        def request():
+            raise api_error(503)
+
+        with self.assertRaises(ApiException):
+            self.scheduler.call("tenant", request)
+        self.assertEqual(self.scheduler.stats()["requests"], 3)
+
+    def test_does_not_retry_client_errors(self):
+        def request():
+            raise api_error(404)
+
+        with self.assertRaises(ApiException):
+            self.scheduler.call("tenant", request)
+        self.assertEqual(self.scheduler.stats()["retries"], 0)
+
+    @mock.patch("layer8_app.helpers.auvik_scheduler.time.sleep")
+    def test_retries_connection_errors(self, sleep):
+        responses = [ApiException(status=0, reason="Connection reset by peer"), "ok"]
+
+        def request():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        self.assertEqual(self.scheduler.call("tenant", request), "ok")
+        self.assertEqual(self.scheduler.stats()["retries"], 1)
+
+    def test_rate_token_is_taken_after_tenant_slot(self):
+        scheduler = AuvikRequestScheduler(rate=0, burst=1, tenant_concurrency=1, max_retries=0)
+        scheduler.bucket.acquire = mock.Mock(return_value=0.0)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_request():
+            started.set()
+            release.wait(5)
+            return "first"
+
+        first = threading.Thread(target=scheduler.call, args=("tenant", slow_request))
+        first.start()
+        started.wait(5)
+        second = threading.Thread(target=scheduler.call, args=("tenant", lambda: "second"))
+        second.start()
+        second.join(0.2)
+        # The second request is waiting for the tenant's only slot and has not taken a token yet
+        self.assertTrue(second.is_alive())
+        self.assertEqual(scheduler.bucket.acquire.call_count, 1)
+
+        release.set()
+        first.join(5)
+        second.join(5)
+        self.assertEqual(scheduler.bucket.acquire.call_count, 2)
+
+    def test_retry_after_header(self):
+        self.assertEqual(retry_after_seconds({"Retry-After": "5"}), 5.0)
+        self.assertIsNone(retry_after_seconds({}))
+        self.assertIsNone(retry_after_seconds(None))
+
+    def test_token_bucket_allows_burst(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
@@ -0,0 +1,184 @@
+"""Tests for writing objects created during a sync in bulk."""
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from nautobot.dcim.models import Device, DeviceType, Interface, Location, LocationType, Manufacturer
+from nautobot.extras.models import CustomField, Status
+from nautobot.ipam.models import IPAddress, Namespace, Prefix
+
+from layer8_app.models import AuvikTenant, AuvikTenantBuildingRelationship
+from layer8_app.ssot_jobs.diffsync.adapters.nautobot import NautobotAdapter, NautobotAuvikAdapter
+from layer8_app.ssot_jobs.diffsync.models.nautobot.dcim import (
+    NautobotBuilding,
+    NautobotDevice,
+    NautobotInterface,
+    NautobotIPAddress,
+    NautobotRoom,
+)
+from layer8_app.ssot_jobs.utils.queries import QueryCounter
+
+
+def location_fields(location):
+    """Return the fields of a building or room that the sync sets, without its name."""
+    return (
+        location.location_type.name,
+        location.status.name,
+        location.parent.location_type.name if location.parent else None,
+        location.custom_field_data.get("external_id"),
+    )
+
+
+class TestLocationBulkWriter(TestCase):
+    """Test that bulk import creates the same buildings and rooms as the immediate path."""
+
+    @classmethod
+    def setUpTestData(cls):
+        location = ContentType.objects.get_for_model(Location)
+        Status.objects.get_or_create(name="Planned")[0].content_types.add(location)
+        building_type = LocationType.objects.get_or_create(name="Building")[0]
+        LocationType.objects.get_or_create(name="Room", defaults={"parent": building_type})
+        external_id = CustomField.objects.create(label="External ID", key="external_id", type="integer")
+        external_id.content_types.add(location)
+
+    def adapter(self, bulk_import):
+        """Return a Nautobot adapter creating objects immediately or in bulk."""
+        job = SimpleNamespace(debug=False, logger=mock.Mock())
+        adapter = NautobotAdapter(job=job, bulk_import=bulk_import)
+        adapter.building_map, adapter.room_map = {}, {}
+        return adapter
+
+    def create(self, adapter, prefix, count):
+        """Create count buildings with one room each through the DiffSync models."""
+        for number in range(count):
+            name = f"{prefix} {number}"
+            NautobotBuilding.create(
+                diffsync=adapter, ids={"name": name}, attrs={"status__name": "Planned", "external_id": number + 1}
+            )
+            NautobotRoom.create(
+                diffsync=adapter,
+                ids={"name": f"{name} Room", "parent__name": name, "external_id": number + 100},
+                attrs={"status__name": "Planned"},
+            )
+
+    def test_bulk_import_matches_immediate_path(self):
+        self.create(self.adapter(bulk_import=False), "Immediate", 2)
+        bulk = self.adapter(bulk_import=True)
+        self.create(bulk, "Bulk", 2)
+        self.assertFalse(Location.objects.filter(name__startswith="Bulk").exists())
+        bulk.bulk_writer.flush(bulk.building_map, bulk.room_map)
+
+        for number in range(2):
+            for suffix in ("", " Room"):
+                immediate = Location.objects.get(name=f"Immediate {number}{suffix}")
+                bulk_created = Location.objects.get(name=f"Bulk {number}{suffix}")
+                self.assertEqual(location_fields(bulk_created), location_fields(immediate))
+        self.assertEqual(Location.objects.get(name="Bulk 1 Room").parent.name, "Bulk 1")
+        self.assertEqual(bulk.building_map["Bulk 0"], Location.objects.get(name="Bulk 0").id)
+        self.assertEqual(bulk.room_map["Bulk 0"]["Bulk 0 Room"], Location.objects.get(name="Bulk 0 Room").id)
+
+    def test_ambiguous_parent_building_is_not_guessed(self):
+        building_type = LocationType.objects.get(name="Building")
+        for _ in range(2):
+            Location.objects.create(name="Twin", location_type=building_type, status=Status.objects.get(name="Planned"))
+        bulk = self.adapter(bulk_import=True)
+        NautobotRoom.create(
+            diffsync=bulk,
+            ids={"name": "Twin Room", "parent__name": "Twin", "external_id": 1},
+            attrs={"status__name": "Planned"},
+        )
+        bulk.bulk_writer.flush(bulk.building_map, bulk.room_map)
+
+        self.assertFalse(Location.objects.filter(name="Twin Room").exists())
+        bulk.job.logger.error.assert_called_once_with("Failed to create Room: 2 buildings named Twin - Twin Room")
+
+    def test_bulk_import_uses_fewer_queries(self):
+        immediate = self.adapter(bulk_import=False)
+        with QueryCounter() as immediate_queries:
+            self.create(immediate, "Immediate", 20)
+        bulk = self.adapter(bulk_import=True)
+        with QueryCounter() as bulk_queries:
+            self.create(bulk, "Bulk", 20)
+            bulk.bulk_writer.flush(bulk.building_map, bulk.room_map)
+        self.assertEqual(Location.objects.filter(name__startswith="Bulk").count(), 40)
+        # Validation still queries the location tree for each object, but saves and lookups are batched
+        self.assertLess(bulk_queries.count, immediate_queries.count / 4)
+
+
+class TestAuvikWriteQueue(TestCase):
+    """Test that deferred writes create the same devices, interfaces and IP addresses as the immediate path."""
+
+    @classmethod
+    def setUpTestData(cls):
+        content_types = ContentType.objects.get_for_models(Location, Device, Interface, Prefix, IPAddress).values()
+        for name in ("Active", "Planned"):
+            Status.objects.get_or_create(name=name)[0].content_types.add(*content_types)
+        location_type = LocationType.objects.get_or_create(name="Building")[0]
+        location_type.content_types.add(ContentType.objects.get_for_model(Device))
+        building = Location.objects.create(
+            name="Test Building", location_type=location_type, status=Status.objects.get(name="Active")
+        )
+        DeviceType.objects.create(manufacturer=Manufacturer.objects.create(name="Cisco"), model="C9300")
+        namespace = Namespace.objects.create(name=building.name)
+        for prefix in ("10.0.0.0/24", "2001:db8::/64"):
+            Prefix.objects.create(prefix=prefix, namespace=namespace, status=Status.objects.get(name="Active"))
+        tenant = AuvikTenant.objects.create(name="Test Tenant", auvik_tenant_id="tenant-1")
+        cls.relationship = AuvikTenantBuildingRelationship.objects.create(auvik_tenant=tenant, building=building)
+
+    def sync_device(self, name, address, deferred_writes):
+        """Create a device with a management interface, a port and a management IP address through the models."""
+        job = SimpleNamespace(debug=False, logger=mock.Mock(), building_to_sync=self.relationship)
+        adapter = NautobotAuvikAdapter(job=job, deferred_writes=deferred_writes)
+        NautobotDevice.create(
+            diffsync=adapter,
+            ids={"name": name, "location__name": "Test Building"},
+            attrs={"device_type": "C9300", "manufacturer": "Cisco", "serial": f"SN-{name}", "role": "Core Switch"},
+        )
+        for interface, interface_type, mgmt_only in (("mgmt0", "virtual", True), ("ge-0/0/1", "1000base-t", False)):
+            NautobotInterface.create(
+                diffsync=adapter,
+                ids={"name": interface, "device__name": name, "device__location__name": "Test Building"},
+                attrs={"type": interface_type, "status": "Active", "description": None, "mgmt_only": mgmt_only},
+            )
+        NautobotIPAddress.create(
+            diffsync=adapter,
+            ids={"address": address, "namespace": "Test Building"},
+            attrs={"interface__name": "mgmt0", "status": "Active", "device": name},
+        )
+        if adapter.write_queue is not None:
+            adapter.write_queue.flush()
+        return job
+
+    @staticmethod
+    def device_fields(name):
+        """Return the fields of a synchronized device and its interfaces that the sync sets, without its name."""
+        device = Device.objects.get(name=name)
+        interfaces = {
+            interface.name: (interface.type, interface.status.name, interface.mgmt_only, interface.description)
+            for interface in device.interfaces.all()
+        }
+        return (
+            device.device_type.model,
+            device.role.name,
+            device.status.name,
+            device.serial.replace(name, ""),
+            str(device.primary_ip4.host) if device.primary_ip4 else None,
+            [str(ip_address.host) for ip_address in device.interfaces.get(name="mgmt0").ip_addresses.all()],
+            interfaces,
+        )
+
+    def test_deferred_writes_match_immediate_path(self):
+        self.sync_device("immediate-sw", "10.0.0.1", deferred_writes=False)
+        self.sync_device("queued-sw", "10.0.0.1", deferred_writes=True)
+        immediate, queued = self.device_fields("immediate-sw"), self.device_fields("queued-sw")
+        # Both devices are assigned the same management address, found by the deferred path as already existing
+        self.assertEqual(queued, immediate)
+        self.assertEqual(queued[4], "10.0.0.1")
+
+    def test_primary_ip4_is_validated_before_bulk_update(self):
+        job = self.sync_device("queued-sw", "2001:db8::1", deferred_writes=True)
+        self.assertIsNone(Device.objects.get(name="queued-sw").primary_ip4)
+        self.assertIn("is not an IPv4 address", str(job.logger.error.call_args_list))
@@ -0,0 +1,39 @@
+"""Unit tests for the Auvik device registry."""
+
+import unittest
+
+from layer8_app.helpers.auvik_records import parse_device
+from layer8_app.ssot_jobs.utils.device_registry import AuvikDeviceRegistry
+
+
+def auvik_device(device_id, device_name):
+    """Return the record of an Auvik device."""
+    return parse_device({"id": device_id, "attributes": {"deviceName": device_name}})
+
+
+class TestAuvikDeviceRegistry(unittest.TestCase):
+    """Test tracking Auvik devices, their interfaces and skip state."""
+
+    def setUp(self):
+        self.registry = AuvikDeviceRegistry()
+        for device_id in ("d1", "d2", "d3"):
+            self.registry.add(auvik_device(device_id, f"device-{device_id}"))
+
+    def test_interfaces_are_added_to_known_devices_only(self):
+        self.assertTrue(self.registry.add_interface("d2", "i1"))
+        self.assertFalse(self.registry.add_interface("unknown", "i2"))
+        self.assertEqual(self.registry.get("d2").interfaces, ["i1"])
+
+    def test_skipped_devices_are_iterated_separately(self):
+        self.registry.skip("d2", "No vendor or model in Auvik.")
+        self.assertTrue(self.registry.is_skipped("d2"))
+        self.assertFalse(self.registry.is_skipped("d1"))
+        self.assertEqual([device.name for device in self.registry.devices()], ["device-d1", "device-d3"])
+        self.assertEqual([device.id for device in self.registry.devices(skipped=True)], ["d2"])
+        self.assertEqual(self.registry.skip_summary(), [("No vendor or model in Auvik.", 1)])
+
+    def test_retain_keeps_order(self):
+        self.registry.retain({"d3", "d1"})
+        self.assertEqual([device.id for device in self.registry], ["d1", "d3"])
+        self.assertNotIn("d2", self.registry)
+        self.assertEqual(len(self.registry), 2)
@@ -0,0 +1,100 @@
+"""Tests for the scheduling loop of the Auvik Fleet Sync job."""
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from layer8_app.ssot_jobs.jobs import AuvikFleetSync
+
+
+class TestAuvikFleetSync(SimpleTestCase):
+    """Test running building syncs within the concurrency limit and timeout."""
+
+    def setUp(self):
+        self.now = 0.0
+        # Job result pk -> time the building sync was enqueued
+        self.started = {}
+        # Job result pk -> seconds the building sync runs for. Syncs not listed never finish.
+        self.durations = {}
+        self.relationships = [
+            SimpleNamespace(pk=f"building-{number}", building=SimpleNamespace(name=f"Building {number}"))
+            for number in range(3)
+        ]
+
+        self.job = AuvikFleetSync()
+        self.job.logger = mock.Mock()
+        self.job.job_result = SimpleNamespace(user=None)
+
+        patchers = {
+            "time": mock.patch("layer8_app.ssot_jobs.jobs.time"),
+            "job_model": mock.patch("layer8_app.ssot_jobs.jobs.JobModel"),
+            "job_result": mock.patch("layer8_app.ssot_jobs.jobs.JobResult"),
+            "celery_app": mock.patch("layer8_app.ssot_jobs.jobs.celery_app"),
+        }
+        self.mocks = {name: patcher.start() for name, patcher in patchers.items()}
+        for patcher in patchers.values():
+            self.addCleanup(patcher.stop)
+        self.mocks["time"].monotonic.side_effect = lambda: self.now
+        self.mocks["time"].sleep.side_effect = self.sleep
+        self.mocks["job_result"].enqueue_job.side_effect = self.enqueue_job
+        self.mocks["job_result"].objects.filter.side_effect = self.job_results
+        self.set_worker_processes(8)
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def set_worker_processes(self, count):
+        inspect = self.mocks["celery_app"].control.inspect.return_value
+        inspect.stats.return_value = {"celery@worker": {"pool": {"max-concurrency": count}}}
+
+    def enqueue_job(self, job_model, user, building_to_sync, **kwargs):
+        pk = f"job-{building_to_sync}"
+        self.started[pk] = self.now
+        return SimpleNamespace(pk=pk, get_absolute_url=lambda: f"/extras/job-results/{pk}/")
+
+    def job_results(self, pk__in):
+        rows = []
+        for pk in pk__in:
+            duration = self.durations.get(pk)
+            finished = duration is not None and self.now - self.started[pk] >= duration
+            rows.append((pk, "SUCCESS" if finished else "STARTED"))
+        return mock.Mock(values_list=mock.Mock(return_value=rows))
+
+    def run_job(self, max_concurrency=2, building_timeout=3600):
+        buildings = mock.Mock(select_related=mock.Mock(return_value=self.relationships))
+        return self.job.run(
+            buildings=buildings,
+            all_buildings=False,
+            dryrun=True,
+            debug=False,
+            incremental=False,
+            max_concurrency=max_concurrency,
+            building_timeout=building_timeout,
+        )
+
+    def test_buildings_start_as_slots_free_up(self):
+        self.durations = {"job-building-0": 5, "job-building-1": 20, "job-building-2": 5}
+        result = self.run_job(max_concurrency=2)
+        self.assertEqual(self.started, {"job-building-0": 0, "job-building-1": 0, "job-building-2": 5})
+        self.assertEqual([building["status"] for building in result["buildings"]], ["SUCCESS"] * 3)
+        self.mocks["celery_app"].control.revoke.assert_not_called()
+
+    def test_timed_out_building_is_revoked(self):
+        self.durations = {"job-building-1": 5, "job-building-2": 5}
+        result = self.run_job(max_concurrency=2, building_timeout=60)
+        statuses = {building["building"]: building["status"] for building in result["buildings"]}
+        self.assertEqual(statuses, {"Building 0": "TIMED OUT", "Building 1": "SUCCESS", "Building 2": "SUCCESS"})
+        self.mocks["celery_app"].control.revoke.assert_called_once_with("job-building-0", terminate=True)
+
+    def test_concurrency_is_limited_by_worker_processes(self):
+        self.set_worker_processes(2)
+        self.durations = {"job-building-0": 5, "job-building-1": 5, "job-building-2": 5}
+        self.run_job(max_concurrency=4)
+        self.assertEqual(self.started, {"job-building-0": 0, "job-building-1": 5, "job-building-2": 10})
+
+    def test_single_worker_process_is_rejected(self):
+        self.set_worker_processes(1)
+        with self.assertRaisesRegex(Exception, "at least two Celery worker processes"):
+            self.run_job()
+        self.mocks["job_result"].enqueue_job.assert_not_called()
@@ -0,0 +1,47 @@
+"""Unit tests for the Gateway M2M token manager."""
+
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from layer8_app.helpers.get_m2m_token import M2MTokenManager
+
+
+class TestM2MTokenManager(SimpleTestCase):
+    """Test caching and single-flight refresh of the Gateway M2M token."""
+
+    def setUp(self):
+        self.requests_made = 0
+        cache.delete(M2MTokenManager.cache_key)
+        cache.delete(M2MTokenManager.lock_key)
+
+    def tearDown(self):
+        cache.delete(M2MTokenManager.cache_key)
+
+    def request_token(self):
+        self.requests_made += 1
+        return {"access_token": f"token-{self.requests_made}", "expires_in": 3600}
+
+    def test_token_is_reused_until_invalidated(self):
+        manager = M2MTokenManager(request_token=self.request_token)
+        self.assertEqual(manager.get_token(), "token-1")
+        self.assertEqual(manager.get_token(), "token-1")
+        manager.invalidate()
+        self.assertEqual(manager.get_token(), "token-2")
+
+    def test_short_lived_token_is_not_cached(self):
+        manager = M2MTokenManager(request_token=lambda: {"access_token": "short", "expires_in": 30})
+        manager.get_token()
+        self.assertIsNone(cache.get(M2MTokenManager.cache_key))
+
+    def test_concurrent_callers_refresh_once(self):
+        manager = M2MTokenManager(request_token=self.request_token)
+        tokens = []
+        threads = [threading.Thread(target=lambda: tokens.append(manager.get_token())) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(set(tokens), {"token-1"})
+        self.assertEqual(self.requests_made, 1)
@@ -0,0 +1,153 @@
+"""Unit tests for change detection in incremental Auvik syncs."""
+
+import unittest
+from unittest import mock
+
+from diffsync import DiffSync
+from diffsync.enum import DiffSyncFlags
+
+from layer8_app.helpers.auvik_records import parse_device, parse_interface
+from layer8_app.ssot_jobs.diffsync.adapters.auvik import AuvikAdapter
+from layer8_app.ssot_jobs.diffsync.models.base import dcim
+from layer8_app.ssot_jobs.utils.device_registry import AuvikDeviceRegistry
+from layer8_app.ssot_jobs.utils.incremental import record_hash
+
+
+def device(**attributes):
+    """Return the record of an Auvik device with the given attributes."""
+    return parse_device({"id": "device-1", "attributes": attributes})
+
+
+def interface(**attributes):
+    """Return the record of an Auvik interface with the given attributes."""
+    return parse_interface({"id": "interface-1", "attributes": attributes})
+
+
+class TestRecordHash(unittest.TestCase):
+    """Test hashing of Auvik records."""
+
+    def test_volatile_attributes_are_ignored(self):
+        first = device(deviceName="sw1", lastSeenTime="2024-01-01T00:00:00Z", onlineStatus="online")
+        second = device(deviceName="sw1", lastSeenTime="2024-02-01T00:00:00Z", onlineStatus="offline")
+        self.assertEqual(record_hash(first), record_hash(second))
+
+    def test_attribute_change_changes_hash(self):
+        self.assertNotEqual(record_hash(device(deviceName="sw1")), record_hash(device(deviceName="sw2")))
+
+    def test_child_change_changes_hash(self):
+        self.assertNotEqual(
+            record_hash(device(deviceName="sw1"), [interface(interfaceName="ge-0/0/1")]),
+            record_hash(device(deviceName="sw1"), [interface(interfaceName="ge-0/0/2")]),
+        )
+
+
+class TargetDevice(dcim.Device):
+    """Target device model whose create fails for sw-2."""
+
+    @classmethod
+    def create(cls, diffsync, ids, attrs):
+        if ids["name"] == "sw-2":
+            return None
+        return super().create(diffsync=diffsync, ids=ids, attrs=attrs)
+
+
+class TargetInterface(dcim.Interface):
+    """Target interface model whose create fails for the interfaces of sw-3."""
+
+    @classmethod
+    def create(cls, diffsync, ids, attrs):
+        if ids["device__name"] == "sw-3":
+            return None
+        return super().create(diffsync=diffsync, ids=ids, attrs=attrs)
+
+
+class TargetAdapter(DiffSync):
+    """Target adapter with devices and interfaces that fail to be created."""
+
+    device = TargetDevice
+    interface = TargetInterface
+    ipaddr = dcim.IPAddress
+    cable = dcim.Cable
+    top_level = ("device", "cable")
+
+
+class TestSaveSyncState(unittest.TestCase):
+    """Test that only the devices synchronized completely are recorded."""
+
+    def setUp(self):
+        self.source = AuvikAdapter.__new__(AuvikAdapter)
+        DiffSync.__init__(self.source)
+        self.source.job = mock.Mock()
+        self.source.full_sync = True
+        self.source.sync_state = mock.Mock(record_hashes={})
+        self.source.device_registry = AuvikDeviceRegistry()
+        self.source.record_hashes = {}
+        for number in range(1, 4):
+            record = device(deviceName=f"sw-{number}")._replace(id=f"device-{number}")
+            self.source.device_registry.add(record)
+            self.source.record_hashes[record.id] = record_hash(record)
+            model = self.source.device(
+                name=record.device_name,
+                location__name="Test Building",
+                device_type="C9300",
+                manufacturer="Cisco",
+                role="Core Switch",
+            )
+            self.source.add(model)
+            port = self.source.interface(
+                name="ge-0/0/1",
+                device__name=record.device_name,
+                device__location__name="Test Building",
+                type="1000base-t",
+                status="Active",
+            )
+            self.source.add(port)
+            model.add_child(port)
+
+    def test_failed_devices_are_not_recorded(self):
+        target = TargetAdapter()
+        self.source.sync_to(target, flags=DiffSyncFlags.CONTINUE_ON_FAILURE)
+        self.source.save_sync_state(target)
+        # sw-2 failed to be created and an interface of sw-3 failed to be created
+        self.assertEqual(set(self.source.sync_state.record_hashes), {"device-1"})
+        self.source.sync_state.validated_save.assert_called_once()
+
+    def test_failed_deferred_writes_are_not_recorded(self):
+        target = TargetAdapter()
+        target.write_queue = mock.Mock(failed_devices={"sw-1"})
+        self.source.sync_to(target, flags=DiffSyncFlags.CONTINUE_ON_FAILURE)
+        self.assertEqual(self.source.unsynchronized_device_names(target), {"sw-1", "sw-2", "sw-3"})
+        self.source.save_sync_state(target)
+        self.assertEqual(self.source.sync_state.record_hashes, {})
+
+
+class TestIncrementalCables(unittest.TestCase):
+    """Test that cables to devices left out of an incremental sync are still loaded."""
+
+    def test_cables_to_unchanged_neighbours_are_kept(self):
+        source = AuvikAdapter.__new__(AuvikAdapter)
+        source.job = mock.Mock()
+        source.full_sync = False
+        source.device_registry = AuvikDeviceRegistry()
+        source.unchanged_devices = []
+        # sw-1 is cabled to sw-2, which is cabled to sw-3
+        links = {"sw-1": [("ge-0/0/1", "sw-2")], "sw-2": [("ge-0/0/1", "sw-1"), ("ge-0/0/2", "sw-3")]}
+        links["sw-3"] = [("ge-0/0/2", "sw-2")]
+        for name, ports in links.items():
+            entry = source.device_registry.add(device(deviceName=name)._replace(id=name))
+            for port, peer in ports:
+                entry.interfaces.append(
+                    interface(interfaceName=port)._replace(id=f"{name}:{port}", connected_to=[f"{peer}:{port}"])
+                )
+        # Only sw-1 changed since the last sync
+        source.sync_state = mock.Mock(
+            record_hashes={
+                entry.id: record_hash(entry.record, entry.interfaces)
+                for entry in source.device_registry
+                if entry.id != "sw-1"
+            }
+        )
+
+        source.select_changed_devices()
+        self.assertEqual(source.job.incremental_device_names, {"sw-1"})
+        self.assertEqual(list(source.get_interface_connections()), [("sw-1", "ge-0/0/1", "sw-2", "ge-0/0/1")])
@@ -0,0 +1,43 @@
+"""Tests for resolving Auvik models and vendors from the preloaded mapping tables."""
+
+from django.test import TestCase
+
+from nautobot.dcim.models import DeviceType, Manufacturer
+
+from layer8_app.models import AuvikDeviceModels, AuvikDeviceVendors
+from layer8_app.ssot_jobs.utils.mappings import AuvikMappingResolver
+from layer8_app.ssot_jobs.utils.queries import QueryCounter
+
+
+class TestAuvikMappingResolver(TestCase):
+    """Test that mappings are resolved like per-device lookups, in a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            manufacturer = Manufacturer.objects.create(name=f"Vendor {number}")
+            device_type = DeviceType.objects.create(manufacturer=manufacturer, model=f"Model {number}")
+            AuvikDeviceModels.objects.create(auvik_model_name=f"auvik-model-{number}", nautobot_device_type=device_type)
+            AuvikDeviceVendors.objects.create(
+                auvik_vendor_name=f"auvik-vendor-{number}", nautobot_manufacturer=manufacturer
+            )
+        AuvikDeviceModels.objects.create(auvik_model_name="auvik-model-unlinked")
+
+    def test_resolves_like_per_device_lookups(self):
+        resolver = AuvikMappingResolver()
+        for mapping in AuvikDeviceModels.objects.all():
+            expected = str(mapping.nautobot_device_type) if mapping.nautobot_device_type else None
+            self.assertEqual(resolver.device_type(mapping.auvik_model_name), expected)
+        for mapping in AuvikDeviceVendors.objects.all():
+            self.assertEqual(resolver.manufacturer(mapping.auvik_vendor_name), str(mapping.nautobot_manufacturer))
+        self.assertIsNone(resolver.manufacturer("auvik-vendor-missing"))
+        self.assertEqual(resolver.unmapped_models, {"auvik-model-unlinked"})
+        self.assertEqual(resolver.unmapped_vendors, {"auvik-vendor-missing"})
+
+    def test_query_count_does_not_grow_with_mappings(self):
+        with QueryCounter() as queries:
+            resolver = AuvikMappingResolver()
+            for number in range(5):
+                resolver.device_type(f"auvik-model-{number}")
+                resolver.manufacturer(f"auvik-vendor-{number}")
+        self.assertEqual(queries.count, 2)
@@ -0,0 +1,182 @@
+"""Tests for loading Nautobot data into the Auvik DiffSync target adapter."""
+
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from nautobot.dcim.models import Cable, Device, DeviceType, Interface, Location, LocationType, Manufacturer
+from nautobot.extras.models import Role, Status
+from nautobot.ipam.models import IPAddress, Namespace, Prefix
+
+from layer8_app.models import AuvikTenant, AuvikTenantBuildingRelationship
+from layer8_app.ssot_jobs.diffsync.adapters.nautobot import NautobotAuvikAdapter
+from layer8_app.ssot_jobs.utils.queries import QueryCounter
+
+
+class NautobotAuvikAdapterTestCase(TestCase):
+    """Create a building with devices to load."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.active = Status.objects.get_or_create(name="Active")[0]
+        cls.active.content_types.add(
+            *ContentType.objects.get_for_models(Location, Device, Interface, Prefix, IPAddress).values()
+        )
+        location_type = LocationType.objects.get_or_create(name="Building")[0]
+        location_type.content_types.add(ContentType.objects.get_for_model(Device))
+        cls.building = Location.objects.create(name="Test Building", location_type=location_type, status=cls.active)
+        cls.role = Role.objects.create(name="Core Switch")
+        cls.role.content_types.add(ContentType.objects.get_for_model(Device))
+        cls.device_type = DeviceType.objects.create(
+            manufacturer=Manufacturer.objects.create(name="Cisco"), model="C9300"
+        )
+        cls.namespace = Namespace.objects.create(name=cls.building.name)
+        Prefix.objects.create(prefix="10.0.0.0/24", namespace=cls.namespace, status=cls.active, type="network")
+        tenant = AuvikTenant.objects.create(name="Test Tenant", auvik_tenant_id="tenant-1")
+        cls.relationship = AuvikTenantBuildingRelationship.objects.create(auvik_tenant=tenant, building=cls.building)
+
+    def create_device(self, number, ports=0):
+        """Create a device with a management interface and IP address and the given number of ports."""
+        device = Device.objects.create(
+            name=f"sw-{number}",
+            device_type=self.device_type,
+            role=self.role,
+            location=self.building,
+            status=self.active,
+            serial=f"SN{number}",
+        )
+        mgmt = Interface.objects.create(device=device, name="mgmt0", type="virtual", status=self.active, mgmt_only=True)
+        mgmt.add_ip_addresses(
+            IPAddress.objects.create(address=f"10.0.0.{number + 1}/24", namespace=self.namespace, status=self.active)
+        )
+        for port in range(ports):
+            Interface.objects.create(device=device, name=f"ge-0/0/{port}", type="1000base-t", status=self.active)
+        return device
+
+    def adapter(self):
+        """Return a target adapter for the test building."""
+        job = SimpleNamespace(debug=False, logger=mock.Mock(), building_to_sync=self.relationship)
+        return NautobotAuvikAdapter(job=job)
+
+
+class TestLoadDevices(NautobotAuvikAdapterTestCase):
+    """Test loading devices with their management interface and IP address."""
+
+    def test_loads_management_interface_and_ip(self):
+        self.create_device(0)
+        adapter = self.adapter()
+        adapter.load_devices()
+        device = adapter.get(adapter.device, {"name": "sw-0", "location__name": "Test Building"})
+        self.assertEqual((device.serial, device.device_type, device.role), ("SN0", "C9300", "Core Switch"))
+        self.assertEqual(len(adapter.get_all(adapter.interface)), 1)
+        ipaddr = adapter.get_all(adapter.ipaddr)[0]
+        self.assertEqual((ipaddr.address, ipaddr.namespace, ipaddr.device), ("10.0.0.1", "Test Building", "sw-0"))
+
+    def test_query_count_does_not_grow_with_devices(self):
+        self.create_device(0)
+        with QueryCounter() as few:
+            self.adapter().load_devices()
+        for number in range(1, 5):
+            self.create_device(number)
+        with QueryCounter() as many:
+            adapter = self.adapter()
+            adapter.load_devices()
+        self.assertEqual(len(adapter.get_all(adapter.ipaddr)), 5)
+        self.assertEqual(many.count, few.count)
+
+
+class TestLoadInterfaces(NautobotAuvikAdapterTestCase):
+    """Test loading device interfaces from plain rows."""
+
+    def load_interfaces(self):
+        """Return a target adapter with devices and interfaces loaded, and the queries load_interfaces used."""
+        adapter = self.adapter()
+        adapter.load_devices()
+        with QueryCounter() as queries:
+            adapter.load_interfaces()
+        return adapter, queries.count
+
+    def test_loads_interfaces_like_orm_objects(self):
+        device = self.create_device(0, ports=3)
+        port = device.interfaces.get(name="ge-0/0/1")
+        port.custom_field_data["monitoring_profile"] = {"name": "critical"}
+        port.save()
+        adapter = self.load_interfaces()[0]
+        loaded = {
+            interface.name: (interface.type, interface.status, interface.monitoring_profile)
+            for interface in adapter.get_all(adapter.interface)
+            if interface.name != "mgmt0"
+        }
+        expected = {
+            interface.name: (
+                interface.type,
+                interface.status.name,
+                interface.custom_field_data.get("monitoring_profile"),
+            )
+            for interface in Interface.objects.filter(device=device).exclude(name="mgmt0")
+        }
+        self.assertEqual(loaded, expected)
+        sw0 = adapter.get(adapter.device, {"name": "sw-0", "location__name": "Test Building"})
+        self.assertEqual(len(sw0.interfaces), 4)
+
+    def test_query_count_does_not_grow_with_interfaces(self):
+        self.create_device(0, ports=2)
+        few = self.load_interfaces()[1]
+        for number in range(1, 4):
+            self.create_device(number, ports=10)
+        adapter, many = self.load_interfaces()
+        self.assertEqual(len(adapter.get_all(adapter.interface)), 4 + 2 + 30)
+        self.assertEqual(many, few)
+
+
+class TestLoadCables(NautobotAuvikAdapterTestCase):
+    """Test loading cables between device interfaces."""
+
+    def connect(self, count):
+        """Create count cables between the ports of two new devices."""
+        connected = Status.objects.get_or_create(name="Connected")[0]
+        connected.content_types.add(ContentType.objects.get_for_model(Cable))
+        first = self.create_device(Device.objects.count(), ports=count)
+        second = self.create_device(Device.objects.count(), ports=count)
+        for port in range(count):
+            Cable.objects.create(
+                termination_a=first.interfaces.get(name=f"ge-0/0/{port}"),
+                termination_b=second.interfaces.get(name=f"ge-0/0/{port}"),
+                status=connected,
+            )
+
+    def load_cables(self):
+        """Return a target adapter with cables loaded, and the queries load_cables used."""
+        adapter = self.adapter()
+        with QueryCounter() as queries:
+            adapter.load_cables()
+        return adapter, queries.count
+
+    def test_loads_cables_like_orm_objects(self):
+        self.connect(2)
+        adapter = self.load_cables()[0]
+        loaded = {
+            (cable.from_device, cable.from_interface, cable.to_device, cable.to_interface)
+            for cable in adapter.get_all(adapter.cable)
+        }
+        expected = {
+            (
+                cable.termination_a.device.name,
+                cable.termination_a.name,
+                cable.termination_b.device.name,
+                cable.termination_b.name,
+            )
+            for cable in Cable.objects.all()
+        }
+        self.assertEqual(loaded, expected)
+        self.assertEqual(len(loaded), 2)
+
+    def test_query_count_does_not_grow_with_cables(self):
+        self.connect(1)
+        few = self.load_cables()[1]
+        self.connect(5)
+        adapter, many = self.load_cables()
+        self.assertEqual(len(adapter.get_all(adapter.cable)), 6)
+        self.assertEqual(many, few)
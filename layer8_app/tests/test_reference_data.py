@@ -0,0 +1,73 @@
+"""Tests for the per-sync cache of Nautobot reference data."""
+
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import TestCase
+
+from nautobot.dcim.models import Device, Interface
+from nautobot.extras.models import Role, Status
+
+from layer8_app.ssot_jobs.utils.queries import QueryCounter
+from layer8_app.ssot_jobs.utils.reference_data import ReferenceDataCache
+from layer8_app.ssot_jobs.utils.transactions import SyncTransactions
+
+
+class TestReferenceDataCache(TestCase):
+    """Test that reference data is queried once per sync."""
+
+    def setUp(self):
+        self.reference_data = ReferenceDataCache()
+
+    def test_repeated_lookups_cost_no_queries(self):
+        Status.objects.get_or_create(name="Active")
+        first = (
+            self.reference_data.status("Active"),
+            self.reference_data.location_type("Building"),
+            self.reference_data.role("Core Switch", Device),
+            self.reference_data.content_type(Interface),
+        )
+        with QueryCounter() as queries:
+            for _ in range(10):
+                cached = (
+                    self.reference_data.status("Active"),
+                    self.reference_data.location_type("Building"),
+                    self.reference_data.role("Core Switch", Device),
+                    self.reference_data.content_type(Interface),
+                )
+                self.assertEqual(cached, first)
+        self.assertEqual(queries.count, 0)
+
+    def test_role_is_created_with_content_type(self):
+        role = self.reference_data.role("Access Switch", Device)
+        self.assertEqual(Role.objects.get(name="Access Switch"), role)
+        self.assertIn(Device, [content_type.model_class() for content_type in role.content_types.all()])
+
+    def test_clear_picks_up_changes(self):
+        self.reference_data.role("Access Switch", Device)
+        Role.objects.filter(name="Access Switch").delete()
+        self.reference_data.clear()
+        self.assertTrue(Role.objects.filter(pk=self.reference_data.role("Access Switch", Device).pk).exists())
+
+    def test_objects_cached_in_rolled_back_savepoint_are_forgotten(self):
+        Status.objects.get_or_create(name="Active")
+        self.reference_data.status("Active")
+
+        def create_device():
+            self.reference_data.role("Access Switch", Device)
+            raise IntegrityError("duplicate key value violates unique constraint")
+
+        transactions = SyncTransactions(
+            "object", top_level=("device",), batch_size=1, logger=mock.Mock(), reference_data=self.reference_data
+        )
+        with transactions:
+            self.assertIsNone(transactions.run("device", create_device))
+        self.assertFalse(Role.objects.filter(name="Access Switch").exists())
+        self.assertEqual(transactions.rolled_back, 1)
+
+        role = self.reference_data.role("Access Switch", Device)
+        self.assertTrue(Role.objects.filter(pk=role.pk).exists())
+        # Objects cached before the savepoint are kept
+        with QueryCounter() as queries:
+            self.reference_data.status("Active")
+        self.assertEqual(queries.count, 0)
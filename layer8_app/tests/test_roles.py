@@ -0,0 +1,47 @@
+"""Unit tests for the Auvik device role classifier."""
+
+import unittest
+
+from layer8_app.ssot_jobs.utils.roles import DeviceRoleClassifier
+
+RULES = [
+    ("CorS", "Core Switch"),
+    ("Dist", "Distribution Switch"),
+    ("-AP", "Wireless Access Point"),
+    ("CorR", "Core Gateway"),
+    ("CorF", "Core Gateway"),
+    ("AccS", "Access Switch"),
+    ("VSS", "Access Switch"),
+    ("UPS", "UPS"),
+    ("-PP", "UPS"),
+    ("APTS", "UPS"),
+    ("CorPP", "UPS"),
+]
+
+
+class TestDeviceRoleClassifier(unittest.TestCase):
+    """Test assigning device roles from a rule table."""
+
+    def setUp(self):
+        self.classifier = DeviceRoleClassifier(RULES)
+
+    def test_matches_ignore_case(self):
+        self.assertEqual(self.classifier.classify("bldg1-cors-01"), "Core Switch")
+        self.assertEqual(self.classifier.classify("BLDG1-AP-12"), "Wireless Access Point")
+
+    def test_earlier_rules_take_precedence_wherever_they_occur(self):
+        # "VSS" occurs before "CorS" in the name, but the CorS rule comes first in the table
+        self.assertEqual(self.classifier.classify("VSS-CorS-01"), "Core Switch")
+        # "-AP" overlaps "-APTS"
+        self.assertEqual(self.classifier.classify("bldg1-APTS-01"), "Wireless Access Point")
+
+    def test_unmatched_and_missing_names_get_default(self):
+        self.assertEqual(self.classifier.classify("printer-01"), "Unknown")
+        self.assertEqual(self.classifier.classify(None), "Unknown")
+        self.assertEqual(DeviceRoleClassifier([]).classify("bldg1-CorS-01"), "Unknown")
+
+    def test_classify_many(self):
+        self.assertEqual(
+            self.classifier.classify_many(["b1-Dist-01", "b1-UPS-01"]),
+            {"b1-Dist-01": "Distribution Switch", "b1-UPS-01": "UPS"},
+        )
@@ -0,0 +1,48 @@
+"""Unit tests for the Secret value cache."""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from layer8_app.helpers.secrets import SecretValueCache
+
+
+@override_settings(PLUGINS_CONFIG={"layer8_app": {"secret_cache_ttl": 300}})
+class TestSecretValueCache(SimpleTestCase):
+    """Test TTL expiry, statistics and invalidation of cached Secret values."""
+
+    def setUp(self):
+        cache.delete(SecretValueCache.generation_key)
+        self.values = iter(f"value-{number}" for number in range(1, 100))
+        patcher = mock.patch("layer8_app.helpers.secrets.Secret")
+        secret_model = patcher.start()
+        self.addCleanup(patcher.stop)
+        secret_model.objects.get.return_value.get_value.side_effect = lambda: next(self.values)
+
+    def tearDown(self):
+        cache.delete(SecretValueCache.generation_key)
+
+    def test_value_is_cached_until_ttl_expires(self):
+        secret_cache = SecretValueCache()
+        with mock.patch("layer8_app.helpers.secrets.time.monotonic", return_value=1000):
+            self.assertEqual(secret_cache.get_value("Auvik API Password"), "value-1")
+            self.assertEqual(secret_cache.get_value("Auvik API Password"), "value-1")
+        with mock.patch("layer8_app.helpers.secrets.time.monotonic", return_value=1301):
+            self.assertEqual(secret_cache.get_value("Auvik API Password"), "value-2")
+        self.assertEqual(secret_cache.stats(), {"hits": 1, "misses": 2})
+
+    @override_settings(PLUGINS_CONFIG={"layer8_app": {"secret_cache_ttl": 0}})
+    def test_zero_ttl_disables_cache(self):
+        secret_cache = SecretValueCache()
+        self.assertEqual(secret_cache.get_value("Auvik API Password"), "value-1")
+        self.assertEqual(secret_cache.get_value("Auvik API Password"), "value-2")
+
+    def test_invalidate_clears_other_processes(self):
+        web_process, worker_process = SecretValueCache(), SecretValueCache()
+        self.assertEqual(worker_process.get_value("Auvik API Password"), "value-1")
+        web_process.invalidate()
+        self.assertEqual(worker_process.get_value("Auvik API Password"), "value-2")
+        self.assertEqual(worker_process.get_value("Auvik API Password"), "value-2")
+        web_process.invalidate()
+        self.assertEqual(worker_process.get_value("Auvik API Password"), "value-3")
@@ -0,0 +1,88 @@
+"""Unit tests for the cached Tenant API building catalog."""
+
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from layer8_app.helpers.tenant_api import BuildingCatalog
+
+BUILDINGS = {"buildings": {"items": [{"id": 1, "building_name": "Record Hall", "operator": {"operator_name": "Op"}}]}}
+
+
+def response(status_code, payload=None, headers=None):
+    """Return a fake requests response."""
+    return SimpleNamespace(
+        status_code=status_code,
+        headers=headers or {},
+        json=lambda: payload,
+        raise_for_status=lambda: None,
+    )
+
+
+@mock.patch("layer8_app.helpers.tenant_api.get_api_token", return_value="token")
+class TestBuildingCatalog(SimpleTestCase):
+    """Test revalidation and stale-while-refresh of the building catalog."""
+
+    def setUp(self):
+        cache.delete(BuildingCatalog.cache_key)
+        cache.delete(BuildingCatalog.lock_key)
+        self.catalog = BuildingCatalog()
+
+    def tearDown(self):
+        cache.delete(BuildingCatalog.cache_key)
+        cache.delete(BuildingCatalog.lock_key)
+
+    @mock.patch("layer8_app.helpers.tenant_api.requests.get")
+    def test_unchanged_catalog_is_revalidated_with_etag(self, get, _get_api_token):
+        get.return_value = response(200, BUILDINGS, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        self.assertEqual(self.catalog.get_choices(), [(1, "Record Hall (Op)")])
+
+        get.return_value = response(304)
+        entry = self.catalog.refresh()
+        headers = get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.assertEqual(entry["choices"], [(1, "Record Hall (Op)")])
+        self.assertEqual(entry["etag"], '"v1"')
+
+    @mock.patch("layer8_app.helpers.tenant_api.threading.Thread")
+    @mock.patch("layer8_app.helpers.tenant_api.requests.get")
+    def test_stale_catalog_is_served_while_one_refresh_runs(self, get, thread, _get_api_token):
+        cache.set(
+            BuildingCatalog.cache_key,
+            {
+                "choices": [(1, "Old name (Op)")],
+                "etag": '"v1"',
+                "last_modified": None,
+                "fetched_at": time.time() - 3600,
+            },
+        )
+        get.return_value = response(200, BUILDINGS, {"ETag": '"v2"'})
+
+        self.assertEqual(self.catalog.get_choices(), [(1, "Old name (Op)")])
+        self.assertEqual(self.catalog.get_choices(), [(1, "Old name (Op)")])
+        # The second call found the refresh lock taken, so only one refresh was started
+        self.assertEqual(thread.call_count, 1)
+        get.assert_not_called()
+
+        thread.call_args.kwargs["target"]()
+        self.assertEqual(self.catalog.get_choices(), [(1, "Record Hall (Op)")])
+        self.assertIsNone(cache.get(BuildingCatalog.lock_key))
+
+    @mock.patch("layer8_app.helpers.tenant_api.requests.get", side_effect=Exception("unreachable"))
+    def test_failed_first_fetch_returns_no_choices(self, _get, _get_api_token):
+        self.assertEqual(self.catalog.get_choices(), [])
+
+    @mock.patch("layer8_app.helpers.tenant_api.token_manager")
+    @mock.patch("layer8_app.helpers.tenant_api.requests.get")
+    def test_rejected_token_is_invalidated_and_retried_once(self, get, token_manager, get_api_token):
+        get_api_token.side_effect = ["revoked", "fresh"]
+        get.side_effect = [response(401), response(200, BUILDINGS)]
+
+        entry = self.catalog.refresh()
+        token_manager.invalidate.assert_called_once()
+        self.assertEqual(get.call_args.kwargs["headers"]["Authorization"], "Bearer fresh")
+        self.assertEqual(entry["choices"], [(1, "Record Hall (Op)")])
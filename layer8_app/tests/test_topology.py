@@ -0,0 +1,34 @@
+"""Unit tests for the Auvik cable topology."""
+
+import unittest
+
+from layer8_app.ssot_jobs.utils.topology import InterfaceTopology
+
+
+class TestInterfaceTopology(unittest.TestCase):
+    """Test building cables from Auvik interface connections."""
+
+    def test_links_are_reported_once(self):
+        topology = InterfaceTopology()
+        topology.add_device("sw1", [("a1", "ge-0/0/1", ["b1"])])
+        topology.add_device("sw2", [("b1", "ge-0/0/1", ["a1"])])
+        self.assertEqual(list(topology.cables()), [("sw1", "ge-0/0/1", "sw2", "ge-0/0/1")])
+
+    def test_unknown_and_multiple_connections_are_ignored(self):
+        topology = InterfaceTopology()
+        topology.add_device("sw1", [("a1", "ge-0/0/1", ["unknown"]), ("a2", "ge-0/0/2", ["b1", "b2"])])
+        topology.add_device("sw2", [("b1", "ge-0/0/1", []), ("b2", "ge-0/0/2", [])])
+        self.assertEqual(list(topology.cables()), [])
+
+    def test_link_to_remote_me0_uses_local_me0_link(self):
+        topology = InterfaceTopology()
+        topology.add_device("sw1", [("a1", "ge-0/0/1", ["b0"]), ("a0", "me0", ["c1"])])
+        topology.add_device("sw2", [("b0", "me0", [])])
+        topology.add_device("core", [("c1", "ge-0/0/48", [])])
+        self.assertEqual(list(topology.cables()), [("sw1", "ge-0/0/1", "core", "ge-0/0/48")])
+
+    def test_link_to_remote_me0_without_local_me0_is_skipped(self):
+        topology = InterfaceTopology()
+        topology.add_device("sw1", [("a1", "ge-0/0/1", ["b0"])])
+        topology.add_device("sw2", [("b0", "me0", ["a1"])])
+        self.assertEqual(list(topology.cables()), [])